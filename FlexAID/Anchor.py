@@ -100,6 +100,7 @@ class anchor(Wizard):
     #=======================================================================
     ''' Quits the wizard '''
     #=======================================================================    
+    @General_cmd.Batched
     def Quit_Wizard(self):
         
         try:
@@ -107,7 +108,7 @@ class anchor(Wizard):
             cmd.set('mouse_selection_mode', self.selection_mode)
 
             cmd.delete(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
             cmd.deselect()
             
@@ -126,23 +127,24 @@ class anchor(Wizard):
 
         cmd.set_wizard()
         cmd.set_view(self.View)
-        cmd.refresh()
+        General_cmd.refresh()
                 
     #=======================================================================
     ''' Displays the ligand to change anchor '''
     #=======================================================================    
+    @General_cmd.Batched
     def DisplayLigand(self):
         
         try:
             cmd.set("auto_zoom", 0)
             cmd.load(self.LigandPath, self.LigDisplay, state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.translate(self.Translation,self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.zoom(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.ErrorCode = 1
@@ -154,28 +156,29 @@ class anchor(Wizard):
     #=======================================================================
     ''' Refreshes the ligand to update anchor atom '''
     #=======================================================================    
+    @General_cmd.Batched
     def RefreshDisplay(self):
         
         try:
             # Display the atoms spheres
             cmd.show('spheres', self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.alter(self.LigDisplay,'vdw=0.25')
             cmd.rebuild(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             util.cbag(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
             if self.AnchorAtom != -1:
                 AtomSel = self.LigDisplay + ' & id ' + str(self.AnchorAtom)
                 cmd.color('white',AtomSel)
-                cmd.refresh()
+                General_cmd.refresh()
 
                 cmd.alter(AtomSel ,'vdw=0.30')
                 cmd.rebuild(AtomSel)
-                cmd.refresh()
+                General_cmd.refresh()
                         
         except:
             self.ErrorCode = 1
@@ -219,7 +222,7 @@ class anchor(Wizard):
     def show_AtomsNumber(self):
         
         cmd.label(self.LigDisplay, "\"%d\" % ID")        
-        cmd.refresh()
+        General_cmd.refresh()
 
     #=======================================================================   
     ''' Display the name of each atom of the ligand on the Pymol interface '''
@@ -227,7 +230,7 @@ class anchor(Wizard):
     def show_AtomsName(self):
               
         cmd.label(self.LigDisplay, "\"%s\" % name")
-        cmd.refresh()
+        General_cmd.refresh()
     
     #=======================================================================   
     ''' Hide labels on the ligand '''
@@ -235,7 +238,7 @@ class anchor(Wizard):
     def hide_Labels(self):
               
         cmd.hide('labels', self.LigDisplay)
-        cmd.refresh()
+        General_cmd.refresh()
 
     #=======================================================================
     ''' Button Done selected '''
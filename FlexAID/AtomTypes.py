@@ -33,6 +33,7 @@ from pymol import util
 
 import pymol
 import General
+import General_cmd
 
 
 class setType(Wizard):
@@ -215,7 +216,7 @@ class setType(Wizard):
 
             cmd.set_wizard()
             cmd.set_view(self.View)
-            cmd.refresh()
+            General_cmd.refresh()
 
             self.top.SATRunning(False)
 
@@ -41,6 +41,7 @@ class Config2Vars(Vars.Vars):
     ConsStatus = StringVar()
     SATStatus = StringVar()
     UseReference = IntVar()
+    SymmetricRMSD = IntVar()
     ConsDist = DoubleVar() 
     ActiveCons = StringVar()
     
@@ -59,6 +60,7 @@ class Config2(Tabs.Tab):
         self.SATStatus = self.Vars.SATStatus
         self.FlexStatus = self.Vars.FlexStatus
         self.UseReference = self.Vars.UseReference
+        self.SymmetricRMSD = self.Vars.SymmetricRMSD
         self.ConsDist = self.Vars.ConsDist
         self.ConsStatus = self.Vars.ConsStatus
         self.IntTranslation = self.Vars.IntTranslation
@@ -69,6 +71,7 @@ class Config2(Tabs.Tab):
         
         self.ActiveCons.set('')      
         self.UseReference.set(0)
+        self.SymmetricRMSD.set(0)
         self.ConsDist.set(0.25)
         self.IntTranslation.set(1)
         self.IntRotation.set(1)
@@ -325,9 +328,12 @@ class Config2(Tabs.Tab):
         fRMSDLine1.pack(side=TOP, fill=X, padx=5, pady=2)
         fRMSDLine2 = Frame(fRMSD)
         fRMSDLine2.pack(side=TOP, fill=X, padx=5, pady=2)
+        fRMSDLine3 = Frame(fRMSD)
+        fRMSDLine3.pack(side=TOP, fill=X, padx=5, pady=2)
         
         Label(fRMSDLine1, text='RMSD structure', font=self.top.font_Title).pack(side=LEFT,anchor=W)        
         Checkbutton(fRMSDLine2, text=' Ligand pose as reference', variable=self.UseReference, font=self.top.font_Text).pack(side=LEFT)
+        Checkbutton(fRMSDLine3, text=' Symmetric atoms of the ligand may swap places', variable=self.SymmetricRMSD, font=self.top.font_Text).pack(side=LEFT)
 
         #************************************************#
         #*               Add Constraints                *#
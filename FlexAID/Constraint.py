@@ -122,27 +122,28 @@ class constraint(Wizard):
     #=======================================================================
     ''' Displays the ligand to be modified '''
     #=======================================================================    
+    @General_cmd.Batched
     def Display_Ligand(self):
         
         try:
             cmd.set("auto_zoom", 0)
             
             cmd.load(self.RefLigand, self.LigDisplay, state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
 
             # Display the atoms spheres
             cmd.show('spheres', self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.alter(self.LigDisplay,'vdw=0.25')
             cmd.rebuild(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
             util.cbag(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.zoom(self.LigDisplay)            
-            cmd.refresh()
+            General_cmd.refresh()
 
         except:
             self.ErrorCode = 1
@@ -154,6 +155,7 @@ class constraint(Wizard):
     #=======================================================================
     ''' Quits the wizard '''
     #=======================================================================    
+    @General_cmd.Batched
     def Quit_Wizard(self):
         
         try:
@@ -162,19 +164,19 @@ class constraint(Wizard):
             cmd.set("mouse_selection_mode", self.selection_mode)
             
             cmd.delete(self.ACTIVE)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.MiddleDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.CONSTRAINT + '*')
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.AtomDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.deselect()
             cmd.unpick()
@@ -190,7 +192,7 @@ class constraint(Wizard):
 
         cmd.set_wizard()
         cmd.set_view(self.View)
-        cmd.refresh()
+        General_cmd.refresh()
                 
         self.queue.put(lambda: self.FlexAID.root.deiconify())
         self.queue.put(lambda: self.FlexAID.root.update())
@@ -406,6 +408,7 @@ class constraint(Wizard):
     #=======================================================================
     ''' Highlights the active constraint '''
     #=======================================================================
+    @General_cmd.Batched
     def highlight_Active(self):
         
         Error = 0
@@ -413,7 +416,7 @@ class constraint(Wizard):
         try:
             # Cleaning
             cmd.delete(self.ACTIVE)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
         
@@ -434,7 +437,7 @@ class constraint(Wizard):
                                        1.000, 1.000, 1.000 ])
 
                     cmd.load_cgo(Highlight, self.ACTIVE, state=self.State)
-                    cmd.refresh()
+                    General_cmd.refresh()
                     
                     self.refresh_distance()
                     
@@ -489,7 +492,7 @@ class constraint(Wizard):
         self.ActiveConsMemory = Active
         self.highlight_Active()
         cmd.zoom(self.ACTIVE)
-        cmd.refresh()
+        General_cmd.refresh()
     
     #=======================================================================
     ''' Move up to the previous active constraint '''
@@ -519,7 +522,7 @@ class constraint(Wizard):
         self.ActiveConsMemory = Active
         self.highlight_Active()
         cmd.zoom(self.ACTIVE)
-        cmd.refresh()  
+        General_cmd.refresh()  
 
     #=======================================================================
         ''' deletes the active constraint '''
@@ -535,7 +538,7 @@ class constraint(Wizard):
                 self.queue.put(lambda: self.ActiveCons.set(''))
                 cmd.hide('label', self.MiddleDisplay)
                 cmd.zoom(self.LigDisplay)
-                cmd.refresh()
+                General_cmd.refresh()
 
     #=======================================================================
         ''' refreshes the display of the constraints '''
@@ -544,7 +547,7 @@ class constraint(Wizard):
         
         try:
             cmd.delete(self.CONSTRAINT + '*')
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
             
@@ -565,11 +568,12 @@ class constraint(Wizard):
     #=======================================================================
         ''' refreshes the distance label of the distance object '''
     #=======================================================================
+    @General_cmd.Batched
     def refresh_distance(self):
 
         try:
             cmd.delete(self.MiddleDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
         
@@ -582,14 +586,14 @@ class constraint(Wizard):
                            pos=self.dictConstraints[Active][6],
                            vdw=self.MiddleRadius,
                            state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
             
             cmd.hide('nonbonded', self.MiddleDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
             dist = '%.2f' % self.dictConstraints[Active][5]
             cmd.label(self.MiddleDisplay, str(dist))
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             pass
@@ -618,7 +622,7 @@ class constraint(Wizard):
                                0.800, 0.300, 0.000 ])
 
             cmd.load_cgo(Highlight, key)
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             Error = 1
@@ -645,17 +649,18 @@ class constraint(Wizard):
     #=======================================================================   
     ''' Highlight atom upon clicking '''
     #=======================================================================    
+    @General_cmd.Batched
     def highlight_Atom(self, atom):
 
         try:
             cmd.pseudoatom(self.AtomDisplay, pos=atom[5:], vdw=0.30, color='white')
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.hide('nonbonded', self.AtomDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.show('spheres', self.AtomDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.mask(self.AtomDisplay)
 
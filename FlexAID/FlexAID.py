@@ -134,6 +134,31 @@ class displayFlexAID(Base.Base):
                                 self.FlexAIDBindingSiteProject_Dir, self.FlexAIDTargetFlexProject_Dir,
                                 self.FlexAIDSaveProject_Dir, self.FlexAIDTempProject_Dir ] )
         
+    ''' ==================================================================================
+    FUNCTION Executable_Streams: Checks if FlexAID honours the NRGSTR line of CONFIG.inp
+                                 (progress printed on stdout). Keywords are compared to
+                                 literals, so a build that knows NRGSTR holds the string
+    ==================================================================================  '''        
+    def Executable_Streams(self):
+        
+        try:
+            File = open(self.FlexAIDExecutable, 'rb')
+        except:
+            return False
+
+        try:
+            # Overlap the chunks so the keyword is found across a boundary
+            Previous = ''
+            while True:
+                Chunk = File.read(1 << 20)
+                if not Chunk:
+                    return False
+                if 'NRGSTR' in Previous[-5:] + Chunk:
+                    return True
+                Previous = Chunk
+        finally:
+            File.close()
+
     ''' ==================================================================================
     FUNCTION MakeMenuBar: Builds the menu on the upper left corner    
     ==================================================================================  '''        
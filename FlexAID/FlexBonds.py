@@ -143,6 +143,7 @@ class flexbond(Wizard):
     #=======================================================================
     ''' Quits the wizard '''
     #=======================================================================    
+    @General_cmd.Batched
     def Quit_Wizard(self):
         
         try:
@@ -150,16 +151,16 @@ class flexbond(Wizard):
             cmd.set('mouse_selection_mode', self.selection_mode)
 
             cmd.delete(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.SelFlexDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.PossFlexDisplay)         
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.AtomDisplay)         
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.deselect()
             cmd.unpick()
@@ -177,36 +178,37 @@ class flexbond(Wizard):
 
         cmd.set_wizard()
         cmd.set_view(self.View)
-        cmd.refresh()
+        General_cmd.refresh()
                 
 
     #=======================================================================
     ''' Displays the ligand to be modified '''
     #=======================================================================    
+    @General_cmd.Batched
     def DisplayLigand(self):
         
         try:
             cmd.set("auto_zoom", 0)
             
             cmd.load(self.RefLigand, self.LigDisplay, state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
             
             # Display the atoms spheres
             cmd.show('spheres', self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.alter(self.LigDisplay,'vdw=0.25')
             cmd.rebuild(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             util.cbag(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.translate(self.Translation,self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.zoom(self.LigDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.ErrorCode = 1
@@ -313,7 +315,7 @@ class flexbond(Wizard):
                     #print PossFlexBonds
                     
             cmd.load_cgo(PossFlexBonds, self.PossFlexDisplay, state=self.State)            
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.ErrorCode = 1
@@ -325,6 +327,7 @@ class flexbond(Wizard):
      #=======================================================================
     ''' Show the selected flexible bonds '''
     #=======================================================================        
+    @General_cmd.Batched
     def show_SelectedBonds(self):
 
         point1 = list()
@@ -334,7 +337,7 @@ class flexbond(Wizard):
             cmd.set("auto_zoom", 0)
             
             cmd.delete(self.SelFlexDisplay)            
-            cmd.refresh()
+            General_cmd.refresh()
 
             SelFlexBonds = []
 
@@ -357,7 +360,7 @@ class flexbond(Wizard):
                     SelFlexBonds.extend(self.highlight_Selected(point1, point2))
                     
             cmd.load_cgo(SelFlexBonds, self.SelFlexDisplay, state=self.State)   
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.ErrorCode = 1
@@ -404,7 +407,7 @@ class flexbond(Wizard):
     def show_AtomsNumber(self):
         
         cmd.label(self.LigDisplay, "\"%d\" % ID")
-        cmd.refresh()
+        General_cmd.refresh()
      
     #=======================================================================   
     ''' Display the name of each atom of the ligand on the Pymol interface '''
@@ -412,7 +415,7 @@ class flexbond(Wizard):
     def show_AtomsName(self):
               
         cmd.label(self.LigDisplay, "\"%s\" % name")
-        cmd.refresh()
+        General_cmd.refresh()
     
     #=======================================================================   
     ''' Hide labels on the ligand '''
@@ -420,7 +423,7 @@ class flexbond(Wizard):
     def hide_Labels(self):
               
         cmd.hide('labels', self.LigDisplay)
-        cmd.refresh()
+        General_cmd.refresh()
 
     #=======================================================================   
     ''' Highlight a selected flex bond '''
@@ -447,17 +450,18 @@ class flexbond(Wizard):
     #=======================================================================   
     ''' Highlight atom upon clicking '''
     #=======================================================================    
+    @General_cmd.Batched
     def highlight_Atom(self, atom):
 
         try:
             cmd.pseudoatom(self.AtomDisplay, pos=atom[5:], vdw=0.30, color='white')
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.hide('nonbonded', self.AtomDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.show('spheres', self.AtomDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.mask(self.AtomDisplay)
 
@@ -671,7 +675,7 @@ class flexbond(Wizard):
 
                     cmd.refresh_wizard()
                     cmd.delete(self.AtomDisplay)                    
-                    cmd.refresh()
+                    General_cmd.refresh()
 
                 else:
                     self.ErrorStatus = [ "No atoms could be selected in the object " + self.LigDisplay + ". Try again." ]
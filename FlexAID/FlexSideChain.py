@@ -123,7 +123,7 @@ class flexSC(Wizard):
 
         try:
             cmd.delete(self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
         
@@ -192,7 +192,7 @@ class flexSC(Wizard):
 
         try:
             cmd.delete(self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
 
@@ -255,16 +255,17 @@ class flexSC(Wizard):
     #=======================================================================
     ''' Quits the wizard '''
     #=======================================================================    
+    @General_cmd.Batched
     def Quit_Wizard(self):
         
         try:
             
             #Delete the Residue objects
             cmd.delete(self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.delete(self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             #cmd.delete(self.BackboneDisplay)
             #cmd.refresh()
@@ -290,7 +291,7 @@ class flexSC(Wizard):
 
         cmd.set_wizard()
         cmd.set_view(self.View)
-        cmd.refresh()
+        General_cmd.refresh()
                 
              
      #=======================================================================   
@@ -326,11 +327,12 @@ class flexSC(Wizard):
     #=======================================================================   
     ''' highlight_Residue: Highlight residue upon selection '''
     #=======================================================================    
+    @General_cmd.Batched
     def highlight_Residue(self, name):
 
         try:            
             cmd.delete(self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
             
@@ -339,26 +341,26 @@ class flexSC(Wizard):
             
             # Create new object from selection
             cmd.create(self.ResidueDisplay, name + ' & ! n. C+O+N', target_state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
 
             # Visual appearance
             cmd.hide('lines', self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.show('sticks', self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.color('orange', self.ResidueDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.mask(self.ResidueDisplay)
 
             # Toggle FlexSC obj to overlap ResidueDisplay
             cmd.disable(self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.enable(self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.queue.put(lambda: self.FlexAID.DisplayMessage("  ERROR: Could not highlight residue upon selection", 2))
@@ -368,13 +370,14 @@ class flexSC(Wizard):
     #=======================================================================   
     ''' highlight_FlexibleSC: Highlight flexible side-chains '''
     #=======================================================================    
+    @General_cmd.Batched
     def highlight_FlexibleSC(self, selString):
 
         Error = 0
         
         try:
             cmd.delete(self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
             
@@ -383,17 +386,17 @@ class flexSC(Wizard):
 
             # Create new object from selection
             cmd.create(self.FlexSCDisplay, selString, target_state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
             
             # Visual appearance
             cmd.hide('lines', self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.show('sticks', self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.color('white', self.FlexSCDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.label(self.FlexSCDisplay + " & name CA", "resn+resi")
 
@@ -27,6 +27,10 @@ class GAParamVars(Vars.Vars):
     
     NbTopChrom = StringVar()
     NbGenFreq = StringVar()
+    AdaptiveGenFreq = IntVar()
+    NbStates = StringVar()
+    BindingSiteOnly = IntVar()
+    StreamStdout = IntVar()
     NbGen = StringVar()
     NbChrom = StringVar()
     CrossRate = StringVar()
@@ -51,6 +55,10 @@ class GAParam(Tabs.Tab):
         
         self.NbTopChrom = self.Vars.NbTopChrom
         self.NbGenFreq = self.Vars.NbGenFreq
+        self.AdaptiveGenFreq = self.Vars.AdaptiveGenFreq
+        self.NbStates = self.Vars.NbStates
+        self.BindingSiteOnly = self.Vars.BindingSiteOnly
+        self.StreamStdout = self.Vars.StreamStdout
         self.NbGen = self.Vars.NbGen
         self.NbChrom = self.Vars.NbChrom
         self.CrossRate = self.Vars.CrossRate
@@ -73,6 +81,10 @@ class GAParam(Tabs.Tab):
                 
         self.NbTopChrom.set('5')
         self.NbGenFreq.set('25')
+        self.AdaptiveGenFreq.set(0)
+        self.NbStates.set('1')
+        self.BindingSiteOnly.set(0)
+        self.StreamStdout.set(0)
         self.NbGen.set('500')
         self.NbChrom.set('500')
         self.CrossRate.set('0.900')
@@ -158,6 +170,10 @@ class GAParam(Tabs.Tab):
                                                        self.Validate_Field(input=self.inputGenFq, var=self.NbGenFreq, min=1,
                                                                            max=self.inputNbGen, ndec=-1, tag='Generations interval', _type=int))
 
+            self.NbStatesTrace = self.NbStates.trace('w', lambda *args, **kwargs:
+                                                     self.Validate_Field(input=self.inputStates, var=self.NbStates, min=1,
+                                                                         max=1000, ndec=-1, tag='States kept', _type=int))
+
             self.FitScaleTrace = self.FitScale.trace('w', lambda *args, **kwargs:
                                                      self.Validate_Field(input=self.entScale, var=self.FitScale, min=0.00,
                                                                          max=100.00, ndec=2, tag='Fitness scale', _type=float))
@@ -201,6 +217,7 @@ class GAParam(Tabs.Tab):
             self.AGAk4.trace_vdelete('w',self.AGAk4Trace)
             self.NbTopChrom.trace_vdelete('w',self.NbTopChromTrace)
             self.NbGenFreq.trace_vdelete('w',self.NbGenFreqTrace)
+            self.NbStates.trace_vdelete('w',self.NbStatesTrace)
             self.FitScale.trace_vdelete('w',self.FitScaleTrace)
             self.FitPeak.trace_vdelete('w',self.FitPeakTrace)
             self.FitAlpha.trace_vdelete('w',self.FitAlphaTrace)
@@ -324,6 +341,12 @@ class GAParam(Tabs.Tab):
         fVisualLine2.pack(side=TOP, anchor=W, fill=X)
         fVisualLine3 = Frame(fVisual)
         fVisualLine3.pack(side=TOP, anchor=W, fill=X)
+        fVisualLine4 = Frame(fVisual)
+        fVisualLine4.pack(side=TOP, anchor=W, fill=X)
+        fVisualLine5 = Frame(fVisual)
+        fVisualLine5.pack(side=TOP, anchor=W, fill=X)
+        fVisualLine6 = Frame(fVisual)
+        fVisualLine6.pack(side=TOP, anchor=W, fill=X)
 
         Label(fVisualLine1, text='Visual display', font=self.top.font_Title).pack(side=LEFT)
         Label(fVisualLine2, text='Number of TOP complexes:', font=self.top.font_Text, justify=LEFT).pack(side=LEFT)
@@ -334,8 +357,22 @@ class GAParam(Tabs.Tab):
         Label(fVisualLine3, text='Refresh interval:', font=self.top.font_Text).pack(side=LEFT)
         self.inputGenFq = Entry(fVisualLine3, width=5, background='white', justify=CENTER, textvariable=self.NbGenFreq, font=self.top.font_Text)
         self.inputGenFq.pack(side=RIGHT)
+        Checkbutton(fVisualLine3, text=' Adaptive', variable=self.AdaptiveGenFreq, font=self.top.font_Text).pack(side=RIGHT)
         self.ValidNbGenFreq = [1, False, self.inputGenFq]
 
+        Label(fVisualLine4, text='States kept per TOP complex:', font=self.top.font_Text).pack(side=LEFT)
+        self.inputStates = Entry(fVisualLine4, width=5, background='white', justify=CENTER, textvariable=self.NbStates, font=self.top.font_Text)
+        self.inputStates.pack(side=RIGHT)
+        self.ValidNbStates = [1, False, self.inputStates]
+
+        Checkbutton(fVisualLine5, text=' TOP complexes with the binding-site residues only', variable=self.BindingSiteOnly,
+                    font=self.top.font_Text).pack(side=LEFT)
+
+        # Only shown when the FlexAID build honours the NRGSTR line of CONFIG.inp
+        if self.top.Executable_Streams():
+            Checkbutton(fVisualLine6, text=' Progress read from the output of FlexAID (no .update files)', variable=self.StreamStdout,
+                        font=self.top.font_Text).pack(side=LEFT)
+
         ''' ========================================================================== '''        
 
         fFitness = Frame(fPRight)#, borderwidth=2, relief=SUNKEN)
@@ -396,7 +433,7 @@ class GAParam(Tabs.Tab):
         
         Checkbutton(fRepModelLine4, text=' Allow duplicates', variable=self.RepDup, font=self.top.font_Text).pack(side=LEFT)
         
-        self.Validator = [self.ValidNbGen, self.ValidNbGenFreq, self.ValidNbChrom, self.ValidNbTopChrom,
+        self.Validator = [self.ValidNbGen, self.ValidNbGenFreq, self.ValidNbStates, self.ValidNbChrom, self.ValidNbTopChrom,
                           self.ValidCrossRate, self.ValidMutaRate, self.ValidFitAlpha, self.ValidFitPeak,
                           self.ValidFitScale, self.ValidRepSS, #self.ValidRepB, 
                           self.ValidAGAk1, self.ValidAGAk2, self.ValidAGAk3, self.ValidAGAk4]
@@ -0,0 +1,100 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - GeneDecoder.py
+
+@summary: Column schema of the genes printed in the TOP chromosome lines, derived once from
+          the optimization settings (translation, rotation, flexible bonds, flexible side-chains).
+          The lines of a generation are read into one array of genes (a row per chromosome),
+          consumed through named slices of columns.
+
+@contain: GeneDecoder
+
+@organization: Najmanovich Research Group
+'''
+
+import Geometry
+
+
+class GeneDecoder(object):
+
+    '''
+    @summary: top is the Parse thread, once the header of the log (rotamers, shiftval) was read
+    '''
+    def __init__(self, top):
+
+        self.Names = list()
+
+        # Position of the grid vertex of the anchor atom
+        Start = len(self.Names)
+        if top.Translation:
+            self.Names.append('anchor')
+        self.Anchor = slice(Start, len(self.Names))
+
+        # Orientation of the ligand (angle and dihedrals of the first atoms)
+        Start = len(self.Names)
+        if top.Rotation:
+            self.Names.extend([ 'rotation1', 'rotation2', 'rotation3' ])
+        self.Orientation = slice(Start, len(self.Names))
+
+        # Dihedral of each flexible bond of the ligand
+        Start = len(self.Names)
+        if top.FlexStatus != '':
+            for k in sorted(top.dictFlexBonds.keys()):
+                if top.dictFlexBonds[k][0] == 1:
+                    self.Names.append('flexbond' + str(k))
+        self.Flexibility = slice(Start, len(self.Names))
+
+        self.Ligand = slice(0, len(self.Names))
+
+        # Rotamer index of each flexible side-chain (with rotamers accepted)
+        Start = len(self.Names)
+        self.Residues = [ residue for residue in top.listSideChain if top.dictSideChainNRot.get(residue,'') ]
+        self.Names.extend([ 'rotamer' + residue for residue in self.Residues ])
+        self.SideChains = slice(Start, len(self.Names))
+
+        self.NbGenes = len(self.Names)
+
+    '''
+    @summary: SUBROUTINE Decode_Line: genes of a chromosome line starting at colNo
+    '''
+    def Decode_Line(self, Line, colNo):
+
+        # Genes are printed on 10 characters, separated by a space
+        Genes = [ float(Value) for Value in Line[colNo:colNo + 11 * self.NbGenes].split() ]
+
+        if len(Genes) != self.NbGenes:
+            raise ValueError('Chromosome line with ' + str(len(Genes)) + ' gene(s) instead of ' + str(self.NbGenes))
+
+        return Genes
+
+    '''
+    @summary: SUBROUTINE Decode: genes of the (TOP, colNo, Line) chromosomes of a generation
+
+    @return: an array (a list of rows without numpy) with a row of genes per chromosome
+    '''
+    def Decode(self, Lines):
+
+        Genes = [ self.Decode_Line(Line, colNo) for TOP, colNo, Line in Lines ]
+
+        if Geometry.numpy is not None:
+            return Geometry.numpy.array(Genes, dtype=float).reshape(len(Genes), self.NbGenes)
+
+        return Genes
@@ -0,0 +1,267 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - GridVertices.py
+
+@summary: Vertices of the grid reported by FlexAID (Grid[i]=), stored by index as one
+          (N, 3) float32 array grown in chunks.
+
+          The array can be saved to a .npy file (see Manage.Set_GridCache) and memory-mapped
+          by the next simulation on the same binding site instead of parsing the grid again:
+          the vertices reported are then counted and a few of them compared with the saved ones.
+          Only the last grid saved in a complex is kept (see Remove_Others).
+          Without numpy, the vertices are kept in a list and are not saved.
+
+@contain: GridVertices, Load, Remove_Others
+
+@organization: Najmanovich Research Group
+'''
+
+import os
+import glob
+
+import Geometry
+
+# Number of vertices added each time the array is full
+CHUNK = 4096
+
+# Vertices of a saved grid compared with the ones reported, spread over the grid
+NB_CHECKS = 64
+
+# Largest difference of a coordinate with the one reported (printed with 3 decimals)
+TOLERANCE = 0.002
+
+
+class GridVertices(object):
+
+    '''
+    @summary: Array is the vertices of a saved grid (Cached), None for an empty grid
+    '''
+    def __init__(self, Array=None):
+
+        numpy = Geometry.numpy
+
+        self.Cached = Array is not None
+
+        # Vertices set since the last write to the array (written a chunk at a time)
+        self.PendingIndex = list()
+        self.PendingVertex = list()
+
+        # Indices of the saved vertices compared with the ones reported (see Report)
+        self.Checks = set()
+
+        # Vertices reported and compared for a saved grid, and whether one of them differs
+        self.Reported = 0
+        self.Checked = 0
+        self.Mismatch = False
+
+        if self.Cached:
+            self.Array = Array
+            self.Count = len(Array)
+            self.Checks = set(range(0, self.Count, max(1, self.Count // NB_CHECKS)))
+            self.Checks.add(self.Count - 1)
+        elif numpy is not None:
+            self.Array = numpy.zeros((CHUNK, 3), dtype=numpy.float32)
+            self.Count = 0
+        else:
+            self.Array = list()
+            self.Count = 0
+
+    def __len__(self):
+
+        return self.Count
+
+    def __getitem__(self, index):
+
+        if index < 0 or index >= self.Count:
+            raise IndexError('grid vertex ' + str(index) + ' not reported')
+
+        if self.PendingIndex:
+            self.Flush()
+
+        return self.Array[index]
+
+    '''
+    @summary: SUBROUTINE Set: stores the coordinates of the vertex index
+    '''
+    def Set(self, index, x, y, z):
+
+        if index >= self.Count:
+            self.Count = index + 1
+
+        if Geometry.numpy is None:
+            if index >= len(self.Array):
+                self.Grow(index + 1)
+            self.Array[index] = [ x, y, z ]
+            return
+
+        self.PendingIndex.append(index)
+        self.PendingVertex.append((x, y, z))
+
+        if len(self.PendingIndex) == CHUNK:
+            self.Flush()
+
+    '''
+    @summary: SUBROUTINE Flush: writes the vertices set since the last write to the array
+    '''
+    def Flush(self):
+
+        if self.Count > len(self.Array):
+            self.Grow(self.Count)
+
+        self.Array[self.PendingIndex] = self.PendingVertex
+
+        self.PendingIndex = list()
+        self.PendingVertex = list()
+
+    '''
+    @summary: SUBROUTINE Grow: room for Size vertices at least (a chunk more than the double)
+    '''
+    def Grow(self, Size):
+
+        numpy = Geometry.numpy
+
+        if numpy is None:
+            self.Array.extend([ [ 0.0, 0.0, 0.0 ] for i in range(len(self.Array), Size) ])
+            return
+
+        Size = max(Size, 2 * len(self.Array))
+        Size += CHUNK - Size % CHUNK
+
+        Array = numpy.zeros((Size, 3), dtype=numpy.float32)
+        Array[:len(self.Array)] = self.Array
+
+        self.Array = Array
+        self.Cached = False
+
+    '''
+    @summary: SUBROUTINE Report: counts a vertex reported for a saved grid
+
+    @return: True when its coordinates are compared with the saved ones (see Check)
+    '''
+    def Report(self, index):
+
+        self.Reported += 1
+
+        if index >= self.Count:
+            self.Mismatch = True
+            return False
+
+        return index in self.Checks
+
+    '''
+    @summary: SUBROUTINE Check: compares the coordinates reported for the vertex index with the saved ones
+    '''
+    def Check(self, index, x, y, z):
+
+        self.Checked += 1
+
+        Vertex = self.Array[index]
+        if abs(Vertex[0] - x) > TOLERANCE or abs(Vertex[1] - y) > TOLERANCE or abs(Vertex[2] - z) > TOLERANCE:
+            self.Mismatch = True
+
+    '''
+    @summary: SUBROUTINE Is_Valid: the saved grid matches the vertices reported
+                                   (as many vertices and the ones compared are the same)
+    '''
+    def Is_Valid(self):
+
+        return not self.Mismatch and self.Reported == self.Count and self.Checked == len(self.Checks)
+
+    '''
+    @summary: SUBROUTINE Save: writes the vertices to the .npy file Path (replaced once complete)
+
+    @return: 0 when saved or nothing to save (without numpy or vertices), 1 when the file could not be written
+    '''
+    def Save(self, Path):
+
+        numpy = Geometry.numpy
+
+        if numpy is None or not self.Count:
+            return 0
+
+        if self.PendingIndex:
+            self.Flush()
+
+        TmpPath = Path + '.tmp'
+
+        try:
+            out = open(TmpPath, 'wb')
+            try:
+                numpy.save(out, numpy.ascontiguousarray(self.Array[:self.Count]))
+            finally:
+                out.close()
+
+            if os.path.isfile(Path):
+                os.remove(Path)
+            os.rename(TmpPath, Path)
+        except:
+            try:
+                os.remove(TmpPath)
+            except:
+                pass
+            return 1
+
+        return 0
+
+
+'''
+@summary: SUBROUTINE Load: vertices saved to the .npy file Path, memory-mapped
+
+@return: GridVertices (empty when Path is None, missing or not readable)
+'''
+def Load(Path):
+
+    numpy = Geometry.numpy
+
+    if numpy is not None and Path is not None and os.path.isfile(Path):
+        try:
+            Array = numpy.load(Path, mmap_mode='r')
+            if Array.ndim == 2 and Array.shape[1] == 3 and len(Array):
+                return GridVertices(Array)
+        except:
+            pass
+
+    return GridVertices()
+
+'''
+@summary: SUBROUTINE Remove_Others: removes the grids saved next to Path (grid_*.npy of the same complex)
+          once Path is saved, a grid saved on each run would otherwise pile up in the complex
+
+@return: number of grids that could not be removed
+'''
+def Remove_Others(Path):
+
+    Failed = 0
+
+    # Nothing was saved (without numpy or vertices): the other grids are kept
+    if not os.path.isfile(Path):
+        return Failed
+
+    for Other in glob.glob(os.path.join(os.path.dirname(Path), 'grid_*.npy')):
+        if os.path.abspath(Other) == os.path.abspath(Path):
+            continue
+
+        try:
+            os.remove(Other)
+        except:
+            Failed += 1
+
+    return Failed
@@ -0,0 +1,207 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - LogReader.py
+
+@summary: Incremental reader of the files written by FlexAID (log.txt, .update)
+
+@contain: LogReader, StreamReader, Classify
+
+@organization: Najmanovich Research Group
+'''
+
+import os
+import re
+import shutil
+import Queue
+
+
+# Records written by FlexAID, keyed on the first 4 characters of the line
+RECORDS = { 'Grid': ('GRID',       re.compile(r'Grid\[(\d+)\]=')),
+            'Gene': ('GENERATION', re.compile(r'Generation:\s*(\d+)\s+')),
+            'best': ('BESTBY',     re.compile(r'best by (\w+)\s+')),
+            'clus': ('CLUSTERING', re.compile(r'clustering all individuals')),
+            'Rota': ('ROTAMER',    re.compile(r'Rotamer for')),
+            'shif': ('SHIFTVAL',   re.compile(r'shiftval=')),
+            'lout': ('LOUT',       re.compile(r'lout\[\d+\]=\s*(\d+)\s+')),
+            'the ': ('CENTER',     re.compile(r'the protein center of coordinates is:\s+(\S+)\s+(\S+)\s+(\S+)\s+')),
+            'SIGM': ('SIGMASHARE', re.compile(r'SIGMA_SHARE')),
+            'ERRO': ('ERROR',      re.compile(r'ERROR')) }
+
+# Chromosome lines start with the TOP index (e.g.    3 (   4868.00 ...)
+CHROMOSOME = re.compile(r'(\s*(\d+) \()')
+
+'''
+@summary: SUBROUTINE Classify: Returns the type of record of a line and its match object
+                               or (None, None) when the line is not a known record
+'''
+def Classify(Line):
+
+    Record = RECORDS.get(Line[:4])
+
+    if Record is not None:
+        m = Record[1].match(Line)
+        if m:
+            return Record[0], m
+
+    else:
+        m = CHROMOSOME.match(Line)
+        if m:
+            return 'CHROMOSOME', m
+
+    return None, None
+
+
+class LogReader(object):
+
+    # Size of the chunks read at once
+    BLOCKSIZE = 65536
+
+    def __init__(self, CopyFile=None):
+
+        # When set, the parse file is first copied to CopyFile before being read
+        # (for platforms where FlexAID holds a lock on the files it writes)
+        self.CopyFile = CopyFile
+
+        # Byte offset and incomplete trailing line of each parse file
+        self.Offset = dict()
+        self.Partial = dict()
+
+    '''
+    @summary: SUBROUTINE Reset: Forgets the position reached in a parse file
+    '''
+    def Reset(self, ParseFile):
+
+        self.Offset[ParseFile] = 0
+        self.Partial[ParseFile] = ''
+
+    '''
+    @summary: SUBROUTINE Read: Returns the complete lines appended to ParseFile since the last read
+              raises IOError/OSError when the file cannot be accessed
+    '''
+    def Read(self, ParseFile):
+
+        Offset = self.Offset.get(ParseFile, 0)
+
+        ReadFile = ParseFile
+        if self.CopyFile:
+            shutil.copy(ParseFile, self.CopyFile)
+            ReadFile = self.CopyFile
+
+        # File was truncated or replaced by a shorter one
+        if os.path.getsize(ReadFile) < Offset:
+            self.Reset(ParseFile)
+            Offset = 0
+
+        readhandle = open(ReadFile, 'rb')
+        try:
+            readhandle.seek(Offset)
+            Chunks = list()
+            while True:
+                Chunk = readhandle.read(self.BLOCKSIZE)
+                if not Chunk:
+                    break
+                Chunks.append(Chunk)
+        finally:
+            readhandle.close()
+
+        Data = ''.join(Chunks)
+        self.Offset[ParseFile] = Offset + len(Data)
+
+        Data = self.Partial.get(ParseFile, '') + Data
+
+        # Lines not terminated yet are kept until the next read
+        End = Data.rfind('\n') + 1
+        self.Partial[ParseFile] = Data[End:]
+
+        Data = Data[:End]
+        if '\r' in Data:
+            Data = Data.replace('\r\n', '\n')
+
+        return Data.splitlines(True)
+
+
+class StreamReader(object):
+
+    def __init__(self):
+
+        # Lines fed by the thread reading the stdout of FlexAID
+        self.queue = Queue.Queue()
+        self.Pending = list()
+
+    '''
+    @summary: SUBROUTINE Feed: Adds a line read from the pipe (called from the reading thread)
+    '''
+    def Feed(self, Line):
+
+        self.queue.put(Line)
+
+    '''
+    @summary: SUBROUTINE Reset: Nothing to forget, the stream is consumed as it is read
+    '''
+    def Reset(self, ParseFile):
+
+        return
+
+    '''
+    @summary: SUBROUTINE Read: Returns the lines received since the last read (ParseFile is ignored)
+    '''
+    def Read(self, ParseFile):
+
+        Lines = self.Pending
+        self.Pending = list()
+
+        while True:
+            try:
+                Lines.append(self.queue.get_nowait())
+            except Queue.Empty:
+                break
+
+        # None is only used to wake up a Wait
+        return [ Line for Line in Lines if Line is not None ]
+
+    '''
+    @summary: SUBROUTINE Wait: Blocks until a line is received, Wake is called or Timeout elapsed
+              (the lines already received are not read while the parsing is paused: still blocks)
+
+    @return: True when lines are waiting to be read
+    '''
+    def Wait(self, Timeout):
+
+        try:
+            self.Pending.append(self.queue.get(True, Timeout))
+        except Queue.Empty:
+            pass
+
+        return len(self.Pending) > 0
+
+    '''
+    @summary: SUBROUTINE Wake: Interrupts the current (or next) Wait
+    '''
+    def Wake(self):
+
+        self.queue.put(None)
+
+    '''
+    @summary: SUBROUTINE Close: Nothing to release
+    '''
+    def Close(self):
+
+        return
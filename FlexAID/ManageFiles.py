@@ -35,6 +35,9 @@ if __debug__:
 class Manage(object):
 
     NUMBER_RESULTS = 10
+
+    # Buffer of the grid of FlexAID (GRDBUF)
+    GRID_BUFFER = 1000
     
     def __init__(self, top):
         
@@ -60,8 +63,12 @@ class Manage(object):
         self.VarAtoms = list()
         self.listTmpPDB = list()
         self.RecAtom = dict()
+        self.AtomTypes = dict()
         self.DisAngDih = dict()
         self.dictCoordRef = dict()
+
+        # Grid of the binding site saved between simulations (see Set_GridCache)
+        self.GRIDCACHE = None
         
     ''' ==============================================================================
     @summary: Reference_Folders: Create folder references with the now timestamp
@@ -86,6 +93,12 @@ class Manage(object):
         self.CONFIG = os.path.join(self.FlexAIDRunSimulationProject_Dir,'CONFIG.inp')
         self.ga_inp = os.path.join(self.FlexAIDRunSimulationProject_Dir,'ga_inp.dat')
         self.Report = os.path.join(self.FlexAIDRunSimulationProject_Dir,'report.txt')
+
+        # Genes and scores of every generation (see Trajectory)
+        self.TRAJECTORY = os.path.join(self.FlexAIDRunSimulationProject_Dir,'trajectory.nrgtrj')
+
+        # CF information of the result files (see Write_ResultIndex)
+        self.RESULTINDEX = os.path.join(self.FlexAIDRunSimulationProject_Dir,'results.idx')
         
     ''' ==============================================================================
     @summary: Create_Folders: Creation AND/OR copy of the required files  
@@ -162,25 +175,42 @@ class Manage(object):
 
         return True
 
+    ''' ==============================================================================
+    @summary: : Write_ResultIndex: Writes the CF information of the results files once the
+                                   simulation terminated (read back by Load_ResultFiles)
+    ============================================================================== '''          
+    def Write_ResultIndex(self):
+        
+        Results = list()
+        
+        pattern = os.path.join(self.FlexAIDRunSimulationProject_Dir,'RESULT_*.pdb')
+        for file in sorted(glob.glob(pattern)):
+            Results.append(Result.Result(file, 0))
+        
+        return Result.Write_Index(self.RESULTINDEX, Results)
+    
     ''' ==============================================================================
     @summary: : Load_ResultFiles: Loads the results files after a simulation terminated
+                                  (from the result index, the files not indexed are read)
     ============================================================================== '''          
     def Load_ResultFiles(self):
         
+        dictSummary = Result.Read_Index(self.RESULTINDEX)
+        
         pattern = os.path.join(self.FlexAIDRunSimulationProject_Dir,'RESULT_*')
         for file in glob.glob(pattern):
             
             m = re.search("RESULT_(\d+)\.pdb$", file)
             if m:
                 TOP = int(m.group(1)) + 1
-                Res = Result.Result(file, TOP)
+                Res = Result.Result(file, TOP, dictSummary.get(file))
                 
                 self.top.ResultsContainer.Results.append(Res)
                 continue
             
             m = re.search("RESULT_INI\.pdb$", file)
             if m:
-                Res = Result.Result(file, 'REF')
+                Res = Result.Result(file, 'REF', dictSummary.get(file))
                 
                 if self.Config2.UseReference.get():
                     self.top.ResultsContainer.Results.append(Res)
@@ -329,8 +359,11 @@ class Manage(object):
         
         # nrgsuite related variables
         lines += 'NRGSUI' + '\n'
+        if self.top.StreamStdout:
+            # generations are printed on stdout (no .update handshake)
+            lines += 'NRGSTR' + '\n'
         lines += 'NRGOUT 60' + '\n'
-        lines += 'GRDBUF 1000' + '\n'
+        lines += 'GRDBUF ' + str(self.GRID_BUFFER) + '\n'
         
         lines += 'ENDINP\n'
 
@@ -381,6 +414,55 @@ class Manage(object):
 
         return hasher.digest()
 
+    ''' ==================================================================================
+    @summary: Hash_BindingSite: Hashes the options the grid of FlexAID depends on (the target, the binding
+              site, the flexible side-chains, the permeability, the heteroatoms, the spacing and the buffer),
+              once the CONFIG is created
+    ================================================================================== '''
+    def Hash_BindingSite(self):
+
+        hasher = hashlib.md5()
+
+        hasher = General.hashfile_update(self.IOFile.ProcessedTargetPath.get(), hasher)
+
+        rngOpt = self.Config1.RngOpt.get()
+
+        if rngOpt == 'LOCCEN':
+            line = 'RNGOPT LOCCEN'
+            line += ' %.3f' % self.Config1.Vars.BindingSite.Sphere.Center[0]
+            line += ' %.3f' % self.Config1.Vars.BindingSite.Sphere.Center[1]
+            line += ' %.3f' % self.Config1.Vars.BindingSite.Sphere.Center[2]
+            line += ' %.3f\n' % self.Config1.Vars.BindingSite.Sphere.Radius
+
+            hasher.update(line)
+
+        elif rngOpt == 'LOCCLF':
+            hasher = General.hashfile_update(self.BINDINGSITE, hasher)
+
+        if self.Config1.Vars.TargetFlex.Count_SideChain() > 0:
+            hasher.update(self.Print_FLEXSC())
+
+        hasher.update(self.Print_PERMEA())
+        hasher.update(self.Print_HET())
+
+        hasher.update('SPACER ' + self.Config3.GridSpacing.get() + '\n')
+        hasher.update('GRDBUF ' + str(self.GRID_BUFFER) + '\n')
+
+        return hasher.hexdigest()
+
+    ''' ==================================================================================
+    @summary: Set_GridCache: Path of the grid saved for the binding site and spacing of the simulation
+              (shared by the simulations of the complex)
+    ================================================================================== '''
+    def Set_GridCache(self):
+
+        try:
+            self.GRIDCACHE = os.path.join(self.FlexAID.FlexAIDSimulationProject_Dir,self.COMPLEX,
+                                          'grid_' + self.Hash_BindingSite() + '_' +
+                                          self.Config3.GridSpacing.get() + '.npy')
+        except:
+            self.GRIDCACHE = None
+
     ''' ==================================================================================
     @summary: Create_CONFIG: Creation of the CONFIG.inp
     ================================================================================== '''
@@ -641,11 +723,12 @@ class Manage(object):
             self.listTmpPDB.append(os.path.join(self.FlexAID.FlexAIDTempProject_Dir,'LIGAND' + str(i) + '.pdb'))
         
     ''' ==================================================================================
-    FUNCTION Get_RecAtom: Create a dictionary containing the atoms neighbours
+    FUNCTION Get_RecAtom: Create a dictionary containing the atoms neighbours (and their types)
     ==================================================================================  '''
     def Get_RecAtom(self):
     
         self.RecAtom.clear()
+        self.AtomTypes.clear()
 
         try:
             file = open(self.IOFile.ProcessedLigandINPPath.get())
@@ -657,6 +740,7 @@ class Manage(object):
                 if line.startswith('HETTYP'):
                     noLine = int(line[6:11])
                     self.RecAtom[noLine] = [int(line[21:26]), int(line[26:31]), int(line[31:36])]
+                    self.AtomTypes[noLine] = line[11:13].strip()
         except:
             return 1
                 
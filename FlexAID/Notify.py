@@ -0,0 +1,273 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - Notify.py
+
+@summary: Wakes up the parsing thread when the files written by FlexAID change.
+          Uses inotify on Linux when available, an adaptive poller otherwise.
+
+@contain: Create_Watcher, InotifyWatcher, PollWatcher
+
+@organization: Najmanovich Research Group
+'''
+
+import os
+import sys
+import errno
+import select
+import struct
+import threading
+import time
+
+# inotify events (see inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+'''
+@summary: SUBROUTINE Create_Watcher: Returns a watcher over the files given
+'''
+def Create_Watcher(Files):
+
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(Files)
+        except (OSError, IOError, AttributeError):
+            pass
+
+    return PollWatcher(Files)
+
+
+class InotifyWatcher(object):
+
+    def __init__(self, Files):
+
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        # Watch the directories of the files, the files themselves come and go
+        self.Names = dict()
+        for File in Files:
+            Dir, Name = os.path.split(os.path.abspath(File))
+            self.Names.setdefault(Dir, set()).add(Name)
+
+        self.Watches = dict()
+        for Dir in self.Names.keys():
+            Path = Dir
+            if not isinstance(Path, bytes):
+                Path = Path.encode(sys.getfilesystemencoding())
+
+            wd = self.libc.inotify_add_watch(self.fd, Path, IN_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(err, 'inotify_add_watch failed on ' + Dir)
+
+            self.Watches[wd] = Dir
+
+        # Self-pipe used to interrupt a wait from another thread
+        self.WakeRead, self.WakeWrite = os.pipe()
+
+        # Wake (starting thread) and Close (parsing thread) may run at the same time:
+        # the pipe is never written once closed, its descriptor could be reused
+        self.Lock = threading.Lock()
+        self.Closed = False
+
+    '''
+    @summary: SUBROUTINE Wait: Blocks until a watched file changes, Wake is called
+              or Timeout seconds elapsed. Returns True when woken by an event.
+    '''
+    def Wait(self, Timeout):
+
+        try:
+            Ready = select.select([self.fd, self.WakeRead], [], [], Timeout)[0]
+        except select.error as e:
+            if e.args[0] == errno.EINTR:
+                return False
+            raise
+
+        Changed = False
+
+        if self.WakeRead in Ready:
+            os.read(self.WakeRead, 512)
+            Changed = True
+
+        if self.fd in Ready:
+            Changed = self.Drain() or Changed
+
+        return Changed
+
+    '''
+    @summary: SUBROUTINE Drain: Reads pending events, returns True if one concerns a watched file
+    '''
+    def Drain(self):
+
+        Changed = False
+
+        while True:
+            try:
+                Buffer = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    break
+                raise
+
+            if not Buffer:
+                break
+
+            Offset = 0
+            while Offset < len(Buffer):
+                wd, mask, cookie, length = struct.unpack_from('iIII', Buffer, Offset)
+                Offset += 16
+
+                Name = Buffer[Offset:Offset+length].rstrip(b'\0')
+                Offset += length
+
+                Dir = self.Watches.get(wd)
+                if Dir is None:
+                    continue
+
+                if not isinstance(Name, str):
+                    Name = Name.decode(sys.getfilesystemencoding())
+
+                if Name in self.Names[Dir]:
+                    Changed = True
+
+        return Changed
+
+    '''
+    @summary: SUBROUTINE Wake: Interrupts the current (or next) Wait
+    '''
+    def Wake(self):
+
+        self.Lock.acquire()
+        try:
+            if not self.Closed:
+                try:
+                    os.write(self.WakeWrite, b'w')
+                except OSError:
+                    pass
+        finally:
+            self.Lock.release()
+
+    '''
+    @summary: SUBROUTINE Close: Releases the inotify resources (a Wake that follows does nothing)
+    '''
+    def Close(self):
+
+        self.Lock.acquire()
+        try:
+            if self.Closed:
+                return
+
+            self.Closed = True
+
+            for fd in (self.fd, self.WakeRead, self.WakeWrite):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+            self.fd = self.WakeRead = self.WakeWrite = None
+        finally:
+            self.Lock.release()
+
+
+class PollWatcher(object):
+
+    # Polling interval grows from MIN_INTERVAL up to MAX_INTERVAL while nothing changes
+    MIN_INTERVAL = 0.005
+    MAX_INTERVAL = 0.25
+
+    def __init__(self, Files):
+
+        self.Files = list(Files)
+        self.Interval = self.MIN_INTERVAL
+        self.Woken = threading.Event()
+
+        self.Snapshot = self.Stat()
+
+    '''
+    @summary: SUBROUTINE Stat: Returns the (size, mtime) of each watched file
+    '''
+    def Stat(self):
+
+        Snapshot = list()
+        for File in self.Files:
+            try:
+                st = os.stat(File)
+                Snapshot.append((st.st_size, st.st_mtime))
+            except OSError:
+                Snapshot.append(None)
+
+        return Snapshot
+
+    '''
+    @summary: SUBROUTINE Wait: Blocks until a watched file changes, Wake is called
+              or Timeout seconds elapsed. Returns True when woken by an event.
+    '''
+    def Wait(self, Timeout):
+
+        Deadline = time.time() + Timeout
+
+        while True:
+            Snapshot = self.Stat()
+            if Snapshot != self.Snapshot:
+                self.Snapshot = Snapshot
+                self.Interval = self.MIN_INTERVAL
+                return True
+
+            Remaining = Deadline - time.time()
+            if Remaining <= 0.0:
+                return False
+
+            self.Woken.wait(min(self.Interval, Remaining))
+            if self.Woken.isSet():
+                self.Woken.clear()
+                self.Interval = self.MIN_INTERVAL
+                return True
+
+            self.Interval = min(self.Interval * 2.0, self.MAX_INTERVAL)
+
+    '''
+    @summary: SUBROUTINE Wake: Interrupts the current (or next) Wait
+    '''
+    def Wake(self):
+
+        self.Woken.set()
+
+    '''
+    @summary: SUBROUTINE Close: Nothing to release
+    '''
+    def Close(self):
+
+        return
@@ -0,0 +1,130 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - RMSDPlan.py
+
+@summary: One-time compilation of the RMSD of the poses of a generation to the reference pose
+          of the ligand: reference coordinates in build order and, optionally, the automorphisms
+          of the ligand (symmetric atoms may swap places without changing the pose).
+          The RMSD of all the poses is then computed in one call (see Geometry.rmsd_population).
+
+@contain: RMSDPlan
+
+@organization: Najmanovich Research Group
+'''
+
+import Geometry
+
+# Most automorphisms considered (highly symmetric ligands are not searched further)
+MAX_AUTOMORPHISMS = 1000
+
+# Longest bond closing a ring of the ligand in the reference pose
+BOND_LENGTH = 2.0
+
+
+class RMSDPlan(object):
+
+    '''
+    @summary: top is the Parse thread, once the reconstruction plan was compiled (see Parse_SigmaShare).
+              With Symmetry, the automorphisms of the ligand are computed from the HETTYP neighbour table
+    '''
+    def __init__(self, top, Symmetry=False):
+
+        self.ListAtom = list(top.Plan.ListAtom)
+
+        # Reference coordinates in build order (None when an atom has none)
+        self.Reference = None
+        if not [ NoAtom for NoAtom in self.ListAtom if NoAtom not in top.dictCoordRef ]:
+            self.Reference = [ list(top.dictCoordRef[NoAtom]) for NoAtom in self.ListAtom ]
+
+        # Orderings of the reference atoms compared to each pose
+        self.Permutations = None
+
+        if Symmetry and self.Reference is not None:
+            Labels = [ top.AtomTypes.get(NoAtom, '') for NoAtom in self.ListAtom ]
+            self.Permutations = Geometry.automorphisms(self.Get_Neighbours(top), Labels, MAX_AUTOMORPHISMS)
+
+    '''
+    @summary: SUBROUTINE Get_Neighbours: positions (build order) of the atoms bonded to each atom
+    '''
+    def Get_Neighbours(self, top):
+
+        tot = len(self.ListAtom)
+
+        Index = dict()
+        for an in range(0, tot):
+            Index[self.ListAtom[an]] = an
+
+        Neighbours = [ set() for an in range(0, tot) ]
+
+        # Each atom is built on an atom bonded to it (its first neighbour)
+        for an in range(0, tot):
+            Parent = top.RecAtom[self.ListAtom[an]][0]
+            if Parent in Index:
+                Neighbours[an].add(Index[Parent])
+                Neighbours[Index[Parent]].add(an)
+
+        # Bonds closing the rings are not in the table: found in the reference pose
+        Hydrogens = self.Get_Hydrogens(top.ReferenceLines)
+        Limit = BOND_LENGTH * BOND_LENGTH
+
+        for an in range(0, tot - 1):
+
+            # The atoms following an are compared to it at once
+            SqrDist = Geometry.sqrdistance_batch(self.Reference[an + 1:], self.Reference[an])
+
+            for bn, sqrdist in zip(range(an + 1, tot), SqrDist):
+                if sqrdist >= Limit:
+                    continue
+                if self.ListAtom[an] in Hydrogens and self.ListAtom[bn] in Hydrogens:
+                    continue
+                Neighbours[an].add(bn)
+                Neighbours[bn].add(an)
+
+        return Neighbours
+
+    '''
+    @summary: SUBROUTINE Get_Hydrogens: numbers of the hydrogen atoms of the reference
+    '''
+    def Get_Hydrogens(self, ReferenceLines):
+
+        Hydrogens = set()
+
+        for Line in ReferenceLines:
+            if Line.startswith('HETATM') or Line.startswith('ATOM'):
+                Element = Line[76:78].strip()
+                if not Element:
+                    Element = Line[12:16].strip()[:1]
+                if Element.upper() == 'H':
+                    Hydrogens.add(int(Line[6:11]))
+
+        return Hydrogens
+
+    '''
+    @summary: SUBROUTINE Compute: RMSD of the poses of a generation (see Geometry.buildcc_coords)
+
+    @return: list of the RMSD of each pose ('N/A' without reference coordinates)
+    '''
+    def Compute(self, Coords):
+
+        if self.Reference is None:
+            return [ 'N/A' ] * len(Coords)
+
+        return Geometry.rmsd_population(Coords, self.Reference, self.Permutations)
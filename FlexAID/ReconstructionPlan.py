@@ -0,0 +1,341 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - ReconstructionPlan.py
+
+@summary: One-time compilation of how the ligand genes of a chromosome are turned into
+          internal coordinates (distance/angle/dihedral) of the ligand atoms.
+          Decoding the ligand genes of a chromosome (see GeneDecoder) is then a series of array writes.
+          The last pose built for each TOP is kept so that only the atoms that moved are built again.
+
+@contain: ReconstructionPlan, PoseCache
+
+@organization: Najmanovich Research Group
+'''
+
+import Geometry
+
+# Kind of each gene column
+GENE_ANCHOR = 0
+GENE_VALUE = 1
+
+
+class ReconstructionPlan(object):
+
+    '''
+    @summary: top is the Parse thread, once the header of the log (lout, shiftval, grid, center) was read
+    '''
+    def __init__(self, top):
+
+        self.ListAtom = list(top.ListAtom)
+        self.Ori = list(top.Ori)
+        self.OriX = list(top.OriX)
+        self.OriY = list(top.OriY)
+        self.GridVertex = top.GridVertex
+
+        tot = len(self.ListAtom)
+
+        # Slot of each atom in the build order
+        self.Index = dict()
+        for an in range(0, tot):
+            self.Index[self.ListAtom[an]] = an
+
+        # Index of the 3 neighbours of each atom (see Geometry.build_parents)
+        self.Parents = Geometry.build_parents(self.ListAtom, top.RecAtom)
+
+        # Internal coordinates of the atoms in build order, overwritten by the genes
+        self.IC = [ [ float(Value) for Value in top.DisAngDih[NoAtom] ] for NoAtom in self.ListAtom ]
+        if Geometry.numpy is not None:
+            self.Parents = Geometry.numpy.array(self.Parents, dtype=int)
+            self.IC = Geometry.numpy.array(self.IC, dtype=float)
+
+        # Gene columns: (kind, slot, writes) where writes are (slot, value index, offset)
+        self.Columns = list()
+
+        # Internal coordinates of the anchor atom for each grid vertex already seen
+        self.dictAnchorIC = dict()
+
+        if top.Translation:
+            self.Compile_AnchorPoint(top)
+
+        if top.Rotation:
+            self.Compile_Orientation(top)
+
+        if top.FlexStatus != '':
+            self.Compile_Flexibility(top)
+
+        if Geometry.numpy is not None:
+            self.Compile_Population()
+
+    '''
+    @summary: SUBROUTINE Compile_AnchorPoint: the grid index gene sets the 3 values of the anchor atom
+    '''
+    def Compile_AnchorPoint(self, top):
+
+        self.Columns.append((GENE_ANCHOR, self.Index[top.VarAtoms[0]], ()))
+
+    '''
+    @summary: SUBROUTINE Compile_Orientation: the 3 rotation genes set the angle/dihedral of the first atoms
+    '''
+    def Compile_Orientation(self, top):
+
+        self.Columns.append((GENE_VALUE, None, ((self.Index[top.VarAtoms[1]], 1, 0.0),)))
+        self.Columns.append((GENE_VALUE, None, ((self.Index[top.VarAtoms[1]], 2, 0.0),)))
+        self.Columns.append((GENE_VALUE, None, ((self.Index[top.VarAtoms[2]], 2, 0.0),)))
+
+    '''
+    @summary: SUBROUTINE Compile_Flexibility: each flexible bond gene sets the dihedral of the atoms
+              defining the bond, shifted by the constant angles (shiftval) between them.
+              The shifts are summed along the atoms once (subtracted for a pair reported
+              the other way), so decoding a gene is one add per atom.
+    '''
+    def Compile_Flexibility(self, top):
+
+        dictFlexBonds = top.dictFlexBonds
+
+        for k in sorted(dictFlexBonds.keys()):
+
+            if dictFlexBonds[k][0] != 1:
+                continue
+
+            Writes = [ (self.Index[int(dictFlexBonds[k][3])], 2, 0.0) ]
+
+            Offset = 0.0
+            for flexA in range(1, dictFlexBonds[k][2]):
+
+                ATflex_A = dictFlexBonds[k][flexA + 2]
+                ATflex_B = dictFlexBonds[k][flexA + 3]
+
+                if top.FixedAngle.has_key(ATflex_A + ATflex_B):
+                    Offset += float(top.FixedAngle[ATflex_A + ATflex_B])
+                elif top.FixedAngle.has_key(ATflex_B + ATflex_A):
+                    Offset -= float(top.FixedAngle[ATflex_B + ATflex_A])
+                else:
+                    continue
+
+                Writes.append((self.Index[int(ATflex_B)], 2, Offset))
+
+            self.Columns.append((GENE_VALUE, None, tuple(Writes)))
+
+    '''
+    @summary: SUBROUTINE Compile_Population: the writes of all the value genes as arrays (see Decode_Population).
+              Only the last write of a value is kept, as it overwrites the ones before.
+    '''
+    def Compile_Population(self):
+
+        self.AnchorColumn = None
+        self.AnchorSlot = None
+
+        dictWrite = dict()
+        for Column in range(len(self.Columns)):
+            Kind, Slot, Writes = self.Columns[Column]
+
+            if Kind == GENE_ANCHOR:
+                self.AnchorColumn = Column
+                self.AnchorSlot = Slot
+            else:
+                for Slot, k, Offset in Writes:
+                    dictWrite[(Slot, k)] = (Column, Offset)
+
+        Targets = sorted(dictWrite.keys())
+
+        numpy = Geometry.numpy
+        self.WriteSlot = numpy.array([ Slot for Slot, k in Targets ], dtype=int)
+        self.WriteValue = numpy.array([ k for Slot, k in Targets ], dtype=int)
+        self.WriteColumn = numpy.array([ dictWrite[Target][0] for Target in Targets ], dtype=int)
+        self.WriteOffset = numpy.array([ dictWrite[Target][1] for Target in Targets ], dtype=float)
+
+    '''
+    @summary: SUBROUTINE Get_AnchorIC: internal coordinates of the anchor atom placed on a grid vertex
+    '''
+    def Get_AnchorIC(self, index):
+
+        IC = self.dictAnchorIC.get(index)
+
+        if IC is None:
+            pointA = self.GridVertex[index]
+
+            # A vertex on the axis of OriX and Ori has no dihedral (any value places it there)
+            try:
+                Dihedral = Geometry.dihedralAngle(pointA, self.OriX, self.Ori, self.OriY)
+            except ZeroDivisionError:
+                Dihedral = 0.0
+
+            IC = ( Geometry.distance(pointA, self.OriX),
+                   Geometry.angle(pointA, self.OriX, self.Ori),
+                   Dihedral )
+
+            self.dictAnchorIC[index] = IC
+
+        return IC
+
+    '''
+    @summary: SUBROUTINE Get_AnchorICs: internal coordinates of the anchor atom placed on grid vertices
+                                        (the vertices not seen yet are computed at once)
+    '''
+    def Get_AnchorICs(self, Indexes):
+
+        New = [ index for index in set(Indexes) if index not in self.dictAnchorIC ]
+
+        if New:
+            Points = [ self.GridVertex[index] for index in New ]
+
+            Distances = Geometry.distance_batch(Points, self.OriX)
+            Angles = Geometry.angle_batch(Points, self.OriX, self.Ori)
+            Dihedrals = Geometry.dihedralAngle_batch(Points, self.OriX, self.Ori, self.OriY)
+
+            for index, Distance, Angle, Dihedral in zip(New, Distances, Angles, Dihedrals):
+                self.dictAnchorIC[index] = ( float(Distance), float(Angle), float(Dihedral) )
+
+        return [ self.dictAnchorIC[index] for index in Indexes ]
+
+    '''
+    @summary: SUBROUTINE Decode: applies the ligand genes of a chromosome (GeneDecoder.Ligand columns)
+
+    @return: internal coordinates of the pose in build order (a copy)
+    '''
+    def Decode(self, Genes):
+
+        IC = self.IC
+
+        for Column, Value in zip(self.Columns, Genes):
+
+            Kind, Slot, Writes = Column
+
+            if Kind == GENE_ANCHOR:
+                IC[Slot][0], IC[Slot][1], IC[Slot][2] = self.Get_AnchorIC(int(Value))
+            else:
+                for Slot, k, Offset in Writes:
+                    IC[Slot][k] = Value + Offset
+
+        if Geometry.numpy is not None:
+            return IC.copy()
+
+        return [ tuple(Values) for Values in IC ]
+
+    '''
+    @summary: SUBROUTINE Decode_Population: applies the ligand genes of the chromosomes of a generation
+              (a row of GeneDecoder.Ligand columns per chromosome)
+
+    @return: internal coordinates of the poses in build order (an array of N poses with numpy)
+    '''
+    def Decode_Population(self, Genes):
+
+        numpy = Geometry.numpy
+        if numpy is None:
+            return [ self.Decode(Row) for Row in Genes ]
+
+        Genes = numpy.asarray(Genes, dtype=float)
+        N = len(Genes)
+
+        ICs = numpy.empty((N,) + self.IC.shape)
+        ICs[:] = self.IC
+
+        if not N:
+            return ICs
+
+        if self.AnchorColumn is not None:
+            ICs[:,self.AnchorSlot] = self.Get_AnchorICs([ int(index) for index in Genes[:,self.AnchorColumn] ])
+
+        ICs[:,self.WriteSlot,self.WriteValue] = Genes[:,self.WriteColumn] + self.WriteOffset
+
+        return ICs
+
+
+class PoseCache(object):
+
+    '''
+    @summary: Last pose built for each TOP with the plan (see ReconstructionPlan). A new pose of a TOP
+              only builds again the atoms whose internal coordinates changed and the atoms built on them.
+    '''
+    def __init__(self, Plan, RecAtom):
+
+        self.Plan = Plan
+        self.RecAtom = RecAtom
+
+        # Internal coordinates and coordinates (with the reference points) of the last pose of each TOP
+        self.dictPose = dict()
+
+        self.NbPoses = 0
+        self.NbUnchanged = 0
+        self.NbAtoms = 0
+        self.NbBuilt = 0
+
+    '''
+    @summary: SUBROUTINE Build: coordinates of the poses of TOPs from their internal coordinates
+                                (see ReconstructionPlan.Decode_Population)
+
+    @return: (N, tot, 3) numpy array of the coordinates in ListAtom order (lists without numpy)
+    '''
+    def Build(self, TOPs, ICs):
+
+        numpy = Geometry.numpy
+        Plan = self.Plan
+
+        tot = len(Plan.ListAtom)
+        N = len(TOPs)
+
+        self.NbPoses += N
+        self.NbAtoms += N * tot
+
+        # Without numpy, every atom is built
+        if numpy is None:
+            self.NbBuilt += N * tot
+            return Geometry.buildcc_coords(Plan.ListAtom, self.RecAtom, ICs, Plan.Ori, Plan.Parents)
+
+        ICs = numpy.asarray(ICs, dtype=float)
+
+        # A TOP never built compares unequal to everything (NaN)
+        Previous = numpy.empty(ICs.shape)
+        Previous[:] = numpy.nan
+
+        Coords = numpy.empty((N, tot + 3, 3))
+        Coords[:,tot:] = Geometry.build_origin(Plan.Ori)
+
+        for n in range(N):
+            Pose = self.dictPose.get(TOPs[n])
+            if Pose is not None:
+                Previous[n] = Pose[0]
+                Coords[n] = Pose[1]
+
+        Rebuild = Geometry.build_downstream(Plan.Parents, (ICs != Previous).any(axis=2))
+
+        Built = 0
+        if Rebuild.any():
+            Built = Geometry.buildcc_rebuild(Coords, ICs, Plan.Parents, Rebuild)
+
+        self.NbBuilt += Built
+        self.NbUnchanged += N - int(Rebuild.any(axis=1).sum())
+
+        for n in range(N):
+            self.dictPose[TOPs[n]] = (ICs[n], Coords[n])
+
+        return Coords[:,:tot]
+
+    '''
+    @summary: SUBROUTINE Get_Stats: summary of the atoms built (None when nothing was built)
+    '''
+    def Get_Stats(self):
+
+        if not self.NbAtoms:
+            return None
+
+        return '%d of %d ligand atom(s) built (%.1f%%), %d of %d pose(s) unchanged' % (
+                self.NbBuilt, self.NbAtoms, 100.0 * self.NbBuilt / self.NbAtoms, self.NbUnchanged, self.NbPoses)
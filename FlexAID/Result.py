@@ -19,8 +19,17 @@
 
 from Tkinter import *
 
+import os
 import re
 
+# Header of the index of the results of a run (see Write_Index)
+INDEX_HEADER = '# NRGsuite result index 1'
+
+# REMARK lines of the header of a result file
+OPTIMIZABLE = re.compile('optimizable residue (.{3}) (.) (.{4})')
+TERM = re.compile('CF(\.app|\.con|\.wal|\.sas|\.com)?=\s*(\S+)')
+RMSD = re.compile('(\S+) RMSD to ref\. structure')
+
 
 class CF(object):
 
@@ -48,7 +57,7 @@ class Result(object):
         self.ResultID = 0
         self.ResultFile = ''
     
-    def __init__(self, ResultFile, ResultID):
+    def __init__(self, ResultFile, ResultID, Summary=None):
     
         self.CF = 'N/A'
         self.CFapp = 'N/A'
@@ -60,9 +69,13 @@ class Result(object):
         self.ResultID = ResultID
         self.ResultFile = ResultFile
         
-        self.get_CF_info()
+        # The values of the result index are used instead of reading the file (see Read_Index)
+        if Summary is not None:
+            self.set_Summary(Summary)
+        else:
+            self.get_CF_info()
         
-    # Reads the physical file to retrieve the CF information
+    # Reads the header of the physical file to retrieve the CF information
     def get_CF_info(self):
     
         if self.ResultFile:
@@ -72,9 +85,6 @@ class Result(object):
             except IOError:
                 return
             
-            Lines = fh.readlines()
-            fh.close()
-            
             '''
             REMARK CF.app=-845.79439
             REMARK optimizable residue LIG   9999
@@ -84,66 +94,179 @@ class Result(object):
             REMARK CF.con= 0.00000
             '''
             
-            for Line in Lines:
-                
-                if re.match('REMARK', Line):
-                    
-                    m = re.search('optimizable residue (.{3}) (.) (.{4})', Line)
-                    if m:
-                        Res = m.group(1)
-                        C = m.group(2)
-                        Num = m.group(3)
-                        
-                        if C == ' ':
-                            C = '-'
-                        
-                        Res = Res.replace(' ','-')
-                        Num = Num.replace(' ','')
-                        ResNumC = Res + Num + C
-                        
-                        self.Opt = CF(ResNumC)
-                        self.Optimizable.append(self.Opt)
-                        continue
-
-                    m = re.search('CF=\s*(\S+)', Line)
-                    if m:
-                        self.CF = float(m.group(1))
-                        continue
-
-                    m = re.search('CF\.app=\s*(\S+)', Line)
-                    if m:
-                        self.CFapp = float(m.group(1))
-                        continue
-
-                    m = re.search('CF\.con=\s*(\S+)', Line)
-                    if m:
-                        self.Opt.con = float(m.group(1))
-                        continue
-                        
-                    m = re.search('CF\.wal=\s*(\S+)', Line)
-                    if m:
-                        self.Opt.wal = float(m.group(1))
-                        continue
+            try:
+                for Line in fh:
                     
-                    m = re.search('CF\.sas=\s*(\S+)', Line)
-                    if m:
-                        self.Opt.sas = float(m.group(1))
-                        continue
+                    if Line.startswith('REMARK'):
+                        self.Read_Remark(Line)
                         
-                    m = re.search('CF\.com=\s*(\S+)', Line)
-                    if m:
-                        self.Opt.com = float(m.group(1))
-                        continue
-                    
-                    #REMARK  7.32206 RMSD to ref. structure
-                    m = re.search('(\S+) RMSD to ref\. structure', Line)
-                    if m:
-                        self.RMSD = float(m.group(1))
-                        continue
+                    # The coordinates follow the header: never read
+                    elif Line.startswith('ATOM  ') or Line.startswith('HETATM'):
+                        break
+            finally:
+                fh.close()
+    
+    # Retrieves the CF information of a REMARK line
+    def Read_Remark(self, Line):
+        
+        m = OPTIMIZABLE.search(Line)
+        if m:
+            Res = m.group(1)
+            C = m.group(2)
+            Num = m.group(3)
+            
+            if C == ' ':
+                C = '-'
+            
+            Res = Res.replace(' ','-')
+            Num = Num.replace(' ','')
+            ResNumC = Res + Num + C
+            
+            self.Opt = CF(ResNumC)
+            self.Optimizable.append(self.Opt)
+            return
+        
+        m = TERM.search(Line)
+        if m:
+            Term = m.group(1)
+            Value = float(m.group(2))
+            
+            if Term is None:
+                self.CF = Value
+            elif Term == '.app':
+                self.CFapp = Value
+            else:
+                setattr(self.Opt, Term[1:], Value)
+            return
+        
+        #REMARK  7.32206 RMSD to ref. structure
+        m = RMSD.search(Line)
+        if m:
+            self.RMSD = float(m.group(1))
+    
+    # CF information written to the result index
+    def get_Summary(self):
+        
+        return [ self.CF, self.CFapp, self.RMSD,
+                 [ [ Opt.rnc, Opt.com, Opt.wal, Opt.sas, Opt.con ] for Opt in self.Optimizable ] ]
+    
+    # CF information read from the result index
+    def set_Summary(self, Summary):
+        
+        self.CF, self.CFapp, self.RMSD, Optimizable = Summary
+        
+        for rnc, com, wal, sas, con in Optimizable:
+            self.Opt = CF(rnc)
+            self.Opt.com = com
+            self.Opt.wal = wal
+            self.Opt.sas = sas
+            self.Opt.con = con
+            self.Optimizable.append(self.Opt)
+
+
+'''
+@summary: SUBROUTINE Write_Index: writes the CF information of the results to the index file Path,
+                                  with the size and modification time of each result file
+
+@return: 0 when written, 1 otherwise
+'''
+def Write_Index(Path, Results):
+    
+    TmpPath = Path + '.tmp'
+    
+    try:
+        out = open(TmpPath, 'w')
+        try:
+            out.write(INDEX_HEADER + '\n')
+            
+            for Result in Results:
+                Stat = os.stat(Result.ResultFile)
+                CF_, CFapp, RMSD_, Optimizable = Result.get_Summary()
+                
+                out.write('\t'.join([ 'RESULT', os.path.basename(Result.ResultFile), str(Stat.st_size),
+                                      repr(Stat.st_mtime), repr(CF_), repr(CFapp), repr(RMSD_) ]) + '\n')
+                
+                for Opt in Optimizable:
+                    out.write('\t'.join([ 'OPT' ] + [ Opt[0] ] + [ repr(Value) for Value in Opt[1:] ]) + '\n')
+        finally:
+            out.close()
+        
+        if os.path.isfile(Path):
+            os.remove(Path)
+        os.rename(TmpPath, Path)
+    
+    except:
+        try:
+            os.remove(TmpPath)
+        except:
+            pass
+        return 1
+    
+    return 0
+
+'''
+@summary: SUBROUTINE Read_Index: CF information of the results in the index file Path
+
+@return: dict of the summary of each result file (by path) still unchanged since indexed
+         (empty when the index is missing or not readable)
+'''
+def Read_Index(Path):
+    
+    dictSummary = dict()
+    
+    try:
+        in_ = open(Path, 'r')
+    except IOError:
+        return dictSummary
+    
+    try:
+        try:
+            if in_.readline().rstrip('\n') != INDEX_HEADER:
+                return dictSummary
+            
+            Folder = os.path.dirname(Path)
+            dictStat = dict()
+            
+            for Line in in_:
+                fields = Line.rstrip('\n').split('\t')
+                
+                if fields[0] == 'RESULT':
+                    File = os.path.join(Folder, fields[1])
+                    Summary = [ Read_Value(fields[4]), Read_Value(fields[5]), Read_Value(fields[6]), [] ]
                     
-                elif re.match('ATOM  ', Line):
-                    break
+                    dictSummary[File] = Summary
+                    dictStat[File] = (int(fields[2]), float(fields[3]))
                     
+                elif fields[0] == 'OPT':
+                    Summary[3].append([ fields[1] ] + [ float(Value) for Value in fields[2:6] ])
+        
+        except:
+            return dict()
+    
+    finally:
+        in_.close()
+    
+    # Result files written again since indexed are read again
+    for File in dictSummary.keys():
+        try:
+            Stat = os.stat(File)
+            if (Stat.st_size, Stat.st_mtime) != dictStat[File]:
+                del dictSummary[File]
+        except OSError:
+            del dictSummary[File]
+    
+    return dictSummary
+
+'''
+@summary: SUBROUTINE Read_Value: value of the index ('N/A' when not found in the result file)
+'''
+def Read_Value(Text):
+    
+    if Text == repr('N/A'):
+        return 'N/A'
+    
+    return float(Text)
+
 
 class ResultsContainer(object):
     
@@ -0,0 +1,275 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - RotamerPlan.py
+
+@summary: One-time compilation of the dihedrals of the flexible side-chains of a TOP complex
+          (atoms defining each chi and atoms moved by it, see Constants.setDihedrals).
+          Applying rotamers is then done on coordinates instead of PyMOL selections.
+
+@contain: RotamerPlan, RotamerCache
+
+@organization: Najmanovich Research Group
+'''
+
+from collections import OrderedDict
+
+import Constants
+import Geometry
+
+# Backbone atoms that are not written back (see the side-chains selection of the complex)
+BACKBONE = ('C', 'O', 'N')
+
+# Side-chains kept built by default (residue and rotamer)
+CACHE_SIZE = 1024
+
+
+class RotamerCache(object):
+
+    '''
+    @summary: Least recently used side-chains built by the rotamer plans, keyed by (residue, rotamer index).
+              The TOP complexes are copies of the same target: they share one cache.
+    '''
+    def __init__(self, Size=CACHE_SIZE):
+
+        self.Size = Size
+        self.dictBuilt = OrderedDict()
+
+        self.Hits = 0
+        self.Misses = 0
+
+    '''
+    @summary: SUBROUTINE Get: coordinates of a side-chain already built (None if not)
+    '''
+    def Get(self, Key):
+
+        Built = self.dictBuilt.pop(Key, None)
+
+        if Built is None:
+            self.Misses += 1
+            return None
+
+        # Most recently used last
+        self.dictBuilt[Key] = Built
+        self.Hits += 1
+
+        return Built
+
+    '''
+    @summary: SUBROUTINE Put: keeps a side-chain built, dropping the least recently used one when full
+    '''
+    def Put(self, Key, Built):
+
+        self.dictBuilt.pop(Key, None)
+        self.dictBuilt[Key] = Built
+
+        if len(self.dictBuilt) > self.Size:
+            self.dictBuilt.popitem(last=False)
+
+
+class RotamerPlan(object):
+
+    '''
+    @summary: Model is the PyMOL model (cmd.get_model) of the flexible residues of the complex
+              and of the atoms bonded to them, Residues are the flexible residues (e.g. LYS12A, '-' for no chain)
+              Cache (a RotamerCache) keeps the side-chains built from one update to the next
+    '''
+    def __init__(self, Model, Residues, Cache=None):
+
+        self.Cache = Cache
+
+        # Initial coordinates of the atoms (model order)
+        self.Coords = [ [ float(Value) for Value in Atom.coord ] for Atom in Model.atom ]
+        if Geometry.numpy is not None:
+            self.Coords = Geometry.numpy.array(self.Coords, dtype=float)
+
+        # Atoms bonded to each atom
+        self.Bonded = [ list() for Atom in Model.atom ]
+        for Bond in Model.bond:
+            i, j = Bond.index
+            self.Bonded[i].append(j)
+            self.Bonded[j].append(i)
+
+        # Positions of the atoms of each residue, by name
+        dictResidue = dict()
+        for i in range(len(Model.atom)):
+            Atom = Model.atom[i]
+
+            Chn = Atom.chain
+            if Chn == '':
+                Chn = '-'
+
+            dictResidue.setdefault(Atom.resn + Atom.resi + Chn, dict())[Atom.name] = i
+
+        # Positions (and PyMOL indices) of the atoms written back: the side-chains selection
+        self.Write = list()
+        for residue in Residues:
+            self.Write.extend([ i for Name, i in dictResidue.get(residue, dict()).items() if Name not in BACKBONE ])
+
+        self.Write.sort()
+        self.WriteIndex = [ Model.atom[i].index for i in self.Write ]
+
+        # Initial coordinates of the atoms written back
+        self.WriteCoords = [ list(self.Coords[i]) for i in self.Write ]
+        if Geometry.numpy is not None:
+            self.WriteCoords = Geometry.numpy.array(self.WriteCoords, dtype=float)
+
+        # Positions in the model and in Write of the atoms written back of each residue
+        Slot = dict()
+        for j in range(len(self.Write)):
+            Slot[self.Write[j]] = j
+
+        self.dictResidueAtoms = dict()
+        self.dictResidueSlots = dict()
+        for residue in Residues:
+            Atoms = sorted([ i for Name, i in dictResidue.get(residue, dict()).items() if Name not in BACKBONE ])
+
+            self.dictResidueAtoms[residue] = Atoms
+            self.dictResidueSlots[residue] = [ Slot[i] for i in Atoms ]
+            if Geometry.numpy is not None:
+                self.dictResidueSlots[residue] = Geometry.numpy.array(self.dictResidueSlots[residue], dtype=int)
+
+        # Chis of each residue: (A, B, C, D, Moving), None when it could not be compiled
+        self.dictChis = dict()
+        for residue in Residues:
+            self.dictChis[residue] = self.Compile_Residue(residue[0:3], dictResidue.get(residue))
+
+    '''
+    @summary: SUBROUTINE Compile_Residue: positions of the 4 atoms of each chi and of the atoms it moves
+    '''
+    def Compile_Residue(self, Res, dictName):
+
+        if dictName is None or Res not in Constants.nFlexBonds:
+            return None
+
+        Names = Constants.setDihedrals[Res]
+        Residue = set(dictName.values())
+
+        Chis = list()
+        for k in range(0, Constants.nFlexBonds[Res]):
+
+            try:
+                A, B, C, D = [ dictName[Name] for Name in Names[4*k:4*k+4] ]
+            except KeyError:
+                return None
+
+            Moving = self.Get_Moving(Residue, B, C)
+            if Moving is None or D not in Moving:
+                return None
+
+            if Geometry.numpy is not None:
+                Moving = Geometry.numpy.array(Moving, dtype=int)
+
+            Chis.append((A, B, C, D, Moving))
+
+        return Chis
+
+    '''
+    @summary: SUBROUTINE Get_Moving: atoms of the residue on the C side of the B-C bond
+              (None when the bond is part of a ring or when that side is bonded to
+              another residue, e.g. a disulfide bridge)
+    '''
+    def Get_Moving(self, Residue, B, C):
+
+        Seen = set([ C ])
+        Stack = [ C ]
+
+        while Stack:
+            j = Stack.pop()
+            for i in self.Bonded[j]:
+
+                if i == B:
+                    if j != C:
+                        # B reached from another atom: the bond is in a ring
+                        return None
+                    continue
+
+                if i not in Residue:
+                    return None
+
+                if i not in Seen:
+                    Seen.add(i)
+                    Stack.append(i)
+
+        Seen.discard(C)
+
+        return sorted(Seen)
+
+    '''
+    @summary: SUBROUTINE Build_Residue: side-chain of a residue with the chi angles given
+
+    @return: coordinates of the atoms of the residue written back
+    '''
+    def Build_Residue(self, residue, Angles):
+
+        if Geometry.numpy is not None:
+            Coords = self.Coords.copy()
+        else:
+            Coords = [ list(Coord) for Coord in self.Coords ]
+
+        for Chi, Angle in zip(self.dictChis[residue], Angles):
+            A, B, C, D, Moving = Chi
+            Geometry.set_dihedral(Coords, A, B, C, D, Moving, Angle)
+
+        if Geometry.numpy is not None:
+            return Coords[self.dictResidueAtoms[residue]]
+
+        return [ Coords[i] for i in self.dictResidueAtoms[residue] ]
+
+    '''
+    @summary: SUBROUTINE Apply: applies the rotamers to the initial conformation of the side-chains.
+              dictRotamers gives (rotamer index, chi angles) of each residue not in its initial conformation.
+
+    @return: coordinates of the atoms written back (Write order)
+    '''
+    def Apply(self, dictRotamers):
+
+        if Geometry.numpy is not None:
+            Coords = self.WriteCoords.copy()
+        else:
+            Coords = [ list(Coord) for Coord in self.WriteCoords ]
+
+        for residue, Rotamer in dictRotamers.items():
+
+            # Residues that could not be compiled are left to cmd.set_dihedral
+            if not self.dictChis.get(residue):
+                continue
+
+            Key = (residue, Rotamer[0])
+
+            Built = None
+            if self.Cache is not None:
+                Built = self.Cache.Get(Key)
+
+            if Built is None:
+                Built = self.Build_Residue(residue, Rotamer[1])
+                if self.Cache is not None:
+                    self.Cache.Put(Key, Built)
+
+            if Geometry.numpy is not None:
+                Coords[self.dictResidueSlots[residue]] = Built
+            else:
+                for j, Coord in zip(self.dictResidueSlots[residue], Built):
+                    Coords[j] = list(Coord)
+
+        if Geometry.numpy is not None:
+            return Coords.tolist()
+
+        return Coords
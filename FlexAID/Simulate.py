@@ -42,6 +42,7 @@ if __debug__:
     from pymol import cmd
 
     import pymol
+    import General_cmd
     import Simulation
 
 
@@ -62,13 +63,18 @@ class Simulate(Tabs.Tab):
     
     # 1 minute timeout
     TIMEOUT = INTERVAL * 300
-    
+
+    # 1 second, longest wait between two parses when no file change is notified
+    IDLE_TIMEOUT = INTERVAL * 10
+
     SimStatus = StringVar()
     ProgBarText = StringVar()
+    RenderText = StringVar()
     
     def Def_Vars(self):
 
         self.ResultsName = StringVar()
+        self.ReplayGeneration = StringVar()
         
         # vars class objects
         self.SimLigDisplay = self.Vars.SimLigDisplay
@@ -84,7 +90,9 @@ class Simulate(Tabs.Tab):
             return
         
         self.ResultsName.set('')
+        self.ReplayGeneration.set('')
         self.ProgBarText.set('... / ...')
+        self.RenderText.set('...')
         self.SimLigDisplay.set('sticks')
         self.hasConstraints = bool(self.top.Config2.Vars.dictConstraints)
         self.SimCartoonDisplay.set(1)
@@ -98,6 +106,12 @@ class Simulate(Tabs.Tab):
         self.ResultsContainer.Clear()
 
         self.Paused = False
+
+        # Parsing thread of the last simulation (draws the generations recorded once done)
+        self.Parse = None
+
+        # Progress read from the stdout of FlexAID instead of the .update handshake (see GAParam)
+        self.StreamStdout = 0
         
     ''' ==================================================================================
     FUNCTION After_Show: Actions related after showing the frame
@@ -245,6 +259,8 @@ class Simulate(Tabs.Tab):
         fSim_ProgressLine2.pack(side=TOP, fill=X)
         fSim_ProgressLine3 = Frame(fSim_Progress)
         fSim_ProgressLine3.pack(side=TOP, fill=X)
+        fSim_ProgressLine4 = Frame(fSim_Progress)
+        fSim_ProgressLine4.pack(side=TOP, fill=X)
         
         self.lblSimStatus = Label(fSim_ProgressLine1, bg=self.Color_Black, textvariable=self.SimStatus, font=self.top.font_Title, fg=self.top.Color_Blue)
         self.lblSimStatus.pack(side=LEFT, fill=X, expand=True, anchor=W)
@@ -257,6 +273,9 @@ class Simulate(Tabs.Tab):
         
         Label(fSim_ProgressLine3, text='Genetic algorithm progress:', font=self.top.font_Text).pack(side=LEFT)
         Label(fSim_ProgressLine3, textvariable=self.ProgBarText, font=self.top.font_Text).pack(side=RIGHT)
+
+        Label(fSim_ProgressLine4, text='Display refresh:', font=self.top.font_Text).pack(side=LEFT)
+        Label(fSim_ProgressLine4, textvariable=self.RenderText, font=self.top.font_Text).pack(side=RIGHT)
                                         
         #==================================================================================
         '''                           --- DISPLAY OPTIONS ---                           '''
@@ -269,6 +288,8 @@ class Simulate(Tabs.Tab):
         fSim_DisplayLine2.pack(side=TOP, fill=X)
         fSim_DisplayLine3 = Frame(fSim_Display)
         fSim_DisplayLine3.pack(side=TOP, fill=X)
+        fSim_DisplayLine4 = Frame(fSim_Display)
+        fSim_DisplayLine4.pack(side=TOP, fill=X)
         
         Label(fSim_DisplayLine1, text='Display options of TOP objects', font=self.top.font_Title).pack(side=LEFT)
         
@@ -289,6 +310,14 @@ class Simulate(Tabs.Tab):
         Checkbutton(fSim_DisplayLine3, text=' Lines', variable=self.SimLinesDisplay,
                     command=lambda var=self.SimLinesDisplay, display='lines': self.Modify_Display(var, display),
                     font=self.top.font_Text).pack(side=RIGHT)
+
+        Label(fSim_DisplayLine4, text='Generation:', font=self.top.font_Text).pack(side=LEFT)
+
+        self.Btn_ShowGeneration = Button(fSim_DisplayLine4, text='Show', command=self.Btn_ShowGeneration_Clicked,
+                                         font=self.top.font_Text, state='disabled')
+        self.Btn_ShowGeneration.pack(side=RIGHT)
+        Entry(fSim_DisplayLine4, textvariable=self.ReplayGeneration, width=8, font=self.top.font_Text,
+              justify=CENTER).pack(side=RIGHT)
         
         return self.fSimulate
         
@@ -350,7 +379,13 @@ class Simulate(Tabs.Tab):
         self.DisplayMessage('   Creating input files...', 2)
         
         self.DisplayMessage('   CONFIG.inp...', 2)
+        self.StreamStdout = self.top.GAParam.StreamStdout.get()
+        if self.StreamStdout and not self.top.Executable_Streams():
+            # A session saved with a FlexAID that streams: this one only writes the .update files
+            self.DisplayMessage('  WARNING: FlexAID does not print its progress, the .update files are read instead', 2)
+            self.StreamStdout = 0
         self.Manage.Create_CONFIG()
+        self.Manage.Set_GridCache()
         
         self.DisplayMessage('   ga_inp.dat...', 2)
         self.Manage.Create_ga_inp(bContinue)
@@ -370,6 +405,7 @@ class Simulate(Tabs.Tab):
         self.DisplayMessage(self.Manage.FlexAIDRunSimulationProject_Dir, 0)
 
         # Start the simulation
+        self.Btn_ShowGeneration.config(state='disabled')
         self.Btn_Start.config(state='disabled')
         self.Btn_Continue.config(state='disabled')
         self.Btn_PauseResume.config(state='normal')
@@ -420,15 +456,9 @@ class Simulate(Tabs.Tab):
         self.Start_Update()
         
         # START PARSING AS THREAD
+        # the parsing thread starts the simulation once it is ready (never block Tkinter)
         self.DisplayMessage('  Starting parsing thread.', 2)
-        self.Parse = Simulation.Parse(self, self.queue)
-        
-        while self.top.ParseState < 0:
-            time.sleep(self.INTERVAL)
-
-        # START SIMULATION
-        self.DisplayMessage('  Starting executable thread.', 2)
-        self.Start = Simulation.Start(self, commandline)
+        self.Parse = Simulation.Parse(self, self.queue, commandline)
         
     ''' ==================================================================================
     FUNCTION Trace: Adds a callback function to StringVars
@@ -605,6 +635,37 @@ class Simulate(Tabs.Tab):
         self.Btn_PauseResume.config(state='disabled')
         self.Btn_Stop.config(state='disabled')
         self.Btn_Abort.config(state='disabled')
+
+        # The generations recorded by the last simulation can be drawn again
+        if self.Parse is not None and not self.Condition_Update() and os.path.isfile(self.Manage.TRAJECTORY):
+            self.Btn_ShowGeneration.config(state='normal')
+        else:
+            self.Btn_ShowGeneration.config(state='disabled')
+    
+    ''' =============================================================================== 
+    FUNCTION Btn_ShowGeneration_Clicked: Draws a recorded generation on the TOP objects
+    ===============================================================================  '''
+    def Btn_ShowGeneration_Clicked(self):
+
+        if self.Parse is None or self.Condition_Update():
+            self.DisplayMessage('  ERROR: The generations can only be shown once the simulation is done.', 1)
+            return
+
+        try:
+            Generation = int(self.ReplayGeneration.get())
+        except ValueError:
+            self.DisplayMessage('  ERROR: The generation must be an integer.', 1)
+            return
+
+        # The table lists the TOP chromosomes again instead of the results
+        self.ColorList = Color.GetHeatColorList(self.Parse.NbTopChrom, True)
+        self.PymolColorList = Color.GetHeatColorList(self.Parse.NbTopChrom, False)
+
+        if self.Parse.Replay_Generation(Generation):
+            return
+
+        self.DisplayMessage('  Generation ' + str(Generation) + ' drawn on state ' +
+                            str(self.Parse.States.Get_State(Generation)) + ' of the TOP objects', 2)
     
     ''' =============================================================================== 
     FUNCTION Clean_Update: Remove the .update file is present
@@ -655,6 +716,12 @@ class Simulate(Tabs.Tab):
             self.RunStatus()
             self.Paused = False
 
+            # The parsing waits for FlexAID while paused, no need to wait for its next line
+            try:
+                self.Parse.Watcher.Wake()
+            except:
+                pass
+
     ''' =============================================================================== 
     FUNCTION Btn_AbortSim: Abort the simulation 
     ===============================================================================  '''    
@@ -725,10 +792,10 @@ class Simulate(Tabs.Tab):
     def Nice_Display(self, Result, ResultName):
         
         cmd.hide('everything', ResultName)
-        cmd.refresh()
+        General_cmd.refresh()
         
         cmd.show('cartoon', ResultName)
-        cmd.refresh()
+        General_cmd.refresh()
                 
         for opt in Result.Optimizable:
             if opt.rnc[:3] == 'LIG':
@@ -743,7 +810,7 @@ class Simulate(Tabs.Tab):
             cmd.color('white', sele)
         
         util.cnc(ResultName)
-        cmd.refresh()
+        General_cmd.refresh()
     
     ''' ==================================================================================
     FUNCTION: Displays the h-bonds
@@ -761,30 +828,37 @@ class Simulate(Tabs.Tab):
     ==================================================================================  '''               
     def Show_Results(self):
 
-        i = 0
+        # All the results are shown in one refresh
+        General_cmd.Begin_Batch()
 
-        for key in sorted(self.dictSimData.keys()):
-            
-            Result = self.ResultsContainer.Get_ResultID(key)
-            if Result is not None:
-                try:
-                    ResultName = 'RESULT_' + str(Result.ResultID) + '__'
-                    ResultHBondsName = 'RESULT_' + str(Result.ResultID) + '_H_BONDS__'
+        try:
+            i = 0
 
-                    cmd.load(Result.ResultFile, ResultName, state=1)
-                    cmd.refresh()
+            for key in sorted(self.dictSimData.keys()):
+                
+                Result = self.ResultsContainer.Get_ResultID(key)
+                if Result is not None:
+                    try:
+                        ResultName = 'RESULT_' + str(Result.ResultID) + '__'
+                        ResultHBondsName = 'RESULT_' + str(Result.ResultID) + '_H_BONDS__'
 
-                    cmd.color(self.PymolColorList[i], ResultName)
-                    util.cnc(ResultName)
-                    cmd.refresh()
+                        cmd.load(Result.ResultFile, ResultName, state=1)
+                        General_cmd.refresh()
 
-                    self.Nice_Display(Result, ResultName)
-                    self.Highlight_HBonds(Result, ResultName, ResultHBondsName)
-                    
-                except:
-                    continue
+                        cmd.color(self.PymolColorList[i], ResultName)
+                        util.cnc(ResultName)
+                        General_cmd.refresh()
 
-                i += 1
+                        self.Nice_Display(Result, ResultName)
+                        self.Highlight_HBonds(Result, ResultName, ResultHBondsName)
+                        
+                    except:
+                        continue
+
+                    i += 1
+
+        finally:
+            General_cmd.End_Batch()
                     
         #self.Modify_LigDisplay()
         #self.Modify_Display(self.SimCartoonDisplay, 'cartoon')
@@ -797,21 +871,25 @@ class Simulate(Tabs.Tab):
         
         display = self.SimLigDisplay.get()
         
+        General_cmd.Begin_Batch()
+
         try:
             cmd.hide('everything', 'TOP_*__ & resn LIG')
-            cmd.refresh()
+            General_cmd.refresh()
 
             #cmd.hide('everything', 'RESULT_*__ & resn LIG')
             #cmd.refresh()
             
             cmd.show(display, 'TOP_*__ & resn LIG')
-            cmd.refresh()
+            General_cmd.refresh()
 
             #cmd.show(display, 'RESULT_*__ & resn LIG')
             #cmd.refresh()
 
         except:
             pass
+
+        General_cmd.End_Batch()
                         
     ''' ==================================================================================
     FUNCTION Modify_Display: Modifies how the target is visualized in the TOP*/RESULT* objects
@@ -822,7 +900,7 @@ class Simulate(Tabs.Tab):
         
             try:
                 cmd.show(display, 'TOP_*__ & ! resn LIG')
-                cmd.refresh()
+                General_cmd.refresh()
 
                 #cmd.show(display, 'RESULT_*__ & ! resn LIG')
                 #cmd.refresh()
@@ -833,7 +911,7 @@ class Simulate(Tabs.Tab):
         else:   
             try:
                 cmd.hide(display, 'TOP_*__ & ! resn LIG')
-                cmd.refresh()
+                General_cmd.refresh()
 
                 #cmd.hide(display, 'RESULT_*__ & ! resn LIG')
                 #cmd.refresh()
@@ -32,21 +32,33 @@
 
 from collections import defaultdict
 from pymol import cmd
+from pymol import util
 from subprocess import Popen, PIPE, STDOUT
 
 import math, os, time, re
 import sys
 import shutil
 import threading
+import Queue
 import Color
+import General_cmd
+import GeneDecoder
 import Geometry
+import GridVertices
+import LogReader
+import Notify
+import ReconstructionPlan
+import RMSDPlan
+import RotamerPlan
+import StateBudget
+import Trajectory
 import UpdateScreen
 
 
 # Start the simulation with FlexAID
 class Start(threading.Thread):
 
-    def __init__(self, top, commandline):
+    def __init__(self, top, commandline, Watcher=None, Stream=None):
 
         #print "New instance of Start Class"
 
@@ -58,6 +70,15 @@ class Start(threading.Thread):
         self.top = top
         self.FlexAID = self.top.top
 
+        # Woken up when FlexAID ends
+        self.Watcher = Watcher
+
+        # Receives the lines of stdout when FlexAID streams its progress
+        self.Stream = Stream
+
+        # Set once FlexAID is running (or failed to start)
+        self.Started = threading.Event()
+
         self.start()
 
     # Start FlexAID on a side thread
@@ -66,15 +87,29 @@ class Start(threading.Thread):
         print("FlexAID starting thread has begun.")
         
         try:
-            logfile = open(self.top.Manage.LOGFILE, "w")
+            # Line-buffered: the grid may be read again from the copy of the stream (see Parse.Read_Grid)
+            logfile = open(self.top.Manage.LOGFILE, "w", 1)
             
+            if self.Stream is not None:
+                stdout = PIPE
+            else:
+                stdout = logfile
+
             if self.FlexAID.OSid == 'WIN':
-                self.FlexAID.Run = Popen(self.commandline, shell=False, stdout=logfile, stderr=STDOUT)
+                self.FlexAID.Run = Popen(self.commandline, shell=False, stdout=stdout, stderr=STDOUT)
             else:
-                self.FlexAID.Run = Popen(self.commandline, shell=True, stdout=logfile, stderr=STDOUT)
+                self.FlexAID.Run = Popen(self.commandline, shell=True, stdout=stdout, stderr=STDOUT)
                 
             print('  FlexAID is running, process waiting...')
             self.FlexAID.SimulateState = 0 # Running
+            self.Started.set()
+
+            if self.Stream is not None:
+                # Feed the parser line by line, keeping a copy in the logfile
+                for Line in iter(self.FlexAID.Run.stdout.readline, ''):
+                    logfile.write(Line)
+                    self.Stream.Feed(Line)
+
             self.FlexAID.Run.wait()
 
             print "  FlexAID ended with returncode", self.FlexAID.Run.returncode
@@ -92,7 +127,11 @@ class Start(threading.Thread):
             self.FlexAID.SimulateState = 300
         
         self.FlexAID.Run = None
+        self.Started.set()
         
+        if self.Watcher is not None:
+            self.Watcher.Wake()
+
         try:
             logfile.close()
         except:
@@ -101,9 +140,316 @@ class Start(threading.Thread):
         print("FlexAID starting thread has ended.")
     
 
+class Snapshot(object):
+
+    def __init__(self, Generation, State):
+
+        self.Generation = Generation
+
+        # State of the TOP objects the generation is drawn on (see StateBudget)
+        self.State = State
+
+        # (TOP, colNo, Line) of each TOP chromosome of the generation
+        self.Lines = list()
+
+        # Genes of the chromosomes when already decoded (see GeneDecoder)
+        self.Genes = None
+
+
+# TOP_n__ object kept from one update to the next (only the ligand and the flexible side-chains move)
+class TopComplex(object):
+
+    def __init__(self, Name):
+
+        self.Name = Name
+
+        self.selLigand = '(resn LIG & ' + Name + ')'
+        self.selSideChains = ''
+
+        # IDs of the ligand atoms in object order
+        self.LigandOrder = list()
+
+        # Initial coordinates of the atoms of the flexible side-chains (by index)
+        self.dictSideChainCoord = dict()
+
+        # Dihedrals of the flexible side-chains (see RotamerPlan)
+        self.Rotamers = None
+
+        # States of the object (the others are copied from state 1 when first drawn on)
+        self.States = set([ 1 ])
+
+
+# Draws the TOP chromosomes of the generations parsed, on a side thread
+class Render(threading.Thread):
+
+    # Generations waiting to be drawn (older ones are dropped when full)
+    QUEUE_SIZE = 2
+
+    def __init__(self, top):
+
+        threading.Thread.__init__(self)
+
+        self.top = top
+        self.queue = self.top.queue
+
+        self.Snapshots = Queue.Queue(self.QUEUE_SIZE)
+
+        # Number of generations not drawn because a newer one was available
+        self.Skipped = 0
+
+        # Number of generations drawn and time spent drawing them
+        self.Drawn = 0
+        self.DrawTime = 0.0
+
+        self.start()
+
+    '''
+    @summary: SUBROUTINE Push: Queues a complete generation to be drawn (never blocks the parser)
+    '''
+    def Push(self, Snapshot):
+
+        while True:
+            try:
+                self.Snapshots.put_nowait(Snapshot)
+                return
+
+            except Queue.Full:
+                try:
+                    self.Snapshots.get_nowait()
+                    self.Skipped += 1
+                except Queue.Empty:
+                    pass
+
+    '''
+    @summary: SUBROUTINE Stop: Waits for the renderer to draw the last generation pushed
+    '''
+    def Stop(self):
+
+        self.Push(None)
+        self.join()
+
+        if self.Skipped:
+            print('  ' + str(self.Skipped) + ' generation(s) were not drawn to keep up with FlexAID')
+
+        if self.Drawn:
+            print('  ' + str(self.Drawn) + ' generation(s) drawn in %.3f s (%.1f ms per generation)' %
+                  (self.DrawTime, 1000.0 * self.DrawTime / self.Drawn))
+
+    '''
+    @summary: SUBROUTINE run: Draws the newest generation available until stopped
+    '''
+    def run(self):
+
+        Stop = False
+
+        while not Stop:
+
+            Snapshot = self.Snapshots.get()
+            if Snapshot is None:
+                break
+
+            # Coalesce to the newest complete generation
+            while True:
+                try:
+                    Newer = self.Snapshots.get_nowait()
+                except Queue.Empty:
+                    break
+
+                if Newer is None:
+                    Stop = True
+                else:
+                    Snapshot = Newer
+                    self.Skipped += 1
+
+            Start = time.time()
+
+            # The whole generation is shown in one refresh
+            General_cmd.Begin_Batch()
+            try:
+                self.Draw(Snapshot)
+            finally:
+                General_cmd.End_Batch()
+
+            Elapsed = time.time() - Start
+            self.top.Governor.Frame_Drawn(Elapsed)
+
+            self.DrawTime += Elapsed
+            self.Drawn += 1
+
+    '''
+    @summary: SUBROUTINE Draw: Updates the TOP objects with the chromosomes of a generation
+              (Direct: called from the Tk thread, the interface is updated without the queue)
+    '''
+    def Draw(self, Snapshot, Direct=False):
+
+        # Genes of all the TOP chromosomes read in one pass
+        try:
+            Genes = Snapshot.Genes
+            if Genes is None:
+                Genes = self.top.Decoder.Decode(Snapshot.Lines)
+        except:
+            print("  CRITICAL ERROR: Could not decode the genes of the chromosomes")
+
+            #Create the .abort file
+            abort_file = open(self.top.top.Manage.ABORT, 'w')
+            abort_file.close()
+            return
+
+        # Generations already kept are drawn again on their state
+        Snapshot.State = self.top.States.Get_State(Snapshot.Generation)
+        if Snapshot.State is None:
+            Snapshot.State = self.top.States.Assign(Snapshot.Generation)
+
+        Updates = list()
+        for Line, Row in zip(Snapshot.Lines, Genes):
+
+            TOP = Line[0]
+            ID = str(Snapshot.Generation) + '.' + str(TOP)
+            #print("updating " + ID)
+
+            Updates.append(UpdateScreen.UpdateScreen( self.top, ID, Row, Snapshot.State, TOP,
+                                                      self.top.Translation, self.top.Rotation ))
+
+        # Build the poses of all the TOP chromosomes in one call
+        try:
+            Plan = self.top.Plan
+            Ligand = [ Row[self.top.Decoder.Ligand] for Row in Genes ]
+            if Geometry.numpy is not None:
+                Ligand = Genes[:,self.top.Decoder.Ligand]
+
+            Coords = self.top.Poses.Build([ Line[0] for Line in Snapshot.Lines ],
+                                          Plan.Decode_Population(Ligand))
+            listCoord = Geometry.coords_to_dict(Plan.ListAtom, Coords)
+        except:
+            print("  CRITICAL ERROR: Could not build the coordinates of the ligand")
+            Coords = None
+            listCoord = [ None ] * len(Updates)
+
+        # RMSD of all the poses to the reference in one call
+        listRMSD = [ None ] * len(Updates)
+        if self.top.RMSD is not None and Coords is not None:
+            try:
+                listRMSD = self.top.RMSD.Compute(Coords)
+            except:
+                print("  ERROR: Could not calculate the RMSD of the poses")
+
+        for Update, dictCoord, RMSD in zip(Updates, listCoord, listRMSD):
+            Update.dictCoord = dictCoord
+            Update.RMSD = RMSD
+            Update.start()
+
+        # Update RMSD column and display of the TOP objects
+        Tasks = [ lambda: self.top.top.update_DataList(),
+                  lambda: self.top.top.Modify_LigDisplay(),
+                  lambda: self.top.top.Modify_Display(self.top.top.SimCartoonDisplay, 'cartoon'),
+                  lambda: self.top.top.Modify_Display(self.top.top.SimLinesDisplay, 'lines') ]
+
+        for Task in Tasks:
+            if Direct:
+                Task()
+            else:
+                self.queue.put(Task)
+
+
+# Chooses the generations drawn: every NbGenFreq generation, or adapted to the cost of drawing
+class Governor(object):
+
+    # Share of the wall time between two drawn generations that drawing may take (frame-time budget)
+    RENDER_SHARE = 0.5
+
+    # Weight of the last measure in the running averages
+    SMOOTHING = 0.3
+
+    '''
+    @summary: Interval is the number of generations between two drawn generations (the starting
+              one when Adaptive), MaxInterval the largest interval chosen
+    '''
+    def __init__(self, Interval, Adaptive, MaxInterval):
+
+        self.Interval = max(1, Interval)
+        self.Adaptive = Adaptive
+        self.MaxInterval = max(self.Interval, MaxInterval)
+
+        # Average time to draw a generation (renderer thread) and wall time between two generations
+        self.FrameTime = None
+        self.GenerationTime = None
+
+        self.LastTime = None
+        self.LastDrawn = None
+
+    '''
+    @summary: SUBROUTINE Average: running average of Average with the new measure Value
+    '''
+    def Average(self, Average, Value):
+
+        if Average is None:
+            return Value
+
+        return Average + self.SMOOTHING * (Value - Average)
+
+    '''
+    @summary: SUBROUTINE Frame_Drawn: a generation was drawn in Elapsed seconds (renderer thread)
+    '''
+    def Frame_Drawn(self, Elapsed):
+
+        self.FrameTime = self.Average(self.FrameTime, Elapsed)
+
+    '''
+    @summary: SUBROUTINE Is_Due: the chromosomes of Generation were all read
+
+    @return: True when the generation must be drawn
+    '''
+    def Is_Due(self, Generation):
+
+        if not self.Adaptive:
+            return (Generation % self.Interval) == 0
+
+        Now = time.time()
+        if self.LastTime is not None:
+            self.GenerationTime = self.Average(self.GenerationTime, Now - self.LastTime)
+        self.LastTime = Now
+
+        self.Adapt()
+
+        if self.LastDrawn is None or (Generation - self.LastDrawn) >= self.Interval:
+            self.LastDrawn = Generation
+            return True
+
+        return False
+
+    '''
+    @summary: SUBROUTINE Adapt: smallest interval that keeps drawing within its share of the wall time
+    '''
+    def Adapt(self):
+
+        if self.FrameTime is None or not self.GenerationTime:
+            return
+
+        Interval = int(math.ceil(self.FrameTime / (self.RENDER_SHARE * self.GenerationTime)))
+
+        self.Interval = min(max(Interval, 1), self.MaxInterval)
+
+    '''
+    @summary: SUBROUTINE Get_Stats: interval and average drawing time shown in the Simulate tab
+    '''
+    def Get_Stats(self):
+
+        Text = 'every ' + str(self.Interval) + ' generation(s)'
+        if self.Adaptive:
+            Text += ' (adaptive)'
+
+        if self.FrameTime is not None:
+            Text += ', %.1f ms per frame' % (1000.0 * self.FrameTime)
+
+        return Text
+
+
 class Parse(threading.Thread):
+
+    # Target residues closer than this to the binding site are in the TOP objects (BindingSiteOnly)
+    SITE_CUTOFF = 6.0
     
-    def __init__(self, top, queue):
+    def __init__(self, top, queue, commandline):
         
         threading.Thread.__init__(self)
         
@@ -112,6 +458,7 @@ class Parse(threading.Thread):
         self.top = top
         self.FlexAID = self.top.top
         self.queue = queue
+        self.commandline = commandline
         
         self.READ = self.top.Manage.READ
         self.UPDATE = self.top.Manage.UPDATE
@@ -136,40 +483,105 @@ class Parse(threading.Thread):
         self.Rotation = self.FlexAID.Config2.IntRotation.get()
         self.Reference = self.FlexAID.Config2.UseReference.get()
 
+        # The RMSD to the reference considers the symmetric atoms of the ligand (see RMSDPlan)
+        self.SymmetricRMSD = self.FlexAID.Config2.SymmetricRMSD.get()
+
         self.NbGen = ' / ' + str(self.FlexAID.GAParam.NbGen.get())
         self.FloatNbGen = float(self.FlexAID.GAParam.NbGen.get())        
         self.NbGenFreq = int(self.FlexAID.GAParam.NbGenFreq.get())      # Draw every XX generation
+        self.AdaptiveGenFreq = self.FlexAID.GAParam.AdaptiveGenFreq.get() # Draw interval follows the drawing time
         self.NbTopChrom = int(self.FlexAID.GAParam.NbTopChrom.get())    # Number of Lines READ per Generation
+        self.NbStates = int(self.FlexAID.GAParam.NbStates.get())        # States kept in the TOP objects
+        self.BindingSiteOnly = self.FlexAID.GAParam.BindingSiteOnly.get() # TOP objects without the rest of the target
 
         self.Generation = -1
         self.Best = ''
         self.TOP = -1
         
         self.ErrorMsg = ''
-        self.State = 1
-        self.CurrentState = 0
 
         self.Ori =  [ 0.0, 0.0, 0.0 ]    # Origin coordinate
         self.OriX = [ 0.0, 0.0, 0.0 ]   # Origin coordinate with X+1
         self.OriY = [ 0.0, 0.0, 0.0 ]   # Origin coordinate with Y+1
 
-        self.nRead = dict()
+        # Progress is read from the stdout of FlexAID instead of the .update handshake (see GAParam)
+        self.Stream = self.top.StreamStdout
+
+        if self.Stream:
+            # The stream wakes up the parsing itself when lines are received
+            self.Reader = LogReader.StreamReader()
+            self.Watcher = self.Reader
+
+        else:
+            # Only copy the file being read where FlexAID locks its output files
+            if self.FlexAID.OSid == 'WIN':
+                self.Reader = LogReader.LogReader(self.READ)
+            else:
+                self.Reader = LogReader.LogReader()
+
+            # Wakes up the parsing as soon as FlexAID writes to the parse files
+            self.Watcher = Notify.Create_Watcher([ self.LOGFILE, self.UPDATE ])
+
         self.ListAtom = list()
         self.dictSideChainNRot = dict()
         self.dictSideChainRotamers = dict()
-        self.GridVertex = dict()
         self.FixedAngle = dict()
+
+        # Grid saved by a previous simulation on the same binding site (see GridVertices)
+        self.GridCache = self.top.Manage.GRIDCACHE
+        self.GridVertex = GridVertices.Load(self.GridCache)
+
+        # Compiled once the header of the log was read (see Parse_SigmaShare)
+        self.Plan = None
+        self.Decoder = None
+        self.RMSD = None
+
+        # Last pose built for each TOP, only the atoms that moved are built again (see PoseCache)
+        self.Poses = None
+
+        # Genes and scores of every generation written to the run folder (see Trajectory)
+        self.Recorder = None
+        self.TrajectoryReader = None
+
+        # Complex object kept for each TOP and the last coordinates drawn for each TOP
+        self.dictComplex = dict()
+        self.dictTopCoord = dict()
+
+        # Side-chains built for the rotamers reported, shared by the complexes
+        self.RotamerCache = RotamerPlan.RotamerCache()
+
+        # Handler of each type of record found in the parse files
+        self.dictRecordHandlers = { 'GRID': self.Parse_Grid,
+                                    'CHROMOSOME': self.Parse_Chromosome,
+                                    'GENERATION': self.Parse_Generation,
+                                    'BESTBY': self.Parse_BestBy,
+                                    'CLUSTERING': self.Parse_Clustering,
+                                    'ROTAMER': self.Parse_Rotamer,
+                                    'SHIFTVAL': self.Parse_ShiftVal,
+                                    'LOUT': self.Parse_Lout,
+                                    'CENTER': self.Parse_Center,
+                                    'SIGMASHARE': self.Parse_SigmaShare,
+                                    'ERROR': self.Parse_Error }
         
         # References
         self.ReferenceLines = self.top.Manage.ReferenceLines
         self.VarAtoms = self.top.Manage.VarAtoms
         self.RecAtom = self.top.Manage.RecAtom
+        self.AtomTypes = self.top.Manage.AtomTypes
         self.DisAngDih = self.top.Manage.DisAngDih
         self.dictCoordRef = self.top.Manage.dictCoordRef
         self.listTmpPDB = self.top.Manage.listTmpPDB
 
         self.nbAtoms = len(self.DisAngDih)
         self.auto_zoom = cmd.get("auto_zoom")
+
+        # Target residues copied in the TOP objects (see Get_SiteSelection)
+        self.SiteSelection = None
+
+        self.Snapshot = None
+        self.States = StateBudget.StateBudget(self.NbStates)
+        self.Governor = Governor(self.NbGenFreq, self.AdaptiveGenFreq, self.NbTotalGen)
+        self.Renderer = Render(self)
         
         self.start()
     
@@ -186,27 +598,48 @@ class Parse(threading.Thread):
         cmd.delete("RESULT_*")
         cmd.refresh()
         cmd.frame(1)
+
+        General_cmd.Reset_RefreshSaved()
         
         self.queue.put(lambda: self.top.InitStatus())
         self.queue.put(lambda: self.top.progressBarHandler(0, self.NbTotalGen))
         
-        # send ready to simulate signal
-        print('  Signal sent to start simulation')
+        # ready to simulate: start FlexAID from the parsing thread
+        print('  Starting executable thread')
         self.FlexAID.ParseState = 0
+        if self.Stream:
+            self.top.Start = Start(self.top, self.commandline, self.Watcher, self.Reader)
+        else:
+            self.top.Start = Start(self.top, self.commandline, self.Watcher)
         
         print('  Waiting for FlexAID to start')
         # wait for FlexAID to start, to crash or to finish (if simulation is very short and quickly done)
-        while self.FlexAID.SimulateState < 0:
-            time.sleep(self.top.INTERVAL)
+        self.top.Start.Started.wait()
             
         print('  Parsing the logfile of FlexAID')
         while self.FlexAID.Run is not None: # and self.FlexAID.Run.poll() is None:
-            time.sleep(self.top.INTERVAL)
+            self.Watcher.Wait(self.top.IDLE_TIMEOUT)
             if self.ParseLines():
                 break
         
         if not self.FlexAID.ParseState > 0:
             self.ParseLines()
+
+        self.Watcher.Close()
+
+        # Let the renderer draw the last generation received
+        self.Renderer.Stop()
+
+        if self.Write_TopLigands():
+            print('  ERROR: Could not write the PDB files of the ligand of the TOP complexes')
+
+        Stats = self.Governor.Get_Stats()
+        self.queue.put(lambda: self.top.RenderText.set(Stats))
+        print('  Generations drawn ' + Stats)
+
+        if self.Recorder is not None:
+            print('  ' + str(self.Recorder.NbRecords) + ' generation(s) recorded in ' + self.Recorder.Path)
+            self.Recorder.Close()
         
         # Put back the auto_zoom to on
         cmd.set("auto_zoom", self.auto_zoom)
@@ -215,17 +648,39 @@ class Parse(threading.Thread):
         if self.FlexAID.SimulateState > 0 or self.FlexAID.ParseState > 0:
             self.queue.put(lambda: self.top.ErrorStatus(self.ErrorMsg))
         else:
+            # The results are read once, here, instead of when they are loaded
+            if self.top.Results and self.top.Manage.Write_ResultIndex():
+                print('  ERROR: Could not write the index of the results')
+
             self.queue.put(lambda: self.top.SuccessStatus())
     
-            if self.top.Results:
-                cmd.enable("RESULT_*")
-                cmd.refresh()
+            General_cmd.Begin_Batch()
+            try:
+                if self.top.Results:
+                    cmd.enable("RESULT_*")
+                    General_cmd.refresh()
 
-            cmd.disable("TOP_*__")
-            cmd.refresh()
-                
-            cmd.frame(1)
+                cmd.disable("TOP_*__")
+                General_cmd.refresh()
+                    
+                cmd.frame(1)
+            finally:
+                General_cmd.End_Batch()
         
+        print('  ' + str(General_cmd.Get_RefreshSaved()) + ' scene refresh(es) saved by batching')
+
+        if self.Poses is not None and self.Poses.Get_Stats() is not None:
+            print('  ' + self.Poses.Get_Stats())
+
+        print('  ' + self.States.Get_Stats())
+
+        if self.States.NbEvicted and self.Recorder is not None:
+            print('  The generations evicted are drawn again with the Show button of the Simulate tab')
+
+        if self.RotamerCache.Hits or self.RotamerCache.Misses:
+            print('  ' + str(self.RotamerCache.Hits) + ' side-chain(s) taken from the rotamer cache, ' +
+                  str(self.RotamerCache.Misses) + ' built')
+
         self.FlexAID.ParseState = 10
 
         print("FlexAID parsing thread has ended.")
@@ -242,203 +697,401 @@ class Parse(threading.Thread):
         if self.top.Paused:
             return 0
 
-        elif self.CopyRead(ParseFile):
-            self.ErrorMsg = '*NRGsuite ERROR: Could not successfully copy/read temporary files'
+        elif self.ReadNewLines(ParseFile):
+            self.ErrorMsg = '*NRGsuite ERROR: Could not successfully read temporary files'
             self.FlexAID.ParseState = 1
             return 1
 
-        #print "Parse starting at line", self.nRead.get(ParseFile,0)
-        if self.nRead.get(ParseFile):
-            # Resume a file that was not read completely
-            self.Lines = self.Lines[self.nRead[ParseFile]:]
-        else:
-            self.nRead[ParseFile] = 0
-
         for Line in self.Lines:
 
-            # check line completion
-            m = re.search('\n', Line)
-            if m:
-                self.nRead[ParseFile] += 1
-            else:
-                # EOF signal - will resume from here next time
-                break
-            
             #print Line
 
-            m = re.match("Grid\[(\d+)\]=", Line)
-            if m:
-                index = int(m.group(1))
+            Record, m = LogReader.Classify(Line)
+            if Record is None:
+                continue
 
-                strcoor = Line[(Line.find('=')+1):]
-                self.GridVertex[index] = [  float(strcoor[0:8].strip()), 
-                                            float(strcoor[8:16].strip()),
-                                            float(strcoor[16:24].strip())]
+            if self.dictRecordHandlers[Record](Line, m, ParseFile):
+                return 1
+                
+        return 0
 
-                continue
+    '''
+    @summary: SUBROUTINE Parse_Grid: stores a vertex of the grid (Grid[i]=)
+    '''
+    def Parse_Grid(self, Line, m, ParseFile):
 
+        index = int(m.group(1))
 
-            m = re.match("(\s*(\d+) \()", Line)
-            if m:
-                #print Line
+        # The vertices of a saved grid are counted, only a few are compared (see Check_GridCache)
+        if self.GridVertex.Cached and not self.GridVertex.Report(index):
+            return 0
 
-                self.TOP = int(m.group(2))
+        strcoor = Line[(Line.find('=')+1):]
+        x = float(strcoor[0:8].strip())
+        y = float(strcoor[8:16].strip())
+        z = float(strcoor[16:24].strip())
 
-                # Find starting index where to parse column values
-                colNo = len(m.group(1))
+        if self.GridVertex.Cached:
+            self.GridVertex.Check(index, x, y, z)
+        else:
+            self.GridVertex.Set(index, x, y, z)
 
-                if self.Best == 'energy' and self.Generation != -1 and self.TOP != -1:
+        return 0
 
-                    # Reading the values calculated for the generation
-                    if (self.Generation % self.NbGenFreq) == 0 or self.Generation == self.NbTotalGen:
+    '''
+    @summary: SUBROUTINE Check_GridCache: once the grid was reported, reads it from the logfile when
+                                          the saved grid does not match it, then saves the grid for
+                                          the next simulations
+    '''
+    def Check_GridCache(self):
 
-                        ID = str(self.Generation) + '.' + str(self.TOP)
-                        #print("updating " + ID)
+        if self.GridVertex.Cached:
+            if self.GridVertex.Is_Valid():
+                return 0
 
-                        #print Line
-                        Update = UpdateScreen.UpdateScreen( self, ID, colNo, Line, self.CurrentState, self.TOP, 
-                                                            self.Translation, self.Rotation )
+            self.GridVertex = GridVertices.GridVertices()
+            if self.Read_Grid():
+                self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not read the grid of the binding site.", 2))
+                return 1
 
-                        if (self.TOP+1) == self.NbTopChrom:
-                            self.State = self.CurrentState
+        if self.GridCache is not None:
+            if self.GridVertex.Save(self.GridCache):
+                self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not save the grid of the binding site.", 2))
+                return 1
 
-                            # Update energy/fitness table
-                            self.queue.put(lambda: self.top.update_DataList())
+            # The grids of other binding sites or spacings are not kept
+            GridVertices.Remove_Others(self.GridCache)
 
-                            self.queue.put(lambda: self.top.Modify_LigDisplay())
-                            self.queue.put(lambda: self.top.Modify_Display(self.top.SimCartoonDisplay, 'cartoon'))
-                            self.queue.put(lambda: self.top.Modify_Display(self.top.SimLinesDisplay, 'lines'))
+        return 0
 
-                    else:
-                        self.UpdateDataList(Line, self.TOP, 0, None)
+    '''
+    @summary: SUBROUTINE Read_Grid: parses the vertices of the grid from the start of the logfile
+    '''
+    def Read_Grid(self):
 
-                        if (self.TOP+1) == self.NbTopChrom:
-                            self.queue.put(lambda: self.top.update_DataList())
+        try:
+            ReadFile = self.LOGFILE
+            if self.FlexAID.OSid == 'WIN':
+                shutil.copy(self.LOGFILE, self.LOGFILETMP)
+                ReadFile = self.LOGFILETMP
 
-                    # Ready to read another file
-                    if (self.TOP+1) == self.NbTopChrom:
+            readhandle = open(ReadFile, 'r')
+            try:
+                for Line in readhandle:
+                    Record, m = LogReader.Classify(Line)
+                    if Record == 'GRID':
+                        self.Parse_Grid(Line, m, ReadFile)
+                    elif Record == 'SIGMASHARE':
+                        break
+            finally:
+                readhandle.close()
+        except:
+            return 1
 
-                        self.nRead[ParseFile] = 0
+        return 0
 
-                        if self.Generation == self.NbTotalGen:
-                            self.ParseFile = self.LOGFILE
+    '''
+    @summary: SUBROUTINE Parse_Chromosome: updates the display/table with a TOP chromosome
+    '''
+    def Parse_Chromosome(self, Line, m, ParseFile):
 
-                        else:
-                            if self.Remove_UPDATE():
-                                self.ErrorMsg = '*NRGsuite ERROR: Could not successfully remove .update file'
-                                self.FlexAID.ParseState = 1
-                                return 1
+        #print Line
 
-                continue
+        self.TOP = int(m.group(2))
 
-            m = re.match("Generation:\s*(\d+)\s+", Line)
-            if m:
-                #print Line
+        # Find starting index where to parse column values
+        colNo = len(m.group(1))
 
-                self.Generation = int(m.group(1))
-                #print("Generation " + str(self.Generation))
-                self.CurrentState = self.State + 1
+        if self.Best == 'energy' and self.Generation != -1 and self.TOP != -1:
 
-                self.queue.put(lambda: self.top.progressBarHandler(self.Generation, self.NbTotalGen))
+            # The energy/fitness table reflects every generation
+            self.UpdateDataList(Line, self.TOP)
 
-                continue
+            # Reading the values calculated for the generation
+            self.Snapshot.Lines.append((self.TOP, colNo, Line))
 
-            m = re.match("best by (\w+)\s+", Line)
-            if m:
-                #print Line
+            # Ready to read another file
+            if (self.TOP+1) == self.NbTopChrom:
 
-                self.Best = m.group(1)
-                #print "Best by " + self.Best
-                continue
+                self.queue.put(lambda: self.top.update_DataList())
 
-            m = re.match("clustering all individuals", Line)
-            if m:
-                #print Line
-                self.top.Results = True
-                self.queue.put(lambda: self.top.ClusterStatus())
+                # Every generation is recorded, drawn or not
+                self.Record_Generation()
 
-                continue
+                if self.Governor.Is_Due(self.Generation) or self.Generation == self.NbTotalGen:
+                    # The renderer draws the generation on its own thread
+                    self.Renderer.Push(self.Snapshot)
 
-            m = re.match("Rotamer for", Line)
-            if m:                        
-                self.AddRotamerFromLine(Line)
+                    Stats = self.Governor.Get_Stats()
+                    self.queue.put(lambda: self.top.RenderText.set(Stats))
 
-                continue
+                self.Reader.Reset(ParseFile)
 
-            m = re.match("Done.", Line)
-            if m:
-                continue
+                if self.Generation == self.NbTotalGen:
+                    self.ParseFile = self.LOGFILE
 
-            m = re.match("shiftval=", Line)
-            if m and self.FlexStatus != '':
-                
-                # Shift values for fixed dihedrals between pair-triplets of atoms
-                fields = Line.split()
-                MergeAtomsAB = fields[1] + fields[2]
-                self.FixedAngle[MergeAtomsAB] = fields[5]
-                #print "FixedAngle[%s] = %s" % (MergeAtomsAB, fields[5])
-                
-                continue
+                elif not self.Stream:
+                    if self.Remove_UPDATE():
+                        self.ErrorMsg = '*NRGsuite ERROR: Could not successfully remove .update file'
+                        self.FlexAID.ParseState = 1
+                        return 1
 
-            m = re.match("lout\[\d+\]=\s*(\d+)\s+", Line)
-            if m:                        
-                self.ListAtom.append(int(m.group(1)))
-                if len(self.ListAtom) == self.nbAtoms:
-                    # Order the FLEDIH based on the atoms occurences
-                    self.OrderFledih()
+        return 0
 
-                continue
+    '''
+    @summary: SUBROUTINE Record_Generation: appends the genes and scores of the generation to the trajectory
+    '''
+    def Record_Generation(self):
 
-            m = re.match("the protein center of coordinates is:\s+(\S+)\s+(\S+)\s+(\S+)\s+", Line)
-            if m:
-                self.Ori[0] = float(m.group(1))
-                self.Ori[1] = float(m.group(2))
-                self.Ori[2] = float(m.group(3))
-                
-                self.OriX[0] = self.Ori[0] + 1.0  # X
-                self.OriX[1] = self.Ori[1]        # Y
-                self.OriX[2] = self.Ori[2]        # Z
+        if self.Recorder is None:
+            return 0
+
+        try:
+            # Decoded once for the recorder and the renderer
+            self.Snapshot.Genes = self.Decoder.Decode(self.Snapshot.Lines)
+
+            self.Recorder.Record(self.Generation, [ TOP for TOP, colNo, Line in self.Snapshot.Lines ],
+                                 self.Snapshot.Genes,
+                                 [ self.Get_Scores(Line) for TOP, colNo, Line in self.Snapshot.Lines ])
+        except:
+            self.Recorder.Close()
+            self.Recorder = None
+            self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not record the generation, the trajectory is incomplete.", 2))
+            return 1
 
-                self.OriY[0] = self.Ori[0]        # X
-                self.OriY[1] = self.Ori[1] + 1.0  # Y
-                self.OriY[2] = self.Ori[2]        # Z
+        return 0
 
-                continue            
+    '''
+    @summary: SUBROUTINE Get_Scores: CF, CF.app and fitness of a chromosome line (NaN when missing)
+    '''
+    def Get_Scores(self, Line):
 
-            m = re.match("SIGMA_SHARE", Line)
-            if m:                            
-                self.queue.put(lambda: self.top.RunStatus())
+        Scores = list()
 
-                self.ParseFile = self.UPDATE
+        #   3 (   4868.00    -180.00    -180.00    -180.00 )  cf=   67.444 cf.app=   67.444 fitnes=   14.799
+        colNo = Line.rfind("cf=")
+        colNo2 = Line.rfind("cf.app=")
+        colNo3 = Line.rfind("fitnes=")
 
-                continue
+        for Start, End in ((colNo+3, colNo2), (colNo2+7, colNo3), (colNo3+7, len(Line))):
+            try:
+                Scores.append(float(Line[Start:End]))
+            except ValueError:
+                Scores.append(Trajectory.NAN)
 
-            # track errors
-            m = re.match("ERROR", Line)
-            if m:
-                Line = Line.rstrip('\n')
-                self.ErrorMsg = '*FlexAID ' + Line
-                self.FlexAID.ParseState = 2
+        return Scores
 
-                try:
-                    self.FlexAID.Run.terminate()
-                except:
-                    pass
+    '''
+    @summary: SUBROUTINE Replay_Generation: draws a recorded generation on the TOP objects and shows
+                                            its scores in the table (once the simulation is done, the
+                                            renderer is stopped), called from the Show button of the
+                                            Simulate tab on the Tk thread: the queue is no longer read
+    '''
+    def Replay_Generation(self, Generation):
+
+        try:
+            if self.TrajectoryReader is None:
+                self.TrajectoryReader = Trajectory.TrajectoryReader(self.top.Manage.TRAJECTORY)
+            else:
+                self.TrajectoryReader.Refresh()
 
+            Index = self.TrajectoryReader.Find(Generation)
+            if Index is None:
+                self.top.DisplayMessage("  ERROR: Generation " + str(Generation) + " was not recorded.", 2)
                 return 1
-                
+
+            Generation, TOPs, Genes, Scores = self.TrajectoryReader.Read(Index)
+
+        except:
+            self.top.DisplayMessage("  ERROR: Could not read the trajectory file.", 2)
+            return 1
+
+        # CF, CF.app and fitness of the generation (the RMSD is set once the poses are built)
+        self.top.dictSimData.clear()
+        for TOP, Row in zip(TOPs, Scores):
+            self.top.dictSimData[TOP+1] = [ self.Format_Score(Score) for Score in Row ] + [ 'N/A' ]
+
+        Replay = Snapshot(Generation, None)
+        Replay.Lines = [ (TOP, None, None) for TOP in TOPs ]
+        Replay.Genes = Genes
+
+        # Left by an aborted simulation
+        if os.path.isfile(self.top.Manage.ABORT):
+            try:
+                os.remove(self.top.Manage.ABORT)
+            except OSError:
+                pass
+
+        General_cmd.Begin_Batch()
+        try:
+            # The TOP objects are hidden once the simulation is done
+            cmd.enable("TOP_*__")
+            self.Renderer.Draw(Replay, True)
+        finally:
+            General_cmd.End_Batch()
+
+        # An error while drawing leaves the .abort file (see UpdateScreen.CriticalError)
+        if os.path.isfile(self.top.Manage.ABORT):
+            try:
+                os.remove(self.top.Manage.ABORT)
+            except OSError:
+                pass
+            self.top.DisplayMessage("  ERROR: Could not draw generation " + str(Generation) + ".", 2)
+            return 1
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Format_Score: score of the trajectory as shown in the table ('N/A' when missing)
+    '''
+    def Format_Score(self, Score):
+
+        if Score != Score:
+            return 'N/A'
+
+        return '%.3f' % Score
+
+    '''
+    @summary: SUBROUTINE Parse_Generation: a new generation is being reported
+    '''
+    def Parse_Generation(self, Line, m, ParseFile):
+
+        self.Generation = int(m.group(1))
+        #print("Generation " + str(self.Generation))
+        self.Snapshot = Snapshot(self.Generation, None)
+
+        self.queue.put(lambda: self.top.progressBarHandler(self.Generation, self.NbTotalGen))
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_BestBy: criteria used to sort the TOP chromosomes
+    '''
+    def Parse_BestBy(self, Line, m, ParseFile):
+
+        self.Best = m.group(1)
+        #print "Best by " + self.Best
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_Clustering: the GA has ended and results are being clustered
+    '''
+    def Parse_Clustering(self, Line, m, ParseFile):
+
+        self.top.Results = True
+        self.queue.put(lambda: self.top.ClusterStatus())
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_Rotamer: an accepted rotamer of a flexible side-chain
+    '''
+    def Parse_Rotamer(self, Line, m, ParseFile):
+
+        self.AddRotamerFromLine(Line)
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_ShiftVal: shift values for fixed dihedrals between pair-triplets of atoms
+    '''
+    def Parse_ShiftVal(self, Line, m, ParseFile):
+
+        if self.FlexStatus != '':
+            fields = Line.split()
+            MergeAtomsAB = fields[1] + fields[2]
+            self.FixedAngle[MergeAtomsAB] = fields[5]
+            #print "FixedAngle[%s] = %s" % (MergeAtomsAB, fields[5])
+
         return 0
+
+    '''
+    @summary: SUBROUTINE Parse_Lout: order in which the ligand atoms are built
+    '''
+    def Parse_Lout(self, Line, m, ParseFile):
+
+        self.ListAtom.append(int(m.group(1)))
+        if len(self.ListAtom) == self.nbAtoms:
+            # Order the FLEDIH based on the atoms occurences
+            self.OrderFledih()
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_Center: center of coordinates of the protein
+    '''
+    def Parse_Center(self, Line, m, ParseFile):
+
+        self.Ori[0] = float(m.group(1))
+        self.Ori[1] = float(m.group(2))
+        self.Ori[2] = float(m.group(3))
+        
+        self.OriX[0] = self.Ori[0] + 1.0  # X
+        self.OriX[1] = self.Ori[1]        # Y
+        self.OriX[2] = self.Ori[2]        # Z
+
+        self.OriY[0] = self.Ori[0]        # X
+        self.OriY[1] = self.Ori[1] + 1.0  # Y
+        self.OriY[2] = self.Ori[2]        # Z
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_SigmaShare: the GA has started, switch to the .update file
+    '''
+    def Parse_SigmaShare(self, Line, m, ParseFile):
+
+        self.queue.put(lambda: self.top.RunStatus())
+
+        self.ParseFile = self.UPDATE
+
+        self.Check_GridCache()
+
+        # The ligand atoms, shift values, rotamers and grid are known: compile the decoding of the genes
+        try:
+            self.Decoder = GeneDecoder.GeneDecoder(self)
+            self.Plan = ReconstructionPlan.ReconstructionPlan(self)
+            self.Poses = ReconstructionPlan.PoseCache(self.Plan, self.RecAtom)
+        except:
+            self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not compile the ligand reconstruction.", 2))
+
+        if self.Plan is not None and self.Reference:
+            try:
+                self.RMSD = RMSDPlan.RMSDPlan(self, self.SymmetricRMSD)
+            except:
+                self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not compile the RMSD to the reference.", 2))
+
+        if self.Decoder is not None:
+            try:
+                self.Recorder = Trajectory.TrajectoryRecorder(self.top.Manage.TRAJECTORY, self.NbTopChrom,
+                                                              self.Decoder.Names)
+            except:
+                self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not create the trajectory file.", 2))
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Parse_Error: FlexAID reported an error
+    '''
+    def Parse_Error(self, Line, m, ParseFile):
+
+        Line = Line.rstrip('\n')
+        self.ErrorMsg = '*FlexAID ' + Line
+        self.FlexAID.ParseState = 2
+
+        try:
+            self.FlexAID.Run.terminate()
+        except:
+            pass
+
+        return 1
         
     '''=========================================================================
        UpdateDataList: Updates the table containing energy/fitness values
     ========================================================================='''
-    def UpdateDataList(self, Line, TOP, Reference, dictCoord):
+    def UpdateDataList(self, Line, TOP):
         
-        try:
-            PrevRMSD = self.top.dictSimData[TOP+1][3]
-        except:
-            PrevRMSD = 'N/A'
-                
         try:
             #Get index position of energy column
             #colNo = Line.rfind("value=") + 6
@@ -465,14 +1118,26 @@ class Parse(threading.Thread):
             else:
                 self.top.dictSimData[TOP+1][2] = 'N/A'
 
-            # RMSD of ligand
-            if Reference:
-                RMSD = Geometry.rmsd(dictCoord, self.dictCoordRef)
-                
-                if RMSD != 'N/A':
-                    RMSD = '%.3f' % RMSD
+        except:
+            self.queue.put(lambda: self.top.DisplayMessage("  ERROR: Could not update data list.", 2))
+            return 1
+
+        return 0
+
+    '''=========================================================================
+       UpdateRMSD: Updates the RMSD of a drawn TOP pose to the reference
+                   (calculated for all the poses of the generation, see RMSDPlan)
+    ========================================================================='''
+    def UpdateRMSD(self, TOP, RMSD):
+        
+        if not self.Reference:
+            return 0
+
+        try:
+            if RMSD is None or RMSD == 'N/A':
+                RMSD = 'N/A'
             else:
-                RMSD = PrevRMSD
+                RMSD = '%.3f' % RMSD
 
             self.top.dictSimData[TOP+1][3] = RMSD
 
@@ -483,6 +1148,223 @@ class Parse(threading.Thread):
         return 0
 
 
+    '''
+    @summary: SUBROUTINE Get_Complex: Returns the complex object of a TOP, created the first time
+                                      from the initial protein (Frame 1) and the reference ligand,
+                                      with the state State
+    '''
+    def Get_Complex(self, TOP, State):
+
+        Complex = self.dictComplex.get(TOP)
+        if Complex is not None:
+            if State not in Complex.States:
+                # A new state starts as a copy of the first one
+                cmd.create(Complex.Name, Complex.Name, 1, State)
+                Complex.States.add(State)
+            return Complex
+
+        Complex = TopComplex("TOP_" + str(TOP+1) + "__")
+        LigandObj = self.LigandName + '_' + str(TOP+1)
+
+        cmd.delete(Complex.Name)
+        cmd.read_pdbstr(''.join(self.ReferenceLines), LigandObj, 1)
+        cmd.create(Complex.Name, '(' + self.Get_SiteSelection() + ') or (' + LigandObj + ')', 1, 1)
+        cmd.delete(LigandObj)
+
+        cmd.iterate(Complex.selLigand, 'Order.append(ID)', space={ 'Order': Complex.LigandOrder })
+
+        # Side-chains that can move (rotamers were accepted for them)
+        Residues = list()
+        strSelectRes = ''
+        for residue in self.listSideChain:
+            if self.dictSideChainNRot.get(residue,''):
+
+                Res = residue[0:3]
+                Num = residue[3:len(residue)-1]
+                Chn = residue[len(residue)-1:len(residue)]
+
+                strSelectRes += "(resn " + Res + " & resi " + Num
+                if Chn != '-':
+                    strSelectRes += " & chain " + Chn
+                else:
+                    strSelectRes += " & chain ''"
+
+                strSelectRes += " & " + Complex.Name + ") or "
+                Residues.append(residue)
+
+        if strSelectRes != '':
+            strSelectRes = strSelectRes[:len(strSelectRes)-4]
+
+            Complex.selSideChains = '((' + strSelectRes + ') & ! name C+O+N)'
+            cmd.iterate_state(1, Complex.selSideChains, 'dictCoord[index] = (x,y,z)',
+                              space={ 'dictCoord': Complex.dictSideChainCoord })
+
+            # Rotamers are applied on coordinates when the residues are complete
+            try:
+                Complex.Rotamers = RotamerPlan.RotamerPlan(cmd.get_model('(' + strSelectRes + ') extend 1', state=1),
+                                                           Residues, self.RotamerCache)
+            except:
+                Complex.Rotamers = None
+
+        # Color ligand and side-chains of solution TOP
+        cmd.color(self.top.PymolColorList[TOP], Complex.selLigand)
+        util.cnc(Complex.selLigand)
+        cmd.show(self.DefaultDisplay, Complex.selLigand)
+
+        if Complex.selSideChains != '':
+            cmd.color(self.top.PymolColorList[TOP], Complex.selSideChains)
+            util.cnc(Complex.selSideChains)
+            cmd.show("sticks", Complex.selSideChains)
+
+        General_cmd.refresh()
+
+        self.dictComplex[TOP] = Complex
+
+        return self.Get_Complex(TOP, State)
+
+    '''
+    @summary: SUBROUTINE Get_BindingSite: spheres (center, radius) of the binding site (sphere or cleft)
+    '''
+    def Get_BindingSite(self):
+
+        Spheres = list()
+
+        if self.RngOpt == 'LOCCEN':
+            Sphere = self.FlexAID.Config1.Vars.BindingSite.Sphere
+            Spheres.append((list(Sphere.Center), float(Sphere.Radius)))
+
+        elif self.RngOpt == 'LOCCLF':
+            #ATOM     16  C   SPH Z   1      11.271   0.268  -8.282  1.00  2.17
+            for Line in open(self.top.Manage.BINDINGSITE, 'r'):
+                if Line.startswith('ATOM  '):
+                    Spheres.append(([ float(Line[30:38]), float(Line[38:46]), float(Line[46:54]) ],
+                                    float(Line[60:66])))
+
+        return Spheres
+
+    '''
+    @summary: SUBROUTINE Get_SiteSelection: selection of the target copied in the TOP objects: the whole target,
+                                            or the residues within SITE_CUTOFF of the binding site (level of detail)
+    '''
+    def Get_SiteSelection(self):
+
+        if self.SiteSelection is not None:
+            return self.SiteSelection
+
+        self.SiteSelection = self.TargetName
+
+        if not self.BindingSiteOnly:
+            return self.SiteSelection
+
+        try:
+            Spheres = self.Get_BindingSite()
+
+            Residues = list()
+            Points = list()
+            cmd.iterate_state(1, self.TargetName, 'Residues.append((chain, resi)); Points.append((x, y, z))',
+                              space={ 'Residues': Residues, 'Points': Points })
+        except:
+            print("  ERROR: Could not find the residues of the binding site, the whole target is drawn")
+            return self.SiteSelection
+
+        if not Spheres or not Points:
+            return self.SiteSelection
+
+        # Target atoms compared to each sphere at once
+        Points = Geometry.Get_Points(Points)[0]
+
+        dictSite = dict()
+        for Center, Radius in Spheres:
+            Limit = (Radius + self.SITE_CUTOFF) * (Radius + self.SITE_CUTOFF)
+            for Residue, sqrdist in zip(Residues, Geometry.sqrdistance_batch(Points, Center)):
+                if sqrdist < Limit:
+                    dictSite.setdefault(Residue[0], set()).add(Residue[1])
+
+        # The flexible side-chains move wherever they are
+        for residue in self.listSideChain:
+            Chn = residue[len(residue)-1:len(residue)]
+            if Chn == '-':
+                Chn = ''
+            dictSite.setdefault(Chn, set()).add(residue[3:len(residue)-1])
+
+        strSelect = ''
+        for Chn in sorted(dictSite.keys()):
+            if Chn != '':
+                strSelect += "(chain " + Chn
+            else:
+                strSelect += "(chain ''"
+            strSelect += " & resi " + '+'.join(sorted(dictSite[Chn])) + ") or "
+
+        self.SiteSelection = '(' + self.TargetName + ' & (' + strSelect[:len(strSelect)-4] + '))'
+
+        return self.SiteSelection
+
+    '''
+    @summary: SUBROUTINE Forget_Complex: Deletes the complex object of a TOP (after an error)
+    '''
+    def Forget_Complex(self, TOP):
+
+        Complex = self.dictComplex.pop(TOP, None)
+
+        if Complex is not None:
+            try:
+                cmd.delete(Complex.Name)
+            except:
+                pass
+
+    '''
+    @summary: SUBROUTINE WriteOutLigand: Outputs the PDB ligand file of the last pose drawn for a TOP
+                                         (listTmpPDB of the TOP by default)
+    '''
+    def WriteOutLigand(self, TOP, Path=None):
+
+        dictCoord = self.dictTopCoord.get(TOP)
+        if dictCoord is None:
+            return 1
+
+        if Path is None:
+            Path = self.listTmpPDB[TOP+1]
+
+        try:
+            text_file = open(Path, 'w')
+            
+            for pdbLine in self.ReferenceLines:
+                
+                type = pdbLine[0:6].strip()
+                if type == 'HETATM' or type == 'ATOM':
+
+                    NoAtom = int(pdbLine[6:11])
+                    
+                    tmpLine = pdbLine[0:30]
+                    tmpLine += '%8.3f' % float(dictCoord[NoAtom][0])     # The atom X coordinate
+                    tmpLine += '%8.3f' % float(dictCoord[NoAtom][1])     # The atom Y coordinate
+                    tmpLine += '%8.3f' % float(dictCoord[NoAtom][2])     # The atom Z coordinate
+                    tmpLine += pdbLine[54:]
+                    
+                    text_file.write(tmpLine)
+
+                else:                                        
+                    text_file.write(pdbLine)                                    
+
+            text_file.close()                               
+
+        except IOError:
+            return 1
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Write_TopLigands: Outputs the PDB ligand file of the last pose drawn for each TOP
+                                           (once the renderer is stopped, instead of a file for every pose)
+    '''
+    def Write_TopLigands(self):
+
+        for TOP in sorted(self.dictTopCoord.keys()):
+            if self.WriteOutLigand(TOP):
+                return 1
+
+        return 0
+
     '''
     @summary: SUBROUTINE OrderFledih: Order the FLEDIH atoms number based on
                                       the ligand construction (lout) if REQUIRED!                
@@ -558,8 +1440,8 @@ class Parse(threading.Thread):
     '''   
     def Remove_UPDATE(self):
     
-        TIME = 0
-        while TIME < self.top.TIMEOUT:
+        Deadline = time.time() + self.top.TIMEOUT
+        while True:
             try:
                 os.remove(self.UPDATE)
                 break
@@ -567,29 +1449,24 @@ class Parse(threading.Thread):
             except OSError:
                 pass
             
-            time.sleep(self.top.INTERVAL)
+            if time.time() >= Deadline:
+                return 1
 
-            TIME = TIME + self.top.INTERVAL
-            
-        if TIME >= self.top.TIMEOUT:
-            return 1
+            # Retry as soon as the file changes (a lock does not notify)
+            self.Watcher.Wait(self.top.INTERVAL)
             
         return 0
     
     '''
-    @summary: SUBROUTINE: CopyRead_UPDATE: Tries to copy then read the .read (log.txt OR .update) file
+    @summary: SUBROUTINE: ReadNewLines: Tries to read the lines appended to the parse file (log.txt OR .update)
     '''
-    def CopyRead(self, ParseFile):
+    def ReadNewLines(self, ParseFile):
     
-        TIME = 0
-        while TIME < self.top.TIMEOUT:
+        Deadline = time.time() + self.top.TIMEOUT
+        while True:
             
             try:
-                shutil.copy(ParseFile, self.READ)
-
-                readhandle = open(self.READ, 'r')
-                self.Lines = readhandle.readlines()
-                readhandle.close()
+                self.Lines = self.Reader.Read(ParseFile)
                 break
                 
             except OSError:
@@ -598,12 +1475,10 @@ class Parse(threading.Thread):
             except IOError:
                 pass
             
-            time.sleep(self.top.INTERVAL)
+            if time.time() >= Deadline:
+                return 1
 
-            TIME = TIME + self.top.INTERVAL
-            
-        if TIME >= self.top.TIMEOUT:
-            return 1
+            # Retry as soon as the file is created/written (a lock does not notify)
+            self.Watcher.Wait(self.top.INTERVAL)
             
         return 0
-
@@ -0,0 +1,147 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - StateBudget.py
+
+@summary: States of the TOP objects given to the generations drawn, within a fixed number of states.
+          The last generations drawn are kept, as well as a history of the older ones that is
+          decimated (one generation kept every 1, 2, 4, ... generations) as the simulation goes on.
+          Once taken, every state holds a generation: the history gives up one state at a time,
+          when the next generation drawn needs it.
+
+          The state of an evicted generation is given to the next one drawn and the generation
+          is no longer reached by moving through the states of the TOP objects. Once the
+          simulation is done, it is drawn again from the trajectory of the run with the Show
+          button of the Simulate tab (see Parse.Replay_Generation), on a state evicted in turn.
+
+@contain: StateBudget
+
+@organization: Najmanovich Research Group
+'''
+
+# Share of the states kept for the last generations drawn (the others hold the history)
+RECENT_SHARE = 0.5
+
+
+class StateBudget(object):
+
+    '''
+    @summary: Budget is the number of states of each TOP object (1: every generation is drawn on state 1)
+    '''
+    def __init__(self, Budget):
+
+        self.Budget = max(1, Budget)
+        self.NbRecent = max(1, int(self.Budget * RECENT_SHARE))
+
+        # Generation drawn on each state
+        self.dictGeneration = dict()
+
+        # States of the last generations drawn (oldest first) and of the history
+        self.Recent = list()
+        self.History = list()
+        self.Free = list()
+
+        # Generations in the history are at least Every generations apart
+        self.Every = 1
+
+        self.NbEvicted = 0
+
+    '''
+    @summary: SUBROUTINE Assign: state on which Generation is drawn (a state is evicted when all are taken)
+    '''
+    def Assign(self, Generation):
+
+        if len(self.Recent) == self.NbRecent:
+            self.Retire(self.Recent.pop(0))
+
+        if not self.Free:
+            if len(self.dictGeneration) < self.Budget:
+                self.Free.append(len(self.dictGeneration) + 1)
+            else:
+                self.Decimate()
+
+        State = self.Free.pop(0)
+        if State in self.dictGeneration:
+            self.NbEvicted += 1
+
+        self.dictGeneration[State] = Generation
+        self.Recent.append(State)
+
+        return State
+
+    '''
+    @summary: SUBROUTINE Retire: the generation of State leaves the last generations drawn
+    '''
+    def Retire(self, State):
+
+        # Kept while there is room, the history is decimated when a state is needed
+        if self.Budget > self.NbRecent:
+            self.History.append(State)
+        else:
+            self.Free.append(State)
+
+    '''
+    @summary: SUBROUTINE Decimate: frees one state of the history, the oldest generation sharing its
+                                   span of Every generations with an older one (Every doubles when
+                                   the generations kept are all apart)
+    '''
+    def Decimate(self):
+
+        while not self.Free:
+
+            if len(self.History) < 2:
+                self.Free.extend(self.History)
+                self.History = list()
+                break
+
+            # History is in the order of the generations (oldest first)
+            Buckets = set()
+
+            for i in range(len(self.History)):
+                Bucket = self.dictGeneration[self.History[i]] // self.Every
+                if Bucket in Buckets:
+                    self.Free.append(self.History.pop(i))
+                    break
+                Buckets.add(Bucket)
+
+            else:
+                self.Every *= 2
+
+    '''
+    @summary: SUBROUTINE Get_State: state on which Generation is kept
+
+    @return: the state, None when it was evicted (drawn again with Parse.Replay_Generation)
+    '''
+    def Get_State(self, Generation):
+
+        for State in self.Recent + self.History:
+            if self.dictGeneration[State] == Generation:
+                return State
+
+        return None
+
+    '''
+    @summary: SUBROUTINE Get_Stats: states taken and generations evicted
+    '''
+    def Get_Stats(self):
+
+        return str(len(self.Recent) + len(self.History)) + ' of ' + str(self.Budget) + ' state(s) kept (' + \
+               str(len(self.History)) + ' in the history, every ' + str(self.Every) + ' generation(s)), ' + \
+               str(self.NbEvicted) + ' generation(s) evicted'
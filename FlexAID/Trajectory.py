@@ -0,0 +1,240 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: FlexAID - Trajectory.py
+
+@summary: Binary file of the genes and scores (CF, CF.app, fitness) of the TOP chromosomes
+          of every generation of a simulation, written as FlexAID reports them.
+
+          The header gives the number of TOP chromosomes and the names of the genes
+          (see GeneDecoder), followed by one fixed-size record per generation:
+          the generation number (int32) then NbTop rows of NbGenes + 3 values (float32),
+          little-endian. Rows of chromosomes not reported are NaN.
+
+          Records are read from a memory map, one generation at a time.
+
+@contain: TrajectoryRecorder, TrajectoryReader
+
+@organization: Najmanovich Research Group
+'''
+
+import os
+import mmap
+import struct
+
+import Geometry
+
+MAGIC = 'NRGTRJ01'
+
+# Magic, number of TOP chromosomes, number of genes, length of the names of the genes
+HEADER = '<8sIII'
+
+# Scores following the genes of each chromosome
+SCORES = ('CF', 'CF.app', 'fitness')
+
+NAN = float('nan')
+
+
+'''
+@summary: SUBROUTINE Get_RecordFormat: struct format of the record of a generation
+'''
+def Get_RecordFormat(NbTop, NbGenes):
+
+    return '<i' + str(NbTop * (NbGenes + len(SCORES))) + 'f'
+
+
+class TrajectoryRecorder(object):
+
+    '''
+    @summary: Path of the file (overwritten), NbTop chromosomes of genes Names (see GeneDecoder.Names)
+    '''
+    def __init__(self, Path, NbTop, Names):
+
+        self.Path = Path
+        self.NbTop = NbTop
+        self.NbGenes = len(Names)
+        self.NbRecords = 0
+
+        self.Format = Get_RecordFormat(self.NbTop, self.NbGenes)
+        self.Empty = [ NAN ] * (self.NbGenes + len(SCORES))
+
+        Text = '\n'.join(Names)
+
+        self.File = open(Path, 'wb')
+        self.File.write(struct.pack(HEADER, MAGIC, self.NbTop, self.NbGenes, len(Text)))
+        self.File.write(Text)
+        self.File.flush()
+
+    '''
+    @summary: SUBROUTINE Record: appends the record of a generation.
+              TOPs are the chromosomes reported, with their Genes (rows) and Scores (CF, CF.app, fitness)
+    '''
+    def Record(self, Generation, TOPs, Genes, Scores):
+
+        Rows = [ self.Empty ] * self.NbTop
+        for TOP, Row, Score in zip(TOPs, Genes, Scores):
+            if 0 <= TOP < self.NbTop:
+                Rows[TOP] = list(Row) + list(Score)
+
+        Values = list()
+        for Row in Rows:
+            Values.extend(Row)
+
+        self.File.write(struct.pack(self.Format, Generation, *Values))
+
+        # Readers see every generation recorded so far
+        self.File.flush()
+
+        self.NbRecords += 1
+
+    def Close(self):
+
+        try:
+            self.File.close()
+        except:
+            pass
+
+
+class TrajectoryReader(object):
+
+    '''
+    @summary: Path of a file written by TrajectoryRecorder (possibly still being written, see Refresh)
+    '''
+    def __init__(self, Path):
+
+        self.Path = Path
+
+        self.File = open(Path, 'rb')
+
+        Size = struct.calcsize(HEADER)
+        Magic, self.NbTop, self.NbGenes, Length = struct.unpack(HEADER, self.File.read(Size))
+        if Magic != MAGIC:
+            self.File.close()
+            raise ValueError('Not a trajectory file: ' + Path)
+
+        self.Names = self.File.read(Length).split('\n')
+        if not self.NbGenes:
+            self.Names = list()
+
+        self.Offset = Size + Length
+        self.Format = Get_RecordFormat(self.NbTop, self.NbGenes)
+        self.RecordSize = struct.calcsize(self.Format)
+
+        self.Map = None
+        self.Records = None
+        self.NbRecords = 0
+
+        self.Refresh()
+
+    '''
+    @summary: SUBROUTINE Refresh: maps the records written since the file was opened
+    '''
+    def Refresh(self):
+
+        NbRecords = (os.path.getsize(self.Path) - self.Offset) // self.RecordSize
+        if self.Map is not None and NbRecords == self.NbRecords:
+            return
+
+        if self.Map is not None:
+            self.Records = None
+            self.Map.close()
+
+        self.Map = mmap.mmap(self.File.fileno(), 0, access=mmap.ACCESS_READ)
+        self.NbRecords = NbRecords
+
+        if Geometry.numpy is not None:
+            numpy = Geometry.numpy
+            Dtype = numpy.dtype([ ('Generation', '<i4'),
+                                  ('Values', '<f4', (self.NbTop, self.NbGenes + len(SCORES))) ])
+            self.Records = numpy.frombuffer(self.Map, dtype=Dtype, count=self.NbRecords, offset=self.Offset)
+
+    '''
+    @summary: SUBROUTINE Get_Generation: generation number of a record
+    '''
+    def Get_Generation(self, Index):
+
+        if self.Records is not None:
+            return int(self.Records['Generation'][Index])
+
+        return struct.unpack_from('<i', self.Map, self.Offset + Index * self.RecordSize)[0]
+
+    '''
+    @summary: SUBROUTINE Find: index of the record of a generation (None if not recorded)
+    '''
+    def Find(self, Generation):
+
+        # Generations are recorded in increasing order
+        Low = 0
+        High = self.NbRecords
+        while Low < High:
+            Middle = (Low + High) // 2
+            if self.Get_Generation(Middle) < Generation:
+                Low = Middle + 1
+            else:
+                High = Middle
+
+        if Low < self.NbRecords and self.Get_Generation(Low) == Generation:
+            return Low
+
+        return None
+
+    '''
+    @summary: SUBROUTINE Read: record of a generation
+
+    @return: generation number, TOP chromosomes reported, their genes (rows) and scores (CF, CF.app, fitness)
+    '''
+    def Read(self, Index):
+
+        if Index < 0 or Index >= self.NbRecords:
+            raise IndexError('No record ' + str(Index) + ' in ' + self.Path)
+
+        if self.Records is not None:
+            Record = self.Records[Index]
+            Values = Record['Values']
+
+            TOPs = [ TOP for TOP in range(self.NbTop) if not Geometry.numpy.isnan(Values[TOP,0]) ]
+
+            return int(Record['Generation']), TOPs, Values[TOPs,:self.NbGenes], Values[TOPs,self.NbGenes:]
+
+        Values = struct.unpack_from(self.Format, self.Map, self.Offset + Index * self.RecordSize)
+        Width = self.NbGenes + len(SCORES)
+
+        TOPs = list()
+        Genes = list()
+        Scores = list()
+        for TOP in range(self.NbTop):
+            Row = list(Values[1 + TOP * Width:1 + (TOP + 1) * Width])
+            if Row and Row[0] == Row[0]:
+                TOPs.append(TOP)
+                Genes.append(Row[:self.NbGenes])
+                Scores.append(Row[self.NbGenes:])
+
+        return Values[0], TOPs, Genes, Scores
+
+    def Close(self):
+
+        self.Records = None
+
+        try:
+            if self.Map is not None:
+                self.Map.close()
+            self.File.close()
+        except:
+            pass
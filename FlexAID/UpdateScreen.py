@@ -18,16 +18,15 @@
 
 '''
 from pymol import cmd
-from pymol import util
 
 #import threading
-import Geometry
 import Constants
+import General_cmd
 
 
 class UpdateScreen(object):
 
-    def __init__(self, top, ID, colNo, Line, State, TOP, Translation, Rotation):
+    def __init__(self, top, ID, Genes, State, TOP, Translation, Rotation):
         #threading.Thread.__init__(self)
 
         self.top = top
@@ -42,43 +41,42 @@ class UpdateScreen(object):
         # TOPn to edit
         self.TOP = TOP
         
-        # Starting index of line
-        self.colNo = colNo
+        # genes of the chromosome (see GeneDecoder)
+        self.Genes = Genes
         
-        # input line to parse
-        self.Line = Line
-        
-        # State on which updating is happening
-        # self.State = State
-        self.State = 1
+        # State on which updating is happening (see StateBudget)
+        self.State = State
         
         self.dictFlexBonds = self.top.dictFlexBonds
         
         self.LigandName = self.top.LigandName
         self.TargetName = self.top.TargetName
         
-        self.LigandObj = self.LigandName + '_' + str(self.TOP+1)
-        self.TargetObj = self.TargetName + '_' + str(self.TOP+1)
-        
-        # Selections of molecules (ligand/side-chain/protein)
-        self.selTarget = '(' + self.TargetObj + ' & present)'
-        self.selLigand = '(' + self.LigandObj + ' & present)'
-        self.selSideChains = ''
+        # Object of the protein-ligand complex (kept from one update to the next)
+        self.SolutionObj = "TOP_" + str(self.TOP+1) + "__"
 
-        # start thread
-        self.start()
+        # cartesian coordinates of the ligand and RMSD to the reference (for all the poses at once)
+        self.dictCoord = None
+        self.RMSD = None
     
     def start(self):
     
         self.Update()
-    
+
     # Updates the PyMOL interface
     def Update(self):
         
+        # The coordinates of the ligand were built
+        if self.dictCoord is None:
+            return
+
         try:
-            # Copy the initial protein (Frame 1) into the working state
-            cmd.create(self.TargetObj, self.TargetName, 1, self.State)
-            cmd.refresh()
+            # Created from the initial protein (Frame 1) the first time only
+            Complex = self.top.Get_Complex(self.TOP, self.State)
+
+            # Generation kept on the state (shown with the states of the object)
+            if self.top.NbStates > 1:
+                cmd.set_title(Complex.Name, self.State, 'Generation ' + self.ID.split('.')[0])
 
             # Display the last frame
             cmd.frame(self.State)
@@ -86,320 +84,109 @@ class UpdateScreen(object):
 
         except:
             self.CriticalError("Object " + str(self.TargetName) + " no longer exists")
-        
-        
-        if not self.UpdateLigandAnchorPoint() and not self.UpdateLigandFlexibility():
-        
-            self.selSideChains = self.UpdateSideChainConformations()
-            
-            if self.WriteOutLigand() or self.EditView() or \
-               self.top.UpdateDataList(self.Line, self.TOP, self.top.Reference, self.dictCoord):
-                self.Delete_Object()
+            return
 
-        self.Delete_Object()
+        if self.UpdateSideChainConformations(Complex) or self.UpdateLigand(Complex) or \
+           self.top.UpdateRMSD(self.TOP, self.RMSD):
+            self.top.Forget_Complex(self.TOP)
         
         return
-        
+
     '''=========================================================================
-       Delete_Object: deleted the updating object if an error occurs
+       UpdateLigand: Loads the new coordinates of the ligand into the complex
     ========================================================================='''
-    def Delete_Object(self):
+    def UpdateLigand(self, Complex):
 
         try:
-            # delete temporary protein PDB file
-            cmd.delete(self.TargetObj)
-            cmd.refresh()
+            Coords = [ self.dictCoord[ID] for ID in Complex.LigandOrder ]
 
-            cmd.delete(self.LigandObj)
-            cmd.refresh()
+            try:
+                cmd.load_coords(Coords, Complex.selLigand, state=self.State)
+            except:
+                # PyMOL without load_coords (or with its older signature)
+                cmd.alter_state(self.State, Complex.selLigand, '(x,y,z) = dictCoord[ID]',
+                                space={ 'dictCoord': self.dictCoord })
 
-        except:
-            self.CriticalError("Object " + str(self.TargetObj) + " no longer exists")
+            General_cmd.refresh()
 
-    '''=========================================================================
-       EditView: Edit the visual aspects of the PyMOL interface
-    ========================================================================='''
-    def EditView(self):
-        
-        #Display the ligand with the new coordinates
-        #print "will load " + self.LigandObj + " in state " + str(self.State) 
-        try:
-            cmd.load(self.top.listTmpPDB[self.TOP+1], self.LigandObj, self.State)
-            cmd.refresh()
-
-            # No flexible side-chain(s)
-            if self.selSideChains == '':
-                selString = self.selLigand + " or " + self.selTarget
-            else:
-                selString = self.selSideChains + " or " + self.selLigand + " or " + self.selTarget                         
-            #print selString
-
-            # Create solution object
-            # Object contains the whole protein-ligand complex
-            SolutionObj = "TOP_" + str(self.TOP+1) + "__"
-            cmd.create(SolutionObj, selString, self.State, self.State)
-            cmd.refresh()
-
-            # Color ligand of solution TOP
-            Selection = "(resn LIG & " + SolutionObj + " & present)"
-            cmd.color(self.top.top.PymolColorList[self.TOP], Selection)
-            util.cnc(Selection)
-            cmd.refresh()
-           
-            # Color side-chains of solution TOP
-            if self.selSideChains != '':
-                selSC = self.selSideChains.replace(self.TargetObj,SolutionObj)
-                cmd.color(self.top.top.PymolColorList[self.TOP], selSC)
-                util.cnc(selSC)
-                cmd.refresh()
-
-            #cmd.show(self.DefaultDisplay, "(resn LIG & sol_*__ & present)")
-            cmd.show(self.top.DefaultDisplay, "(resn LIG & " + SolutionObj + " & present)")
-            cmd.refresh()
-
-            if self.selSideChains != '':
-                #cmd.show("sticks", self.selSideChains.replace(self.TargetName__,"sol_*__"))
-                cmd.show("sticks", self.selSideChains.replace(self.TargetObj,SolutionObj))
-                cmd.refresh()
+            self.top.dictTopCoord[self.TOP] = self.dictCoord
 
         except:
-            self.CriticalError("Could not refresh the visual display")
+            self.CriticalError("Could not update the coordinates of the ligand")
             return 1
 
         return 0
 
     '''=========================================================================
-       WriteOutLigand: Ouputs PDB ligand file with new coordinates
-    ========================================================================='''
-    def WriteOutLigand(self):
-
-        try:
-        
-            #Get the new coordinates of the ligand
-            self.dictCoord = {}
-            self.dictCoord = Geometry.buildcc(self.top.ListAtom,self.top.RecAtom,self.top.DisAngDih,self.top.Ori)
-        
-            #Replace the coordinate in pdb file with the new one
-            #print "writing to " + self.top.listTmpPDB[self.TOP+1]
-            text_file = open(self.top.listTmpPDB[self.TOP+1], 'w')
-            
-            for pdbLine in self.top.ReferenceLines:
-                
-                type = pdbLine[0:6].strip()
-                if type == 'HETATM' or type == 'ATOM':
-
-                    NoAtom = int(pdbLine[6:11])
-                    #print NoAtom
-                    
-                    atomX = float(self.dictCoord[NoAtom][0])
-                    atomY = float(self.dictCoord[NoAtom][1])
-                    atomZ = float(self.dictCoord[NoAtom][2])
-                    
-                    tmpLine = pdbLine[0:30]
-                    tmpLine += '%8.3f' % atomX     # The atom X coordinate
-                    tmpLine += '%8.3f' % atomY     # The atom Y coordinate
-                    tmpLine += '%8.3f' % atomZ     # The atom Z coordinate
-                    tmpLine += pdbLine[54:]
-                    
-                    text_file.write(tmpLine)
-
-                else:                                        
-                    text_file.write(pdbLine)                                    
-
-            text_file.close()                               
-
-        except IOError:
-            self.CriticalError("Could not write PDB ligand file.")
-            return 1
-
-        return 0
-
-    '''=========================================================================
-       UpdateLigandFlexibility: Updates the dihedral angles of the ligand
+      .UpdateSideChainConformations: Update side-chain dihedral angles using rotamer library
     ========================================================================='''
-    def UpdateLigandFlexibility(self):
+    def UpdateSideChainConformations(self, Complex):
         
-        # Flexible bond(s) selected?
         try:
-            if self.top.FlexStatus != '':
-
-                for k in sorted(self.dictFlexBonds.keys()):
-
-                    # k: Represent the FLEDIH number 
-                    # Which is the key of the dictionary
-
-                    # ==================================================================
-
-                    # If the dihangle between atoms NEED to be modified
-                    if self.dictFlexBonds[k][0] == 1:
-
-                        # Read and move to next column
-                        ColValue = float(self.Line[self.colNo:self.colNo+10])
-                        self.colNo = self.colNo + 11
-
-                        # Is there ONLY 1 atom that define the flexible bond
-                        if self.dictFlexBonds[k][2] == 1:
-
-                            self.top.DisAngDih[int(self.dictFlexBonds[k][3])][2] = ColValue
-
-                        # Is there MULTIPLE atoms that define the flexible bond
-                        elif self.dictFlexBonds[k][2] > 1:
-
-                            #print "How many defines this flexible bonds", self.dictFlexBonds[k][2]
-                            # Multiple possibilities, need to mix up the atoms number
-                            # Example: [1 ,2 ,3] will give [1], [1, 2], [2, 3]
-
-                            # SET the 1st ATOM Dihedral Angle...
-                            self.top.DisAngDih[int(self.dictFlexBonds[k][3])][2] = ColValue
-
-                            for flexA in range(1, self.dictFlexBonds[k][2]):
-                                
-                                ATflex_A = self.dictFlexBonds[k][flexA + 2]
-                                ATflex_B = self.dictFlexBonds[k][flexA + 3]
-
-                                ATmerge = ''
-                                ATmergeAB = ATflex_A + ATflex_B
-                                ATmergeBA = ATflex_B + ATflex_A
-                                
-                                # Be sure the key exist before calling the value
-                                if self.top.FixedAngle.has_key(ATmergeAB):
-                                    ATmerge = ATmergeAB
-                                    Factor = 1
-                                elif self.top.FixedAngle.has_key(ATmergeBA):
-                                    ATmerge = ATmergeBA
-                                    Factor = -1
-                                
-                                if ATmerge:
-                                    # Get the constant angle IN SHIFTVAL
-                                    ConstAngle = float(self.top.FixedAngle[ATmerge])
-                                    #print "ConstAngle", ConstAngle
-                                    
-                                    # ADD the constant Angle WITH the Column value in the LOGFILE
-                                    ColValue = ColValue + float(Factor)*ConstAngle
-                                    #print "ColValue", ColValue
-
-                                    # SET the 2nd ATOM Dihedral Angle...
-                                    self.top.DisAngDih[int(ATflex_B)][2] = ColValue
-        except:
-            self.CriticalError("Could not update ligand flexibility")
-            return 1
+            # Rotamer chosen for each side-chain: (rotamer index, chi angles)
+            dictRotamers = dict()
 
-        return 0
+            # Loop through Flexible side-chains (with rotamers accepted)
+            Decoder = self.top.Decoder
+            for residue, Value in zip(Decoder.Residues, self.Genes[Decoder.SideChains]):
 
-    '''=========================================================================
-       UpdateLigandAnchorPoint: Updates the position of the ligand on the screen
-    ========================================================================='''
-    def UpdateLigandAnchorPoint(self):
+                #print "Setting dihedrals for " + residue
 
-        try: 
-                                    
-            if self.Translation:
-                index = int(float(self.Line[self.colNo:self.colNo+10]))
+                # Get Integer value from GA.
+                IntVal = int(Value + 0.5)
+                nFlex = Constants.nFlexBonds[residue[0:3]]
                 
-                coordX = self.top.GridVertex[index][0]     # The atom X coordinate
-                coordY = self.top.GridVertex[index][1]     # The atom Y coordinate
-                coordZ = self.top.GridVertex[index][2]     # The atom Z coordinate
+                #print("IntVal", str(IntVal))
+                #print("nFlex", str(nFlex))
                 
-                pointA = [coordX, coordY, coordZ]
-                pointB = [self.top.OriX[0], self.top.OriX[1], self.top.OriX[2]]
-                pointC = [self.top.Ori[0], self.top.Ori[1], self.top.Ori[2]]
-                pointD = [self.top.OriY[0], self.top.OriY[1], self.top.OriY[2]]
-
-                self.top.DisAngDih[self.top.VarAtoms[0]][0] = Geometry.distance(pointA, pointB)                             
-                self.top.DisAngDih[self.top.VarAtoms[0]][1] = Geometry.angle(pointA, pointB, pointC)
-                self.top.DisAngDih[self.top.VarAtoms[0]][2] = Geometry.dihedralAngle(pointA, pointB, pointC, pointD)
-
-                self.colNo += 11
-            
-            if self.Rotation:
-                self.top.DisAngDih[self.top.VarAtoms[1]][1] = float(self.Line[self.colNo:self.colNo+10])
-                self.top.DisAngDih[self.top.VarAtoms[1]][2] = float(self.Line[self.colNo+11:self.colNo+21])
-                self.top.DisAngDih[self.top.VarAtoms[2]][2] = float(self.Line[self.colNo+22:self.colNo+32])
-                self.colNo += 33
+                if IntVal > 0: # 0 is the default PDB side-chain conf.
+                    dictRotamers[residue] = (IntVal, self.top.dictSideChainRotamers[residue][(IntVal-1)*nFlex:IntVal*nFlex])
 
-        except:
-            self.CriticalError(" Could not update ligand anchor point")
-            return 1
+            if Complex.Rotamers is not None:
+                # Side-chains built from their initial conformation in one write
+                Coords = Complex.Rotamers.Apply(dictRotamers)
 
-        return 0
+                try:
+                    cmd.load_coords(Coords, Complex.selSideChains, state=self.State)
+                except:
+                    cmd.alter_state(self.State, Complex.selSideChains, '(x,y,z) = dictCoord[index]',
+                                    space={ 'dictCoord': dict(zip(Complex.Rotamers.WriteIndex, Coords)) })
 
-    '''=========================================================================
-      .UpdateSideChainConformations: Update side-chain dihedral angles using rotamer library
-    ========================================================================='''
-    def UpdateSideChainConformations(self):
-        
-        try:
-            # temporary sel. var
-            strSelectSC  = ''
+                General_cmd.refresh()
 
-            # Loop through Flexible side-chains
-            for residue in self.top.listSideChain:
+            elif Complex.dictSideChainCoord:
+                # Start back from the initial conformation of the side-chains
+                cmd.alter_state(self.State, Complex.selSideChains, '(x,y,z) = dictCoord[index]',
+                                space={ 'dictCoord': Complex.dictSideChainCoord })
 
-                #print "Setting dihedrals for " + residue
+            # Residues not compiled in the plan (e.g. missing atoms)
+            for residue in sorted(dictRotamers.keys()):
+
+                if Complex.Rotamers is not None and Complex.Rotamers.dictChis.get(residue):
+                    continue
+
+                # Residu Name
+                Res = residue[0:3]
+                Num = residue[3:len(residue)-1]
+                Chn = residue[len(residue)-1:len(residue)]
+
+                # Get List of Dihedrals to rebuild
+                Angles = dictRotamers[residue][1]
+                for k in range(0,len(Angles)):
                 
-                # Were any rotamers accepted for this side-chain
-                if self.top.dictSideChainNRot.get(residue,''):
-
-                    #print "List of possible rotamers:" + str(self.top.dictSideChainNRot[residue])
-
-                    # Residu Name
-                    Res = residue[0:3]
-                    Num = residue[3:len(residue)-1]
-                    Chn = residue[len(residue)-1:len(residue)]
-
-                    strSelectSC += "(resn " + Res + " & resi " + Num
-                    if Chn != '-':
-                        strSelectSC += " & chain " + Chn
-                    else:
-                        strSelectSC += " & chain ''"                    
-                    
-                    strSelectSC += " & ! name C+O+N " + " & " + self.TargetObj + " & present) or "
-
-                    # Get Integer value from GA.
-                    IntVal = int(float(self.Line[self.colNo:(self.colNo+10)].strip()) + 0.5)
-                    nFlex = Constants.nFlexBonds[Res]
-                    
-                    #print("IntVal", str(IntVal))
-                    #print("nFlex", str(nFlex))
-                    #print strSelectSC
-                    
-                    if IntVal > 0: # 0 is the default PDB side-chain conf.
-        
-                        # Get List of Dihedrals to rebuild
-                        for k in range(0,nFlex):
-                        
-                            '''
-                            print "for k=" + str(k) + " for residue=" + str(residue)
-                            print self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+0])
-                            print self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+1])
-                            print self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+2])
-                            print self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+3])
-                            print self.top.dictSideChainRotamers[residue]
-                            print self.top.dictSideChainRotamers[residue][(IntVal-1)*nFlex+k]
-                            '''
-                            
-                            # Set dihedrals for side-chain
-                            cmd.set_dihedral(self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+0]),
-                                             self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+1]),
-                                             self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+2]),
-                                             self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+3]),
-                                             self.top.dictSideChainRotamers[residue][(IntVal-1)*nFlex+k], self.State)
-                            cmd.refresh()
-
-                            
-                    # Get next column starting index
-                    self.colNo = self.colNo + 11
-
-
-            # Side-chain selection string - remove last 4 chars
-            if strSelectSC != '':
-                strSelectSC = strSelectSC[:len(strSelectSC)-4]
-
-            return strSelectSC
+                    # Set dihedrals for side-chain
+                    cmd.set_dihedral(self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+0]),
+                                     self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+1]),
+                                     self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+2]),
+                                     self.Get_AtomString(Res,Num,Chn,Constants.setDihedrals[Res][4*k+3]),
+                                     Angles[k], self.State)
+                    General_cmd.refresh()
 
         except:
-
             self.CriticalError("Could not update side-chain conformations")
+            return 1
+
+        return 0
     
     '''=========================================================================
       Get_AtomString: Retrives the PyMOL atom selection string
@@ -413,7 +200,7 @@ class UpdateScreen(object):
             AtomString += " & chain ''"
         
         AtomString += " & name " + Atom
-        AtomString += " & " + self.TargetObj
+        AtomString += " & " + self.SolutionObj
 
         return AtomString
 
@@ -23,11 +23,103 @@ from pymol import cmd
 import pymol
 import time
 import re
+import threading
 
 # Regular expression patterns
 RESERVED_NAMES =    '.*__|' + \
                     '.*_sph_.*'
 
+# Batching of the scene refreshes (see Begin_Batch)
+BatchLock = threading.Lock()
+BatchLocal = threading.local()
+RefreshSaved = 0
+
+''' ==========================================================
+  Begin_Batch: Starts a group of PyMOL commands forming one logical update.
+               The refreshes asked within the group (see refresh) are
+               done once when the outermost group of the thread ends.
+               Groups can be nested and must be closed with End_Batch
+               (in a finally clause).
+==========================================================='''
+def Begin_Batch():
+
+    Depth = getattr(BatchLocal, 'Depth', 0)
+    BatchLocal.Depth = Depth + 1
+
+    if Depth == 0:
+        BatchLocal.Pending = False
+
+''' ==========================================================
+  End_Batch: Ends a group of PyMOL commands, refreshes the
+             scene if the outermost group asked for it
+==========================================================='''
+def End_Batch():
+
+    Depth = getattr(BatchLocal, 'Depth', 0)
+    if Depth == 0:
+        return
+
+    BatchLocal.Depth = Depth - 1
+
+    if Depth == 1 and BatchLocal.Pending:
+        BatchLocal.Pending = False
+        cmd.refresh()
+
+''' ==========================================================
+  Batched: Runs a function as one group of commands
+           (used as a decorator on the display functions)
+==========================================================='''
+def Batched(function):
+
+    def Run(*args, **kwargs):
+
+        Begin_Batch()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            End_Batch()
+
+    Run.__name__ = function.__name__
+    Run.__doc__ = function.__doc__
+
+    return Run
+
+''' ==========================================================
+  refresh: Refreshes the scene now, or at the end of the
+           current group of commands (see Begin_Batch)
+==========================================================='''
+def refresh():
+
+    global RefreshSaved
+
+    if getattr(BatchLocal, 'Depth', 0) == 0:
+        cmd.refresh()
+
+    else:
+        BatchLock.acquire()
+        try:
+            # The first refresh of the group is only deferred
+            if BatchLocal.Pending:
+                RefreshSaved += 1
+        finally:
+            BatchLock.release()
+
+        BatchLocal.Pending = True
+
+''' ==========================================================
+  Get_RefreshSaved: Number of refreshes saved by the groups of
+                    commands since the last Reset_RefreshSaved
+==========================================================='''
+def Get_RefreshSaved():
+
+    return RefreshSaved
+
+def Reset_RefreshSaved():
+
+    global RefreshSaved
+
+    RefreshSaved = 0
+
 ''' ==========================================================
   is_ATOM: Determines whether a residue is an ATOM or HETATM  
 ==========================================================='''
@@ -42,11 +134,11 @@ def is_ATOM(Residue,Prot):
 
         if cmd.count_atoms("rtmp1__") == cmd.count_atoms("rtmp2__"):
             cmd.delete("rtmp*__")
-            cmd.refresh()
+            refresh()
             return 1
 
         cmd.delete("rtmp*__")
-        cmd.refresh()
+        refresh()
         
     except:
         return -1
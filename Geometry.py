@@ -23,13 +23,23 @@
 
 @summary: Module that define some tools used by FlexAID.
 
-@contain: distance, angle, dihedralAngle
+@contain: distance, angle, dihedralAngle, middle_batch, sqrdistance_batch, distance_batch, angle_batch,
+          dihedralAngle_batch, buildcc, torsion, set_dihedral, build_parents, build_downstream, buildcc_batch,
+          build_origin, place_atom, buildcc_rebuild, buildcc_coords, buildcc_population, rmsd, rmsd_population, automorphisms
 
 @organization: Najmanovich Research Group
 @creation date:  oct. 13, 2010
 '''
 
 import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Minimum number of poses for which buildcc_population uses buildcc_batch
+BATCH_MIN_POSES = 20
     
 '''******************************************************************************
   SUBROUTINE middle: Calculates the center of geometry between 2 points
@@ -150,6 +160,132 @@ def dihedralAngle(pointA, pointB, pointC, pointD):
     
     return theta
 
+'''
+@summary: SUBROUTINE Get_Points: the points given to the batch functions as (N, 3) arrays
+          (or (3,) for a single point), broadcast against each other.
+          Without numpy, lists of N points of the same length (single points repeated).
+'''
+def Get_Points(*Points):
+
+    if numpy is not None:
+        return [ numpy.asarray(Point, dtype=float) for Point in Points ]
+
+    # A single point is a list of 3 numbers
+    Single = [ not hasattr(Point[0], '__getitem__') for Point in Points ]
+
+    N = 1
+    for Point, IsSingle in zip(Points, Single):
+        if not IsSingle:
+            N = len(Point)
+
+    return [ [ Point ] * N if IsSingle else Point for Point, IsSingle in zip(Points, Single) ]
+
+'''
+@summary: SUBROUTINE middle_batch: middle (see middle) of the points of PointsA and PointsB
+
+@return: (N, 3) numpy array (list of [x,y,z] without numpy)
+'''
+def middle_batch(PointsA, PointsB):
+
+    PointsA, PointsB = Get_Points(PointsA, PointsB)
+
+    if numpy is None:
+        return [ middle(pointA, pointB) for pointA, pointB in zip(PointsA, PointsB) ]
+
+    return (PointsA + PointsB) / 2.0
+
+'''
+@summary: SUBROUTINE sqrdistance_batch: squared distances (see sqrdistance) between the points of PointsA and PointsB
+
+@return: (N,) numpy array (list without numpy)
+'''
+def sqrdistance_batch(PointsA, PointsB):
+
+    PointsA, PointsB = Get_Points(PointsA, PointsB)
+
+    if numpy is None:
+        return [ sqrdistance(pointA, pointB) for pointA, pointB in zip(PointsA, PointsB) ]
+
+    Delta = PointsA - PointsB
+
+    return (Delta * Delta).sum(axis=-1)
+
+'''
+@summary: SUBROUTINE distance_batch: distances (see distance) between the points of PointsA and PointsB
+
+@return: (N,) numpy array (list without numpy)
+'''
+def distance_batch(PointsA, PointsB):
+
+    if numpy is None:
+        return [ math.sqrt(d) for d in sqrdistance_batch(PointsA, PointsB) ]
+
+    return numpy.sqrt(sqrdistance_batch(PointsA, PointsB))
+
+'''
+@summary: SUBROUTINE angle_batch: valence angles (see angle) of the points of PointsA, PointsB and PointsC
+
+@return: (N,) numpy array (list without numpy)
+'''
+def angle_batch(PointsA, PointsB, PointsC):
+
+    PointsA, PointsB, PointsC = Get_Points(PointsA, PointsB, PointsC)
+
+    if numpy is None:
+        return [ angle(pointA, pointB, pointC) for pointA, pointB, pointC in zip(PointsA, PointsB, PointsC) ]
+
+    U = PointsA - PointsB
+    V = PointsC - PointsB
+
+    absu = (U * U).sum(axis=-1) + 1e-10
+    absv = (V * V).sum(axis=-1) + 1e-10
+
+    cosa = (U * V).sum(axis=-1) / numpy.sqrt(absu * absv)
+
+    return numpy.arccos(numpy.clip(cosa, -1.0, 1.0)) * (180.0 / math.pi)
+
+'''
+@summary: SUBROUTINE dihedralAngle_batch: torsional angles (see dihedralAngle) of the points
+          of PointsA, PointsB, PointsC and PointsD. A torsion not defined (3 points on a line)
+          is 0.0 where dihedralAngle raises ZeroDivisionError.
+
+@return: (N,) numpy array (list without numpy)
+'''
+def dihedralAngle_batch(PointsA, PointsB, PointsC, PointsD):
+
+    PointsA, PointsB, PointsC, PointsD = Get_Points(PointsA, PointsB, PointsC, PointsD)
+
+    if numpy is None:
+        Angles = list()
+        for pointA, pointB, pointC, pointD in zip(PointsA, PointsB, PointsC, PointsD):
+            try:
+                Angles.append(dihedralAngle(pointA, pointB, pointC, pointD))
+            except ZeroDivisionError:
+                Angles.append(0.0)
+        return Angles
+
+    t = PointsA - PointsB
+    u = PointsC - PointsB
+    w = PointsD - PointsB
+
+    m = numpy.cross(t, u)
+    n = numpy.cross(w, u)
+
+    absmn = numpy.sqrt((m * m).sum(axis=-1) * (n * n).sum(axis=-1))
+    Defined = absmn > 0.0
+
+    costheta = (m * n).sum(axis=-1) / numpy.where(Defined, absmn, 1.0)
+    theta = numpy.arccos(numpy.clip(costheta, -1.0, 1.0))
+
+    v = numpy.cross(m, n)
+
+    absv = numpy.sqrt((v * v).sum(axis=-1)) + 1e-10
+    absu = numpy.sqrt((u * u).sum(axis=-1)) + 1e-10
+
+    q = (v * u).sum(axis=-1) / (absv * absu)
+
+    return numpy.where(Defined, q * theta * (180.0 / math.pi), 0.0)
+
 '''
 @summary: SUBROUTINE buildcc: builds the cartesianlen( coordinates of the tot atoms
           present in array list according to the reconstruction data.
@@ -262,6 +398,340 @@ def buildcc(ListAtom,RecAtom,DisAngDih,Ori):
     #END of FOR(an)
     return PDBCoord    
 
+'''
+@summary: SUBROUTINE rotate: rotates the vectors (xn,yn,zn) around the unit axis (cx,cy,cz)
+          given the cosine (ct) and sine (st) of the angle (same as in buildcc).
+          Works on floats or on arrays of values.
+'''
+def rotate(cx, cy, cz, ct, st, xn, yn, zn):
+
+    op = 1.0 - ct
+
+    a = cx * cx
+    b = cy * cy
+    c = cz * cz
+
+    xk = (cx * cz * op - cy * st) * zn + ((1.0 - a) * ct + a) * xn + (cx * cy * op + cz * st) * yn
+    yk = (cy * cx * op - cz * st) * xn + ((1.0 - b) * ct + b) * yn + (cy * cz * op + cx * st) * zn
+    zk = (cz * cy * op - cx * st) * yn + ((1.0 - c) * ct + c) * zn + (cz * cx * op + cy * st) * xn
+
+    return xk, yk, zk
+
+'''
+@summary: SUBROUTINE torsion: dihedral angle (degrees) of the points A-B-C-D, same sign as dihedralAngle.
+          Measured with atan2, it stays defined for planar points (0 or 180 degrees), where
+          the sign factor of dihedralAngle vanishes and gives 0.
+'''
+def torsion(pointA, pointB, pointC, pointD):
+
+    b1 = [ float(pointB[i]) - float(pointA[i]) for i in range(3) ]
+    b2 = [ float(pointC[i]) - float(pointB[i]) for i in range(3) ]
+    b3 = [ float(pointD[i]) - float(pointC[i]) for i in range(3) ]
+
+    n1 = [ b1[1]*b2[2] - b1[2]*b2[1], b1[2]*b2[0] - b1[0]*b2[2], b1[0]*b2[1] - b1[1]*b2[0] ]
+    n2 = [ b2[1]*b3[2] - b2[2]*b3[1], b2[2]*b3[0] - b2[0]*b3[2], b2[0]*b3[1] - b2[1]*b3[0] ]
+
+    absb2 = math.sqrt(b2[0]*b2[0] + b2[1]*b2[1] + b2[2]*b2[2])
+
+    y = absb2 * (b1[0]*n2[0] + b1[1]*n2[1] + b1[2]*n2[2])
+    x = n1[0]*n2[0] + n1[1]*n2[1] + n1[2]*n2[2]
+
+    return math.atan2(y, x) * (180.0 / math.pi)
+
+'''
+@summary: SUBROUTINE set_dihedral: sets the dihedral angle (degrees) of the atoms A-B-C-D by rotating
+          the Moving atoms around the B-C bond (as cmd.set_dihedral does in PyMOL).
+          Coords is a list of [x,y,z] or a numpy array, A/B/C/D/Moving are positions in Coords.
+'''
+def set_dihedral(Coords, A, B, C, D, Moving, Angle):
+
+    Delta = (float(Angle) - torsion(Coords[A], Coords[B], Coords[C], Coords[D])) * math.pi / 180.0
+
+    px, py, pz = float(Coords[C][0]), float(Coords[C][1]), float(Coords[C][2])
+
+    cx = px - float(Coords[B][0])
+    cy = py - float(Coords[B][1])
+    cz = pz - float(Coords[B][2])
+
+    d = math.sqrt(cx * cx + cy * cy + cz * cz)
+    cx /= d
+    cy /= d
+    cz /= d
+
+    ct = math.cos(Delta)
+    st = -1.0 * math.sin(Delta)
+
+    if numpy is not None and isinstance(Coords, numpy.ndarray):
+        P = Coords[Moving]
+        x, y, z = rotate(cx, cy, cz, ct, st, P[:,0] - px, P[:,1] - py, P[:,2] - pz)
+
+        Coords[Moving,0] = x + px
+        Coords[Moving,1] = y + py
+        Coords[Moving,2] = z + pz
+
+    else:
+        for an in Moving:
+            x, y, z = rotate(cx, cy, cz, ct, st, Coords[an][0] - px, Coords[an][1] - py, Coords[an][2] - pz)
+            Coords[an] = [ x + px, y + py, z + pz ]
+
+'''
+@summary: SUBROUTINE build_parents: index (in ListAtom order) of the 3 neighbours of each atom.
+          A missing neighbour points to one of the 3 slots following the atoms:
+          tot (Ori + X), tot + 1 (Ori) and tot + 2 (Ori + Y), as done in buildcc.
+
+@return: list of [ i, j, k ] for each atom in ListAtom order
+'''
+def build_parents(ListAtom, RecAtom):
+
+    tot = len(ListAtom)
+
+    # Index of each atom in the build order
+    Index = dict()
+    for an in range(0, tot):
+        Index[ListAtom[an]] = an
+
+    OriX = tot
+    OriO = tot + 1
+    OriY = tot + 2
+
+    Parents = list()
+    for an in range(0, tot):
+
+        Parent = list()
+        for i in range(1, 4):
+            j = RecAtom[ListAtom[an]][i - 1]
+
+            if j != 0:
+                Parent.append(Index[j])
+            elif i == 1:
+                Parent.append(OriX)
+            elif i == 3:
+                Parent.append(OriY)
+            else:
+                Parent.append(OriO)
+
+        Parents.append(Parent)
+
+    return Parents
+
+'''
+@summary: SUBROUTINE build_downstream: atoms to build again in N poses, once the internal coordinates
+          of some atoms changed: those atoms and the atoms built on them (see build_parents).
+          Changed is an (N, tot) array of booleans in ListAtom order.
+
+@return: (N, tot) numpy array of booleans in ListAtom order
+'''
+def build_downstream(Parents, Changed):
+
+    Changed = numpy.asarray(Changed, dtype=bool)
+    N, tot = Changed.shape
+
+    # The 3 reference points (see build_parents) never change
+    Rebuild = numpy.zeros((N, tot + 3), dtype=bool)
+    Rebuild[:,:tot] = Changed
+
+    # The neighbours of an atom are built before it
+    for an in range(0, tot):
+        i, j, k = Parents[an]
+        Rebuild[:,an] |= Rebuild[:,i] | Rebuild[:,j] | Rebuild[:,k]
+
+    return Rebuild[:,:tot]
+
+'''
+@summary: SUBROUTINE buildcc_batch: builds the cartesian coordinates of N poses of the ligand at once.
+          ICs is an (N, tot, 3) array of the distance/angle/dihedral of each atom in ListAtom order.
+          Parents (see build_parents) can be given when it was computed beforehand.
+
+@return: (N, tot, 3) numpy array of the coordinates in ListAtom order
+'''
+def buildcc_batch(ListAtom, RecAtom, ICs, Ori, Parents=None):
+
+    tot = len(ListAtom)
+    ICs = numpy.asarray(ICs, dtype=float)
+    N = ICs.shape[0]
+
+    if Parents is None:
+        Parents = build_parents(ListAtom, RecAtom)
+
+    # The 3 last slots hold the reference points used when a neighbour is missing
+    Coords = numpy.empty((N, tot + 3, 3))
+    Coords[:,tot:] = build_origin(Ori)
+
+    buildcc_rebuild(Coords, ICs, Parents)
+
+    return Coords[:,:tot]
+
+'''
+@summary: SUBROUTINE build_origin: the 3 reference points used when a neighbour is missing
+          (Ori + X, Ori and Ori + Y, see build_parents)
+'''
+def build_origin(Ori):
+
+    return [ [ 1.0 + float(Ori[0]), 0.0 + float(Ori[1]), 0.0 + float(Ori[2]) ],
+             [ 0.0 + float(Ori[0]), 0.0 + float(Ori[1]), 0.0 + float(Ori[2]) ],
+             [ 0.0 + float(Ori[0]), 1.0 + float(Ori[1]), 0.0 + float(Ori[2]) ] ]
+
+'''
+@summary: SUBROUTINE place_atom: coordinates of an atom from the coordinates of its 3 neighbours
+          (see build_parents) and its distance/angle/dihedral, as done by buildcc
+
+@return: [ x, y, z ]
+'''
+def place_atom(P1, P2, P3, IC):
+
+    # Normal of the plane of the 3 neighbours
+    a = P1[1] * (P2[2] - P3[2]) + P2[1] * (P3[2] - P1[2]) + P3[1] * (P1[2] - P2[2])
+    b = P1[2] * (P2[0] - P3[0]) + P2[2] * (P3[0] - P1[0]) + P3[2] * (P1[0] - P2[0])
+    c = P1[0] * (P2[1] - P3[1]) + P2[0] * (P3[1] - P1[1]) + P3[0] * (P1[1] - P2[1])
+    op = math.sqrt((a * a) + (b * b) + (c * c))
+
+    cx = a / op
+    cy = b / op
+    cz = c / op
+
+    a = P2[0] - P1[0]
+    b = P2[1] - P1[1]
+    c = P2[2] - P1[2]
+
+    d = 1.0 / math.sqrt((a * a) + (b * b) + (c * c))
+
+    op = IC[0] * d
+
+    Ang = IC[1] * math.pi / 180.0
+    xk, yk, zk = rotate(cx, cy, cz, math.cos(Ang), -1.0 * math.sin(Ang), a * op, b * op, c * op)
+
+    Dih = IC[2] * math.pi / 180.0
+    x, y, z = rotate(a * d, b * d, c * d, math.cos(Dih), math.sin(Dih), xk, yk, zk)
+
+    return [ x + P1[0], y + P1[1], z + P1[2] ]
+
+'''
+@summary: SUBROUTINE buildcc_rebuild: builds in place the atoms of N poses from their internal coordinates.
+          Coords is an (N, tot + 3, 3) array ending with the reference points (see build_origin),
+          ICs an (N, tot, 3) array and Rebuild (see build_downstream) the atoms to build in each pose
+          (all of them when None). The other atoms keep their coordinates.
+          An atom to build in less than BATCH_MIN_POSES poses is built pose by pose.
+
+@return: number of atoms built
+'''
+def buildcc_rebuild(Coords, ICs, Parents, Rebuild=None):
+
+    N, tot = ICs.shape[0], ICs.shape[1]
+
+    Dis = ICs[:,:,0]
+    Ang = ICs[:,:,1] * math.pi / 180.0
+    Dih = ICs[:,:,2] * math.pi / 180.0
+
+    CosAng = numpy.cos(Ang)
+    SinAng = -1.0 * numpy.sin(Ang)
+    CosDih = numpy.cos(Dih)
+    SinDih = numpy.sin(Dih)
+
+    # Atoms of few poses are built one at a time (see place_atom)
+    ICList = None
+
+    Built = 0
+    for an in range(0, tot):
+
+        i, j, k = Parents[an]
+
+        Rows = slice(None)
+        if Rebuild is not None:
+            Count = int(Rebuild[:,an].sum())
+            if not Count:
+                continue
+
+            Built += Count
+
+            if Count < BATCH_MIN_POSES:
+                if ICList is None:
+                    ICList = ICs.tolist()
+
+                for n in numpy.flatnonzero(Rebuild[:,an]):
+                    Coords[n,an] = place_atom(Coords[n,i].tolist(), Coords[n,j].tolist(), Coords[n,k].tolist(),
+                                              ICList[n][an])
+                continue
+
+            elif Count < N:
+                Rows = Rebuild[:,an]
+        else:
+            Built += N
+
+        P1 = Coords[Rows,i]
+        P2 = Coords[Rows,j]
+        P3 = Coords[Rows,k]
+
+        # Normal of the plane of the 3 neighbours
+        C = numpy.cross(P2 - P1, P3 - P1)
+        C /= numpy.sqrt((C * C).sum(axis=1))[:,None]
+
+        U = P2 - P1
+        d = 1.0 / numpy.sqrt((U * U).sum(axis=1))
+
+        op = Dis[Rows,an] * d
+        xk, yk, zk = rotate(C[:,0], C[:,1], C[:,2], CosAng[Rows,an], SinAng[Rows,an],
+                            U[:,0] * op, U[:,1] * op, U[:,2] * op)
+
+        U *= d[:,None]
+        x, y, z = rotate(U[:,0], U[:,1], U[:,2], CosDih[Rows,an], SinDih[Rows,an], xk, yk, zk)
+
+        Coords[Rows,an,0] = x + P1[:,0]
+        Coords[Rows,an,1] = y + P1[:,1]
+        Coords[Rows,an,2] = z + P1[:,2]
+
+    return Built
+
+'''
+@summary: SUBROUTINE buildcc_coords: builds the coordinates of a list of poses of the ligand.
+          ICs is a list (one per pose) of the distance/angle/dihedral of each atom in ListAtom order.
+          Uses buildcc_batch when numpy is available (and there are enough poses), buildcc otherwise.
+
+@return: (N, tot, 3) numpy array of the coordinates in ListAtom order (lists without numpy)
+'''
+def buildcc_coords(ListAtom, RecAtom, ICs, Ori, Parents=None):
+
+    # Few poses do not pay for the numpy overhead
+    if numpy is None or len(ICs) < BATCH_MIN_POSES:
+        if numpy is not None and isinstance(ICs, numpy.ndarray):
+            ICs = ICs.tolist()
+
+        Coords = list()
+        for IC in ICs:
+            PDBCoord = buildcc(ListAtom, RecAtom, dict(zip(ListAtom, IC)), Ori)
+            Coords.append([ PDBCoord[NoAtom] for NoAtom in ListAtom ])
+
+        if numpy is not None:
+            Coords = numpy.array(Coords, dtype=float).reshape((len(Coords), len(ListAtom), 3))
+
+        return Coords
+
+    return buildcc_batch(ListAtom, RecAtom, ICs, Ori, Parents)
+
+'''
+@summary: SUBROUTINE coords_to_dict: the coordinates of poses (see buildcc_coords) as PDBCoord dictionaries
+
+@return: list of PDBCoord (dictionary) for each pose
+'''
+def coords_to_dict(ListAtom, Coords):
+
+    if numpy is not None and isinstance(Coords, numpy.ndarray):
+        Coords = Coords.tolist()
+
+    return [ dict(zip(ListAtom, Pose)) for Pose in Coords ]
+
+'''
+@summary: SUBROUTINE buildcc_population: builds the coordinates of a list of poses of the ligand
+          (see buildcc_coords)
+
+@return: list of PDBCoord (dictionary) for each pose
+'''
+def buildcc_population(ListAtom, RecAtom, ICs, Ori, Parents=None):
+
+    if not len(ICs):
+        return list()
+
+    return coords_to_dict(ListAtom, buildcc_coords(ListAtom, RecAtom, ICs, Ori, Parents))
+
 '''
 @summary: SUBROUTINE rmsd: calculates RMSD between predicted and reference
 '''
@@ -282,3 +752,140 @@ def rmsd(dictCoord, dictCoordRef):
     except:
 
         return 'N/A'
+
+'''
+@summary: SUBROUTINE rmsd_population: RMSD of N poses to the reference, in one call.
+          Coords holds the N poses of tot atoms (see buildcc_coords), Reference the tot atoms
+          in the same order. With Permutations (orderings of the reference atoms, see automorphisms),
+          the lowest RMSD over them is kept.
+
+@return: list of the RMSD of each pose
+'''
+def rmsd_population(Coords, Reference, Permutations=None):
+
+    if not len(Coords):
+        return list()
+
+    tot = len(Reference)
+
+    if Permutations is None or len(Permutations) == 0:
+        Permutations = [ list(range(tot)) ]
+
+    if numpy is None:
+        RMSD = list()
+        for Pose in Coords:
+            Best = min([ sum([ sqrdistance(Pose[i], Reference[Order[i]]) for i in range(tot) ])
+                         for Order in Permutations ])
+            RMSD.append(math.sqrt(Best / float(tot)))
+        return RMSD
+
+    X = numpy.asarray(Coords, dtype=float)
+    R = numpy.asarray(Reference, dtype=float)
+
+    if len(Permutations) == 1:
+        Sum = ((X - R[Permutations[0]]) ** 2).sum(axis=2).sum(axis=1)
+    else:
+        # |x - r|^2 = |x|^2 + |r|^2 - 2 x.r, the cross terms of every pair of atoms computed once
+        Order = numpy.asarray(Permutations, dtype=int)
+        Cross = numpy.einsum('nik,jk->nij', X, R)
+        Cross = Cross[:,numpy.arange(tot)[None,:],Order].sum(axis=2)
+
+        Sum = (X * X).sum(axis=2).sum(axis=1)[:,None] + (R * R).sum() - 2.0 * Cross
+        Sum = numpy.maximum(Sum.min(axis=1), 0.0)
+
+    return numpy.sqrt(Sum / float(tot)).tolist()
+
+'''
+@summary: SUBROUTINE automorphisms: permutations of the atoms of a molecule mapping it onto itself
+          (atoms of the same label, bonded as the atoms they replace).
+          Neighbours is the list of the positions of the atoms bonded to each atom,
+          Labels the label (e.g. atom type) of each atom. At most Limit permutations are returned.
+
+@return: list of permutations (the position of the image of each atom), the identity first
+'''
+def automorphisms(Neighbours, Labels, Limit=1000):
+
+    tot = len(Labels)
+    Neighbours = [ set(Bonded) for Bonded in Neighbours ]
+
+    # Classes of equivalent atoms: labels refined by the classes of the neighbours
+    Classes = Get_Classes([ (Label,) for Label in Labels ])
+    while True:
+        Refined = Get_Classes([ (Classes[i], tuple(sorted([ Classes[j] for j in Neighbours[i] ])))
+                                for i in range(tot) ])
+        if len(set(Refined)) == len(set(Classes)):
+            break
+        Classes = Refined
+
+    Members = dict()
+    for i in range(tot):
+        Members.setdefault(Classes[i], list()).append(i)
+
+    # Atoms mapped in an order where each atom is bonded to one mapped before (when possible),
+    # starting from the atoms with the fewest equivalents
+    Order = list()
+    Seen = set()
+    for Start in sorted(range(tot), key=lambda i: (len(Members[Classes[i]]), i)):
+        if Start in Seen:
+            continue
+        Seen.add(Start)
+        Queue = [ Start ]
+        while Queue:
+            i = Queue.pop(0)
+            Order.append(i)
+            for j in sorted(Neighbours[i]):
+                if j not in Seen:
+                    Seen.add(j)
+                    Queue.append(j)
+
+    Image = [ None ] * tot
+    Used = [ False ] * tot
+    Found = list()
+
+    def Extend(k):
+
+        if len(Found) >= Limit:
+            return
+
+        if k == tot:
+            Found.append(list(Image))
+            return
+
+        i = Order[k]
+        Mapped = [ j for j in Neighbours[i] if Image[j] is not None ]
+
+        if Mapped:
+            Candidates = Neighbours[Image[Mapped[0]]]
+        else:
+            Candidates = Members[Classes[i]]
+
+        # The atom itself first: the identity is the first permutation found
+        for c in sorted(Candidates, key=lambda c: (c != i, c)):
+            if Used[c] or Classes[c] != Classes[i]:
+                continue
+
+            # Bonds to the atoms mapped are kept
+            if len([ j for j in Neighbours[c] if Used[j] ]) != len(Mapped) or \
+               [ j for j in Mapped if Image[j] not in Neighbours[c] ]:
+                continue
+
+            Image[i] = c
+            Used[c] = True
+            Extend(k + 1)
+            Image[i] = None
+            Used[c] = False
+
+    Extend(0)
+
+    return Found
+
+'''
+@summary: SUBROUTINE Get_Classes: number of the class of each key (numbered in the order of the sorted keys)
+'''
+def Get_Classes(Keys):
+
+    Numbers = dict()
+    for Key in sorted(set(Keys)):
+        Numbers[Key] = len(Numbers)
+
+    return [ Numbers[Key] for Key in Keys ]
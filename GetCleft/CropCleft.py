@@ -740,7 +740,7 @@ class CropCleft(Tabs.Tab):
     ==================================================================================  '''        
     def write_Partition(self):
         
-        listNoAtom = list()
+        listNoAtom = set()
         FromFile = self.Cleft.CleftFile
 
         try:
@@ -755,7 +755,8 @@ class CropCleft(Tabs.Tab):
         TMPFile = open(self.TempPartition, 'w')
         TMPFile.write('REMARK  PARENTFILE  ' + FromFile + '\n')            
 
-        Vertex = 0
+        listLine = list()
+        listCoord = list()
         for Line in SPHLines:
             if Line.startswith('ATOM  '):
 
@@ -764,24 +765,29 @@ class CropCleft(Tabs.Tab):
                 coordY = float(Line[39:46].strip())     # The atom Y coordinate
                 coordZ = float(Line[47:54].strip())     # The atom Z coordinate
                 radius = float(Line[61:].strip())       # The radius of the sphere                    
-                    
-                if listNoAtom.count(index) == 0:
-                    
-                    for sph in sorted(self.dictSpheres, key=str.lower):
-                        
-                        sqrrad  = self.dictSpheres[sph].Radius ** 2
-                        sqrdist = Geometry.sqrdistance( [ coordX, coordY, coordZ ], self.dictSpheres[sph].Center )
 
-                        #if sqrdist <= (self.dictSpheres[sph].Radius+radius)*(self.dictSpheres[sph].Radius+radius):
+                listLine.append((index, Line))
+                listCoord.append([ coordX, coordY, coordZ ])
+
+        # The center of the sphere needs to be inside the 'inserted Spheres'
+        # (all the spheres of the cleft are compared to each inserted sphere at once)
+        Inside = [ False ] * len(listCoord)
+        if listCoord:
+            for sph in sorted(self.dictSpheres, key=str.lower):
+
+                sqrrad  = self.dictSpheres[sph].Radius ** 2
+                SqrDist = Geometry.sqrdistance_batch(listCoord, self.dictSpheres[sph].Center)
+
+                Inside = [ In or sqrdist <= sqrrad for In, sqrdist in zip(Inside, SqrDist) ]
+
+        Vertex = 0
+        for (index, Line), In in zip(listLine, Inside):
 
-                        # ** NEW
-                        # The center of the sphere needs to be inside the 'inserted Spheres'
-                        if sqrdist <= sqrrad:
+            if In and index not in listNoAtom:
 
-                            listNoAtom.append(index)
-                            TMPFile.write(Line)
-                            Vertex = Vertex + 1
-                            break
+                listNoAtom.add(index)
+                TMPFile.write(Line)
+                Vertex = Vertex + 1
                                     
         TMPFile.close()
 
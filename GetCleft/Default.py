@@ -353,7 +353,7 @@ class Default(Tabs.Tab):
             if self.PyMOL:
                 try:
                     cmd.delete(Cleft.CleftName)
-                    cmd.refresh()
+                    General_cmd.refresh()
                 except:
                     pass
         
@@ -738,7 +738,7 @@ class Default(Tabs.Tab):
                 Cleft = self.TempBindingSite.Get_CleftName(CleftName)
                 try:
                     cmd.load(Cleft.CleftFile, Cleft.CleftName, state=1)
-                    cmd.refresh()
+                    General_cmd.refresh()
                     
                     if Cleft.Partition and Cleft.PartitionParent != None and \
                             General_cmd.object_Exists(Cleft.PartitionParent.CleftName):
@@ -804,26 +804,35 @@ class Default(Tabs.Tab):
     ================================================================================== '''   
     def Show_Clefts(self):
         
-        i = 0
-        for CleftName in self.TempBindingSite.Get_SortedCleftNames():
-            Cleft = self.TempBindingSite.Get_CleftName(CleftName)
-            
-            try:
-                cmd.hide('everything', Cleft.CleftName)
-                cmd.refresh()
+        # All the clefts are shown in one refresh
+        if self.PyMOL:
+            General_cmd.Begin_Batch()
 
-                cmd.color(self.ColorList[i], Cleft.CleftName)
-                cmd.refresh()
-                
-                cmd.show('surface', Cleft.CleftName)
-                cmd.refresh()
-                
-                Cleft.Color = self.ColorHex[i]
+        try:
+            i = 0
+            for CleftName in self.TempBindingSite.Get_SortedCleftNames():
+                Cleft = self.TempBindingSite.Get_CleftName(CleftName)
                 
-                i += 1
-            except:
-                self.DisplayMessage("  ERROR: Could not display cleft object '" + Cleft.CleftName + "'", 2)
-                continue
+                try:
+                    cmd.hide('everything', Cleft.CleftName)
+                    General_cmd.refresh()
+
+                    cmd.color(self.ColorList[i], Cleft.CleftName)
+                    General_cmd.refresh()
+                    
+                    cmd.show('surface', Cleft.CleftName)
+                    General_cmd.refresh()
+                    
+                    Cleft.Color = self.ColorHex[i]
+                    
+                    i += 1
+                except:
+                    self.DisplayMessage("  ERROR: Could not display cleft object '" + Cleft.CleftName + "'", 2)
+                    continue
+
+        finally:
+            if self.PyMOL:
+                General_cmd.End_Batch()
                     
     ''' ==================================================================================
     FUNCTION Btn_DownloadPDB_Clicked: Download a PDB from the internet and display the
@@ -836,7 +845,7 @@ class Default(Tabs.Tab):
         try:            
             if self.PyMOL:
                 cmd.fetch(PdbCode, async=0)
-                cmd.refresh()
+                General_cmd.refresh()
         except:
             self.DisplayMessage('  You entered an invalid PDB code.', 1)
             
@@ -131,46 +131,65 @@ class Grid(threading.Thread):
                     xmin = float(int(self.dictSpheres[sph][1][0] - self.dictSpheres[sph][0] - self.Spacer));
                     ymin = float(int(self.dictSpheres[sph][1][1] - self.dictSpheres[sph][0] - self.Spacer));   
                     zmin = float(int(self.dictSpheres[sph][1][2] - self.dictSpheres[sph][0] - self.Spacer));
-                    xmax = float(int(self.dictSpheres[sph][1][0] + self.dictSpheres[sph][0] + self.Spacer + 1.0);
-                    ymax = float(int(self.dictSpheres[sph][1][1] + self.dictSpheres[sph][0] + self.Spacer + 1.0);
-                    zmax = float(int(self.dictSpheres[sph][1][2] + self.dictSpheres[sph][0] + self.Spacer + 1.0);
+                    xmax = float(int(self.dictSpheres[sph][1][0] + self.dictSpheres[sph][0] + self.Spacer + 1.0));
+                    ymax = float(int(self.dictSpheres[sph][1][1] + self.dictSpheres[sph][0] + self.Spacer + 1.0));
+                    zmax = float(int(self.dictSpheres[sph][1][2] + self.dictSpheres[sph][0] + self.Spacer + 1.0));
 
+                # Values of each axis, accumulated as the points are visited
+                listX = self.get_Axis(xmin, xmax)
+                listY = self.get_Axis(ymin, ymax)
+                listZ = self.get_Axis(zmin, zmax)
 
-                x = xmin
-                y = ymin
-                z = zmin
-                
-                sqrrad = sph.Radius
-                
-                while z < zmax:
-                    while y < ymax:
-                        while x < xmax:
-
-                            key  = '%8.3f' % x
-                            key += '%8.3f' % y
-                            key += '%8.3f' % z
-
-                            if key not in self.dictGridPoints:
-
-                                sqrrad = self.dictSpheres[sph][0] * self.dictSpheres[sph][0]
-                                if Geometry.sqrdistance( self.dictSpheres[sph][1], [ x, y, z ] ) < sqrrad:
+                if not listX or not listY or not listZ:
+                    continue
 
-                                    self.dictGridPoints[key] = ''
+                # All the points of the box around the sphere are compared to its center at once
+                Points = self.get_Points(listX, listY, listZ)
 
-                            x += self.Spacer
+                sqrrad = self.dictSpheres[sph][0] * self.dictSpheres[sph][0]
+                SqrDist = Geometry.sqrdistance_batch(Points, self.dictSpheres[sph][1])
 
-                        x = xmin
-                        y += self.Spacer
+                if Geometry.numpy is not None:
+                    listInside = Points[SqrDist < sqrrad].tolist()
+                else:
+                    listInside = [ point for point, sqrdist in zip(Points, SqrDist) if sqrdist < sqrrad ]
 
-                    x = xmin
-                    y = ymin
-                    z += self.Spacer
+                for point in listInside:
+                    self.dictGridPoints['%8.3f%8.3f%8.3f' % tuple(point)] = ''
 
         except:
             return 1
 
         return 0
 
+    #=======================================================================
+    """ get_Axis: values from vmin (included) to vmax (excluded) by the spacer """
+    #=======================================================================         
+    def get_Axis(self, vmin, vmax):
+
+        listValues = list()
+
+        v = vmin
+        while v < vmax:
+            listValues.append(v)
+            v += self.Spacer
+
+        return listValues
+
+    #=======================================================================
+    """ get_Points: points of the box of the axis values (x first, then y, then z) """
+    #=======================================================================         
+    def get_Points(self, listX, listY, listZ):
+
+        numpy = Geometry.numpy
+
+        if numpy is None:
+            return [ [ x, y, z ] for z in listZ for y in listY for x in listX ]
+
+        Z, Y, X = numpy.meshgrid(listZ, listY, listX, indexing='ij')
+
+        return numpy.column_stack((X.ravel(), Y.ravel(), Z.ravel()))
+
     #=======================================================================
     """ write_Grid: outputs the grid in PDB format """
     #=======================================================================         
@@ -94,6 +94,7 @@ class Sphere(Wizard):
     #=======================================================================
     ''' Quits the wizard '''
     #=======================================================================    
+    @General_cmd.Batched
     def Quit_Wizard(self):
 
         try:
@@ -102,7 +103,7 @@ class Sphere(Wizard):
             cmd.config_mouse(self.config_mouse)
 
             cmd.delete(self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
 
@@ -116,7 +117,7 @@ class Sphere(Wizard):
 
         cmd.set_wizard()
         cmd.set_view(self.View)
-        cmd.refresh()
+        General_cmd.refresh()
                 
         self.queue.put(lambda: self.top.SphereRunning(False))
         self.queue.put(lambda: self.top.top.root.deiconify())
@@ -125,12 +126,13 @@ class Sphere(Wizard):
     #=======================================================================
     ''' Display the Sphere in Pymol '''
     #=======================================================================    
+    @General_cmd.Batched
     def DisplaySphere(self):
    
         try:
             # Display the Sphere
             cmd.delete(self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             pass
 
@@ -139,16 +141,16 @@ class Sphere(Wizard):
                            pos=self.SphereView.Center,
                            vdw=self.SphereView.Radius,
                            state=self.State)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.color('oxygen', self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.hide('everything', self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
 
             cmd.show('spheres', self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
             
         except:
             self.ErrorCode = 1
@@ -165,7 +167,7 @@ class Sphere(Wizard):
         try:
             cmd.alter(self.SphereDisplay,'vdw=' + str(self.SphereView.Radius))
             cmd.rebuild(self.SphereDisplay)
-            cmd.refresh()
+            General_cmd.refresh()
         except:
             self.queue.put(lambda: self.App.DisplayMessage("  ERROR: Could not resize the Sphere", 1))
             self.queue.put(lambda: self.App.DisplayMessage("         The wizard will abort prematurely", 1))
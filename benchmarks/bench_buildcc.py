@@ -0,0 +1,119 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_buildcc.py
+
+@summary: Poses/second of the reconstruction of the ligand coordinates, comparing one
+          Geometry.buildcc call per pose with Geometry.buildcc_population
+
+@usage: python bench_buildcc.py [NbAtoms]
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Geometry
+
+
+'''
+@summary: SUBROUTINE Synthetic_Ligand: builds a chain-like ligand (each atom built from the 3 previous)
+'''
+def Synthetic_Ligand(NbAtoms):
+
+    ListAtom = list()
+    RecAtom = dict()
+
+    for NoAtom in range(1, NbAtoms + 1):
+        ListAtom.append(NoAtom)
+        RecAtom[NoAtom] = [ max(NoAtom - k, 0) for k in (1, 2, 3) ]
+
+    return ListAtom, RecAtom
+
+'''
+@summary: SUBROUTINE Synthetic_Poses: random internal coordinates for NbPoses poses
+'''
+def Synthetic_Poses(ListAtom, NbPoses):
+
+    ICs = list()
+    for p in range(NbPoses):
+        ICs.append([ (random.uniform(1.0, 1.6), random.uniform(90.0, 130.0), random.uniform(-180.0, 180.0))
+                     for NoAtom in ListAtom ])
+
+    return ICs
+
+'''
+@summary: SUBROUTINE Build_Each: one buildcc call per pose (as done before)
+'''
+def Build_Each(ListAtom, RecAtom, ICs, Ori):
+
+    return [ Geometry.buildcc(ListAtom, RecAtom, dict(zip(ListAtom, IC)), Ori) for IC in ICs ]
+
+'''
+@summary: SUBROUTINE Run: returns the number of poses built per second
+'''
+def Run(Build, ListAtom, RecAtom, ICs, Ori, Repeat=3):
+
+    Best = None
+    for r in range(Repeat):
+        Start = time.time()
+        Build(ListAtom, RecAtom, ICs, Ori)
+        Elapsed = time.time() - Start
+
+        if Best is None or Elapsed < Best:
+            Best = Elapsed
+
+    return len(ICs) / max(Best, 1e-9)
+
+
+if __name__ == '__main__':
+
+    NbAtoms = 40
+    if len(sys.argv) > 1:
+        NbAtoms = int(sys.argv[1])
+
+    random.seed(0)
+    Ori = [ 12.0, -3.5, 27.25 ]
+    ListAtom, RecAtom = Synthetic_Ligand(NbAtoms)
+
+    # Both reconstructions must give the same coordinates
+    ICs = Synthetic_Poses(ListAtom, 20)
+    for Before, After in zip(Build_Each(ListAtom, RecAtom, ICs, Ori),
+                             Geometry.buildcc_population(ListAtom, RecAtom, ICs, Ori)):
+        for NoAtom in ListAtom:
+            if max([ abs(a - b) for a, b in zip(Before[NoAtom], After[NoAtom]) ]) > 1e-9:
+                print('Mismatch on atom %d' % NoAtom)
+                sys.exit(1)
+
+    if Geometry.numpy is None:
+        print('numpy is not available: buildcc_population falls back on buildcc')
+
+    print('%d atoms per pose' % NbAtoms)
+    for NbPoses in (10, 50, 200):
+        ICs = Synthetic_Poses(ListAtom, NbPoses)
+
+        Before = Run(Build_Each, ListAtom, RecAtom, ICs, Ori)
+        After = Run(Geometry.buildcc_population, ListAtom, RecAtom, ICs, Ori)
+
+        print('  %4d poses: buildcc %10.0f poses/s, buildcc_population %10.0f poses/s (%.2fx)' %
+              (NbPoses, Before, After, After / Before))
@@ -0,0 +1,87 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_cmd_calls.py
+
+@summary: Number and cost of the PyMOL calls made by the operations of General_cmd
+          on a synthetic target, run on the stand-in of fake_pymol.py
+
+@usage: python bench_cmd_calls.py [NbResidues] [Repeat]
+'''
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import fake_pymol
+cmd = fake_pymol.Install()
+
+import General_cmd
+
+from replay_log import Record_Target
+
+
+if __name__ == '__main__':
+
+    NbResidues = 200
+    Repeat = 100
+
+    if len(sys.argv) > 1:
+        NbResidues = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        Repeat = int(sys.argv[2])
+
+    TempDir = tempfile.mkdtemp()
+    Path = os.path.join(TempDir, 'TARGET.pdb')
+    Flexible = Record_Target(Path, [ 0.0, 0.0, 0.0 ], NbResidues)
+
+    cmd.load(Path, 'TARGET')
+    shutil.rmtree(TempDir, True)
+
+    Residue = Flexible[0][2] + str(Flexible[0][0]) + Flexible[0][1]
+
+    Operations = [ ('is_ATOM',           lambda: General_cmd.is_ATOM(Residue, 'TARGET')),
+                   ('object_Exists',     lambda: General_cmd.object_Exists('TARGET')),
+                   ('get_ID',            lambda: General_cmd.get_ID(1, 'TARGET')),
+                   ('Get_CenterOfMass2', lambda: General_cmd.Get_CenterOfMass2('TARGET', 1)),
+                   ('Get_MaxWidth',      lambda: General_cmd.Get_MaxWidth('TARGET', 1)),
+                   ('mask_Objects',      lambda: General_cmd.mask_Objects([])),
+                   ('unmask_Objects',    lambda: General_cmd.unmask_Objects([])) ]
+
+    print('%d atoms, %d repeats' % (cmd.count_atoms('TARGET'), Repeat))
+    print('  %-20s %12s %12s %12s' % ('operation', 'calls/op', 'cmd ms/op', 'ms/op'))
+
+    for Name, Operation in Operations:
+
+        cmd.Reset_Stats()
+
+        Start = time.time()
+        for i in range(Repeat):
+            Operation()
+        Elapsed = time.time() - Start
+
+        Calls = sum(cmd.Calls.values())
+        Seconds = sum(cmd.Time.values())
+
+        print('  %-20s %12.1f %12.3f %12.3f' % (Name, Calls / float(Repeat),
+                                                1000.0 * Seconds / Repeat, 1000.0 * Elapsed / Repeat))
+        print(cmd.Report('      '))
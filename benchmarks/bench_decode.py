@@ -0,0 +1,237 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_decode.py
+
+@summary: Chromosomes/second of the decoding of the genes (ligand internal coordinates and
+          side-chain rotamers), comparing the string slicing and dictionary updates of UpdateScreen
+          (before the reconstruction plan) with GeneDecoder.Decode and
+          ReconstructionPlan.Decode_Population of each generation
+
+@usage: python bench_decode.py [NbChromosomes]
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+
+import GeneDecoder
+import Geometry
+import ReconstructionPlan
+
+# Chromosomes printed for each generation
+NB_TOP = 20
+
+
+class SyntheticParse(object):
+
+    '''
+    @summary: Attributes of the Parse thread used by the decoding, for a chain-like ligand
+              with NbFlex flexible bonds (every other one defined by 2 atoms and a shift value,
+              every third one by 3 atoms and 2 shift values, the second one reported the other way)
+    '''
+    def __init__(self, NbAtoms, NbFlex):
+
+        self.Translation = 1
+        self.Rotation = 1
+        self.FlexStatus = 'flexible'
+
+        self.Ori = [ 12.0, -3.5, 27.25 ]
+        self.OriX = [ 13.0, -3.5, 27.25 ]
+        self.OriY = [ 12.0, -2.5, 27.25 ]
+
+        self.ListAtom = list(range(1, NbAtoms + 1))
+        self.RecAtom = dict()
+        self.DisAngDih = dict()
+        for NoAtom in self.ListAtom:
+            self.RecAtom[NoAtom] = [ max(NoAtom - k, 0) for k in (1, 2, 3) ]
+            self.DisAngDih[NoAtom] = [ 1.5, 110.0, 180.0 ]
+
+        self.VarAtoms = [ 1, 2, 3 ]
+
+        self.GridVertex = dict()
+        for index in range(1000):
+            self.GridVertex[index] = [ self.Ori[0] + random.uniform(-5.0, 5.0),
+                                       self.Ori[1] + random.uniform(-5.0, 5.0),
+                                       self.Ori[2] + random.uniform(-5.0, 5.0) ]
+
+        self.dictFlexBonds = dict()
+        self.FixedAngle = dict()
+        for k in range(1, NbFlex + 1):
+            NoAtom = 3 + k
+            if k % 3 == 0:
+                self.dictFlexBonds[k] = [ 1, 0, 3, str(NoAtom), str(NoAtom + NbFlex), str(NoAtom + 2 * NbFlex) ]
+                self.FixedAngle[str(NoAtom) + str(NoAtom + NbFlex)] = '120.0'
+                self.FixedAngle[str(NoAtom + 2 * NbFlex) + str(NoAtom + NbFlex)] = '-120.0'
+            elif k % 2:
+                self.dictFlexBonds[k] = [ 1, 0, 1, str(NoAtom) ]
+            else:
+                self.dictFlexBonds[k] = [ 1, 0, 2, str(NoAtom), str(NoAtom + NbFlex) ]
+                self.FixedAngle[str(NoAtom) + str(NoAtom + NbFlex)] = '120.0'
+
+        # Flexible side-chains (no rotamer accepted for the last one: it has no gene)
+        self.listSideChain = [ 'LYS12A', 'GLU40A', 'PHE7-', 'SER3A' ]
+        self.dictSideChainNRot = { 'LYS12A': 3, 'GLU40A': 3, 'PHE7-': 3 }
+
+'''
+@summary: SUBROUTINE Decode_Dictionary: decoding as done by UpdateScreen before the plan
+
+@return: internal coordinates of the ligand and rotamer index of each side-chain
+'''
+def Decode_Dictionary(top, Line, colNo):
+
+    index = int(float(Line[colNo:colNo+10]))
+
+    pointA = [ top.GridVertex[index][0], top.GridVertex[index][1], top.GridVertex[index][2] ]
+    pointB = [ top.OriX[0], top.OriX[1], top.OriX[2] ]
+    pointC = [ top.Ori[0], top.Ori[1], top.Ori[2] ]
+    pointD = [ top.OriY[0], top.OriY[1], top.OriY[2] ]
+
+    top.DisAngDih[top.VarAtoms[0]][0] = Geometry.distance(pointA, pointB)
+    top.DisAngDih[top.VarAtoms[0]][1] = Geometry.angle(pointA, pointB, pointC)
+    top.DisAngDih[top.VarAtoms[0]][2] = Geometry.dihedralAngle(pointA, pointB, pointC, pointD)
+    colNo += 11
+
+    top.DisAngDih[top.VarAtoms[1]][1] = float(Line[colNo:colNo+10])
+    top.DisAngDih[top.VarAtoms[1]][2] = float(Line[colNo+11:colNo+21])
+    top.DisAngDih[top.VarAtoms[2]][2] = float(Line[colNo+22:colNo+32])
+    colNo += 33
+
+    for k in sorted(top.dictFlexBonds.keys()):
+        if top.dictFlexBonds[k][0] == 1:
+
+            ColValue = float(Line[colNo:colNo+10])
+            colNo = colNo + 11
+
+            top.DisAngDih[int(top.dictFlexBonds[k][3])][2] = ColValue
+
+            for flexA in range(1, top.dictFlexBonds[k][2]):
+                ATflex_A = top.dictFlexBonds[k][flexA + 2]
+                ATflex_B = top.dictFlexBonds[k][flexA + 3]
+
+                ATmerge = ''
+                if top.FixedAngle.has_key(ATflex_A + ATflex_B):
+                    ATmerge = ATflex_A + ATflex_B
+                    Factor = 1
+                elif top.FixedAngle.has_key(ATflex_B + ATflex_A):
+                    ATmerge = ATflex_B + ATflex_A
+                    Factor = -1
+
+                if ATmerge:
+                    ColValue = ColValue + float(Factor) * float(top.FixedAngle[ATmerge])
+                    top.DisAngDih[int(ATflex_B)][2] = ColValue
+
+    IntVals = list()
+    for residue in top.listSideChain:
+        if top.dictSideChainNRot.get(residue,''):
+            IntVals.append(int(float(Line[colNo:(colNo+10)].strip()) + 0.5))
+            colNo = colNo + 11
+
+    return [ tuple(top.DisAngDih[NoAtom]) for NoAtom in top.ListAtom ], IntVals
+
+'''
+@summary: SUBROUTINE Decode_Columns: genes of a generation in one array, consumed by named slices
+'''
+def Decode_Columns(Decoder, Plan, Lines):
+
+    Genes = Decoder.Decode(Lines)
+
+    if Geometry.numpy is not None:
+        ICs = Plan.Decode_Population(Genes[:,Decoder.Ligand])
+    else:
+        ICs = Plan.Decode_Population([ Row[Decoder.Ligand] for Row in Genes ])
+
+    return [ (IC, [ int(Value + 0.5) for Value in Row[Decoder.SideChains] ]) for IC, Row in zip(ICs, Genes) ]
+
+'''
+@summary: SUBROUTINE Synthetic_Lines: chromosome lines with the ligand genes of top
+'''
+def Synthetic_Lines(top, NbLines):
+
+    Lines = list()
+    for i in range(NbLines):
+        Genes = [ float(random.randint(0, len(top.GridVertex) - 1)),
+                  random.uniform(0.0, 180.0), random.uniform(-180.0, 180.0), random.uniform(-180.0, 180.0) ]
+        Genes.extend([ random.uniform(-180.0, 180.0) for k in top.dictFlexBonds.keys() ])
+        Genes.extend([ float(random.randint(0, 3)) for residue in top.dictSideChainNRot.keys() ])
+
+        Lines.append('%4d (' % (i % 10) + ' '.join([ '%10.2f' % Gene for Gene in Genes ]) +
+                     ' )  cf=   67.444 cf.app=   67.444 fitnes=   14.799\n')
+
+    return Lines
+
+'''
+@summary: SUBROUTINE Run: returns the number of chromosomes decoded per second (a generation at a time)
+'''
+def Run(Decode, Generations, Repeat=3):
+
+    Best = None
+    for r in range(Repeat):
+        Start = time.time()
+        for Generation in Generations:
+            Decode(Generation)
+        Elapsed = time.time() - Start
+
+        if Best is None or Elapsed < Best:
+            Best = Elapsed
+
+    return sum([ len(Generation) for Generation in Generations ]) / Best
+
+
+if __name__ == '__main__':
+
+    NbLines = 20000
+    if len(sys.argv) > 1:
+        NbLines = int(sys.argv[1])
+
+    random.seed(0)
+    top = SyntheticParse(40, 8)
+    Decoder = GeneDecoder.GeneDecoder(top)
+    Plan = ReconstructionPlan.ReconstructionPlan(top)
+
+    # (TOP, colNo, Line) of the chromosomes of each generation
+    Lines = Synthetic_Lines(top, NbLines)
+    Generations = [ [ (i % NB_TOP, 6, Line) for i, Line in enumerate(Lines[Gen:Gen + NB_TOP]) ]
+                    for Gen in range(0, NbLines, NB_TOP) ]
+
+    # Both decodings must give the same internal coordinates and rotamers
+    for Generation in Generations[:10]:
+        for Chromosome, After in zip(Generation, Decode_Columns(Decoder, Plan, Generation)):
+            Before = Decode_Dictionary(top, Chromosome[2], Chromosome[1])
+            Mismatch = Before[1] != After[1]
+            for an in range(len(Before[0])):
+                if max([ abs(a - b) for a, b in zip(Before[0][an], After[0][an]) ]) > 1e-9:
+                    Mismatch = True
+            if Mismatch:
+                print('Mismatch on line: ' + Chromosome[2])
+                sys.exit(1)
+
+    Before = Run(lambda Generation: [ Decode_Dictionary(top, Line, colNo) for TOP, colNo, Line in Generation ],
+                 Generations)
+    After = Run(lambda Generation: Decode_Columns(Decoder, Plan, Generation), Generations)
+
+    print('%d chromosomes, %d genes (%d for the ligand)' % (NbLines, Decoder.NbGenes, len(Plan.Columns)))
+    print('  slices and dictionary updates: %12.0f chromosomes/s' % Before)
+    print('  GeneDecoder and plan:          %12.0f chromosomes/s' % After)
+    print('  speedup:                       %12.2fx' % (After / Before))
@@ -0,0 +1,174 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_geometry.py
+
+@summary: Points/second of the functions of Geometry called point by point in a loop,
+          compared with their batch versions (middle_batch, sqrdistance_batch, ...),
+          and time taken by Grid.build_Grid before and after using sqrdistance_batch
+
+@usage: python bench_geometry.py [NbPoints]
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Geometry
+import Grid
+
+
+class SyntheticGrid(object):
+
+    '''
+    @summary: Attributes of the Grid thread used by build_Grid, for NbSpheres spheres of a cleft
+    '''
+    def __init__(self, NbSpheres, Spacer):
+
+        self.Spacer = Spacer
+        self.dictGridPoints = dict()
+        self.dictSpheres = dict()
+
+        for i in range(NbSpheres):
+            self.dictSpheres[str(i + 1)] = [ random.uniform(1.5, 4.0),
+                                             [ random.uniform(-4.0, 4.0) for k in range(3) ] ]
+
+    def get_Axis(self, vmin, vmax):
+
+        return Grid.Grid.get_Axis.__func__(self, vmin, vmax)
+
+    def get_Points(self, listX, listY, listZ):
+
+        return Grid.Grid.get_Points.__func__(self, listX, listY, listZ)
+
+'''
+@summary: SUBROUTINE Build_Grid_Scalar: grid points of the spheres as done by Grid.build_Grid
+                                        before sqrdistance_batch (one sqrdistance per point)
+'''
+def Build_Grid_Scalar(top):
+
+    for sph in top.dictSpheres.keys():
+
+        Radius, Center = top.dictSpheres[sph]
+
+        xmin = float(int((Center[0] - Radius) / top.Spacer)) * top.Spacer
+        ymin = float(int((Center[1] - Radius) / top.Spacer)) * top.Spacer
+        zmin = float(int((Center[2] - Radius) / top.Spacer)) * top.Spacer
+        xmax = float(int((Center[0] + Radius) / top.Spacer) + 1.0) * top.Spacer
+        ymax = float(int((Center[1] + Radius) / top.Spacer) + 1.0) * top.Spacer
+        zmax = float(int((Center[2] + Radius) / top.Spacer) + 1.0) * top.Spacer
+
+        sqrrad = Radius * Radius
+
+        z = zmin
+        while z < zmax:
+            y = ymin
+            while y < ymax:
+                x = xmin
+                while x < xmax:
+
+                    key  = '%8.3f' % x
+                    key += '%8.3f' % y
+                    key += '%8.3f' % z
+
+                    if key not in top.dictGridPoints:
+                        if Geometry.sqrdistance(Center, [ x, y, z ]) < sqrrad:
+                            top.dictGridPoints[key] = ''
+
+                    x += top.Spacer
+                y += top.Spacer
+            z += top.Spacer
+
+    return top.dictGridPoints
+
+'''
+@summary: SUBROUTINE Run: returns the best time of Repeat calls of Function
+'''
+def Run(Function, Repeat=3):
+
+    Best = None
+    for r in range(Repeat):
+        Start = time.time()
+        Function()
+        Elapsed = time.time() - Start
+
+        if Best is None or Elapsed < Best:
+            Best = Elapsed
+
+    return max(Best, 1e-9)
+
+
+if __name__ == '__main__':
+
+    NbPoints = 100000
+    if len(sys.argv) > 1:
+        NbPoints = int(sys.argv[1])
+
+    random.seed(0)
+    Points = [ [ [ random.uniform(-10.0, 10.0) for k in range(3) ] for i in range(NbPoints) ] for p in range(4) ]
+    A, B, C, D = Points
+    O = [ 0.0, 0.0, 0.0 ]
+
+    Functions = [ ('middle',        lambda: [ Geometry.middle(a, O) for a in A ],
+                                    lambda: Geometry.middle_batch(A, O)),
+                  ('sqrdistance',   lambda: [ Geometry.sqrdistance(a, O) for a in A ],
+                                    lambda: Geometry.sqrdistance_batch(A, O)),
+                  ('distance',      lambda: [ Geometry.distance(a, b) for a, b in zip(A, B) ],
+                                    lambda: Geometry.distance_batch(A, B)),
+                  ('angle',         lambda: [ Geometry.angle(a, b, c) for a, b, c in zip(A, B, C) ],
+                                    lambda: Geometry.angle_batch(A, B, C)),
+                  ('dihedralAngle', lambda: [ Geometry.dihedralAngle(a, b, c, d) for a, b, c, d in zip(A, B, C, D) ],
+                                    lambda: Geometry.dihedralAngle_batch(A, B, C, D)) ]
+
+    print('%d points (numpy %s)' % (NbPoints, 'available' if Geometry.numpy is not None else 'not available'))
+    print('  %-16s %14s %14s %9s' % ('function', 'loop pts/s', 'batch pts/s', 'speedup'))
+
+    for Name, Loop, Batch in Functions:
+
+        Before = Loop()
+        After = Batch()
+        if max([ abs(x - y) for x, y in zip(Before, After) if not isinstance(x, list) ] + [ 0.0 ]) > 1e-6:
+            print('Mismatch in ' + Name)
+            sys.exit(1)
+
+        LoopTime = Run(Loop)
+        BatchTime = Run(Batch)
+
+        print('  %-16s %14.0f %14.0f %8.1fx' % (Name, NbPoints / LoopTime, NbPoints / BatchTime, LoopTime / BatchTime))
+
+    random.seed(0)
+    Before = Build_Grid_Scalar(SyntheticGrid(20, 0.375))
+
+    random.seed(0)
+    top = SyntheticGrid(20, 0.375)
+    Grid.Grid.build_Grid.__func__(top)
+
+    if sorted(Before.keys()) != sorted(top.dictGridPoints.keys()):
+        print('Mismatch in build_Grid')
+        sys.exit(1)
+
+    ScalarTime = Run(lambda: Build_Grid_Scalar(SyntheticGrid(20, 0.375)))
+    BatchTime = Run(lambda: Grid.Grid.build_Grid.__func__(SyntheticGrid(20, 0.375)))
+
+    print('  %-16s %13.3fs %13.3fs %8.1fx   (%d grid points)' % ('build_Grid', ScalarTime, BatchTime,
+                                                                  ScalarTime / BatchTime, len(Before)))
@@ -0,0 +1,167 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_grid.py
+
+@summary: Time and memory taken by the grid lines of the log (Grid[i]=), comparing the dict
+          of lists of Parse before GridVertices, the array grown in chunks and the grid
+          memory-mapped from the file saved by a previous simulation (checked against the
+          lines without keeping them, a saved grid with one vertex moved must be rejected)
+
+@usage: python bench_grid.py [NbVertices]
+'''
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import LogReader
+import GridVertices
+
+
+'''
+@summary: SUBROUTINE Parse_Dict: vertices stored as done before GridVertices
+'''
+def Parse_Dict(Lines):
+
+    GridVertex = dict()
+
+    for Line in Lines:
+        Record, m = LogReader.Classify(Line)
+
+        index = int(m.group(1))
+        strcoor = Line[(Line.find('=')+1):]
+        GridVertex[index] = [ float(strcoor[0:8].strip()),
+                              float(strcoor[8:16].strip()),
+                              float(strcoor[16:24].strip()) ]
+
+    return GridVertex
+
+'''
+@summary: SUBROUTINE Parse_Array: vertices stored as done by Parse.Parse_Grid
+'''
+def Parse_Array(Lines):
+
+    GridVertex = GridVertices.GridVertices()
+
+    for Line in Lines:
+        Record, m = LogReader.Classify(Line)
+
+        index = int(m.group(1))
+        strcoor = Line[(Line.find('=')+1):]
+        GridVertex.Set(index, float(strcoor[0:8].strip()),
+                              float(strcoor[8:16].strip()),
+                              float(strcoor[16:24].strip()))
+
+    return GridVertex
+
+'''
+@summary: SUBROUTINE Parse_Cached: the saved grid is loaded, the lines are counted and a few
+                                   vertices compared, as done by Parse.Parse_Grid
+
+@return: the saved grid, None when it does not match the lines
+'''
+def Parse_Cached(Lines, Path):
+
+    GridVertex = GridVertices.Load(Path)
+
+    for Line in Lines:
+        Record, m = LogReader.Classify(Line)
+
+        index = int(m.group(1))
+        if not GridVertex.Report(index):
+            continue
+
+        strcoor = Line[(Line.find('=')+1):]
+        GridVertex.Check(index, float(strcoor[0:8].strip()),
+                                float(strcoor[8:16].strip()),
+                                float(strcoor[16:24].strip()))
+
+    if not GridVertex.Is_Valid():
+        return None
+
+    return GridVertex
+
+
+if __name__ == '__main__':
+
+    NbVertices = 200000
+
+    if len(sys.argv) > 1:
+        NbVertices = int(sys.argv[1])
+
+    Lines = [ 'Grid[%d]=%8.3f%8.3f%8.3f\n' % (i, (i % 80) * 0.375, (i // 80 % 80) * 0.375, (i // 6400) * 0.375)
+              for i in range(NbVertices) ]
+
+    TempDir = tempfile.mkdtemp()
+    Path = os.path.join(TempDir, 'grid.npy')
+
+    Start = time.time()
+    GridDict = Parse_Dict(Lines)
+    DictElapsed = time.time() - Start
+
+    Start = time.time()
+    GridArray = Parse_Array(Lines)
+    ArrayElapsed = time.time() - Start
+
+    Start = time.time()
+    GridArray.Save(Path)
+    SaveElapsed = time.time() - Start
+
+    Start = time.time()
+    GridCached = Parse_Cached(Lines, Path)
+    CachedElapsed = time.time() - Start
+
+    if GridCached is None:
+        raise ValueError('saved grid does not match')
+
+    # A grid saved with one of the vertices compared moved by a spacing
+    MovedPath = os.path.join(TempDir, 'moved.npy')
+    Moved = GridVertices.GridVertices()
+    for index in range(NbVertices):
+        Moved.Set(index, *GridArray[index])
+    Moved.Set(sorted(GridCached.Checks)[len(GridCached.Checks) // 2], 0.0, 0.0, -0.375)
+    Moved.Save(MovedPath)
+
+    if Parse_Cached(Lines, MovedPath) is not None:
+        raise ValueError('saved grid with a moved vertex was accepted')
+
+    for index in range(0, NbVertices, 997):
+        for k in range(3):
+            if abs(GridCached[index][k] - GridDict[index][k]) > 1e-4:
+                raise ValueError('vertex ' + str(index) + ' differs')
+
+    # Dict of lists: dict slot, the list and its 3 floats
+    DictBytes = sys.getsizeof(GridDict) + sum([ sys.getsizeof(Vertex) + 3 * sys.getsizeof(Vertex[0])
+                                                for Vertex in GridDict.values() ])
+
+    print('%d vertices' % NbVertices)
+    print('  dict of lists      %8.3f s %10.1f MB' % (DictElapsed, DictBytes / 1e6))
+    print('  array (chunks)     %8.3f s %10.1f MB' % (ArrayElapsed, GridArray.Array.nbytes / 1e6))
+    print('  save .npy          %8.3f s %10.1f MB' % (SaveElapsed, os.path.getsize(Path) / 1e6))
+    print('  memory-mapped      %8.3f s  (%d vertices compared, no line kept)' % (CachedElapsed, GridCached.Checked))
+
+    del GridCached
+    shutil.rmtree(TempDir, True)
@@ -0,0 +1,139 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_parse_lines.py
+
+@summary: Lines/second of the classification of FlexAID log lines, comparing the
+          sequential re.match chain of Parse.ParseLines with LogReader.Classify
+
+@usage: python bench_parse_lines.py [NbLines]
+'''
+
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+
+import LogReader
+
+
+'''
+@summary: SUBROUTINE Synthetic_Log: builds a log made mostly of grid and chromosome lines
+'''
+def Synthetic_Log(NbLines):
+
+    Lines = [ 'the protein center of coordinates is:   12.000   -3.500   27.250 \n',
+              'best by energy \n' ]
+    
+    for i in range(20):
+        Lines.append('lout[%d]= %d \n' % (i, i + 1))
+        Lines.append('shiftval= %d %d 0 0 %.3f\n' % (i + 1, i + 2, 120.0))
+        Lines.append('Rotamer for GLU81- with dihedrals  -87.647  -80.859   27.236\n')
+    
+    i = 0
+    while len(Lines) < NbLines // 2:
+        Lines.append('Grid[%d]=%8.3f%8.3f%8.3f\n' % (i, i * 0.375, -i * 0.375, 1.0))
+        i += 1
+
+    Lines.append('SIGMA_SHARE 1.0\n')
+
+    Gen = 0
+    while len(Lines) < NbLines:
+        Lines.append('Generation: %d \n' % Gen)
+        for TOP in range(10):
+            Lines.append('%4d (   4868.00    -180.00    -180.00    -180.00 )  cf=   67.444 cf.app=   67.444 fitnes=   14.799\n' % TOP)
+        Lines.append('some unrelated output line\n')
+        Gen += 1
+
+    return Lines[:NbLines]
+
+'''
+@summary: SUBROUTINE Classify_Sequential: classification as done before the dispatch table
+'''
+def Classify_Sequential(Line):
+
+    m = re.match("Grid\[(\d+)\]=", Line)
+    if m: return 'GRID', m
+    m = re.match("(\s*(\d+) \()", Line)
+    if m: return 'CHROMOSOME', m
+    m = re.match("Generation:\s*(\d+)\s+", Line)
+    if m: return 'GENERATION', m
+    m = re.match("best by (\w+)\s+", Line)
+    if m: return 'BESTBY', m
+    m = re.match("clustering all individuals", Line)
+    if m: return 'CLUSTERING', m
+    m = re.match("Rotamer for", Line)
+    if m: return 'ROTAMER', m
+    m = re.match("Done.", Line)
+    if m: return None, None
+    m = re.match("shiftval=", Line)
+    if m: return 'SHIFTVAL', m
+    m = re.match("lout\[\d+\]=\s*(\d+)\s+", Line)
+    if m: return 'LOUT', m
+    m = re.match("the protein center of coordinates is:\s+(\S+)\s+(\S+)\s+(\S+)\s+", Line)
+    if m: return 'CENTER', m
+    m = re.match("SIGMA_SHARE", Line)
+    if m: return 'SIGMASHARE', m
+    m = re.match("ERROR", Line)
+    if m: return 'ERROR', m
+
+    return None, None
+
+'''
+@summary: SUBROUTINE Run: returns the number of lines classified per second
+'''
+def Run(Classify, Lines, Repeat=3):
+
+    Best = None
+    for r in range(Repeat):
+        Start = time.time()
+        for Line in Lines:
+            Classify(Line)
+        Elapsed = time.time() - Start
+        
+        if Best is None or Elapsed < Best:
+            Best = Elapsed
+
+    return len(Lines) / Best
+
+
+if __name__ == '__main__':
+
+    NbLines = 100000
+    if len(sys.argv) > 1:
+        NbLines = int(sys.argv[1])
+    
+    Lines = Synthetic_Log(NbLines)
+
+    # Both classifiers must agree on every line
+    for Line in Lines:
+        if Classify_Sequential(Line)[0] != LogReader.Classify(Line)[0]:
+            print('Mismatch on line: ' + Line)
+            sys.exit(1)
+
+    Before = Run(Classify_Sequential, Lines)
+    After = Run(LogReader.Classify, Lines)
+
+    print('%d synthetic log lines' % NbLines)
+    print('  sequential re.match chain: %12.0f lines/s' % Before)
+    print('  dispatch table (Classify): %12.0f lines/s' % After)
+    print('  speedup:                   %12.2fx' % (After / Before))
@@ -0,0 +1,217 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_results.py
+
+@summary: Time taken to load the RESULT_*.pdb files of a run, comparing the whole files read
+          as done by Result.get_CF_info before the result index, the headers only and the
+          result index written once the simulation terminated (see Manage.Write_ResultIndex)
+
+@usage: python bench_results.py [NbResults] [NbAtoms]
+'''
+
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Result
+
+
+class WholeFile(Result.Result):
+
+    '''
+    @summary: Result read as done before the result index (the whole file, up to eight searches per line)
+    '''
+    def get_CF_info(self):
+
+        fh = open(self.ResultFile,'r')
+        Lines = fh.readlines()
+        fh.close()
+
+        for Line in Lines:
+
+            if re.match('REMARK', Line):
+
+                m = re.search('optimizable residue (.{3}) (.) (.{4})', Line)
+                if m:
+                    Res = m.group(1)
+                    C = m.group(2)
+                    Num = m.group(3)
+
+                    if C == ' ':
+                        C = '-'
+
+                    Res = Res.replace(' ','-')
+                    Num = Num.replace(' ','')
+
+                    self.Opt = Result.CF(Res + Num + C)
+                    self.Optimizable.append(self.Opt)
+                    continue
+
+                m = re.search('CF=\s*(\S+)', Line)
+                if m:
+                    self.CF = float(m.group(1))
+                    continue
+
+                m = re.search('CF\.app=\s*(\S+)', Line)
+                if m:
+                    self.CFapp = float(m.group(1))
+                    continue
+
+                m = re.search('CF\.con=\s*(\S+)', Line)
+                if m:
+                    self.Opt.con = float(m.group(1))
+                    continue
+
+                m = re.search('CF\.wal=\s*(\S+)', Line)
+                if m:
+                    self.Opt.wal = float(m.group(1))
+                    continue
+
+                m = re.search('CF\.sas=\s*(\S+)', Line)
+                if m:
+                    self.Opt.sas = float(m.group(1))
+                    continue
+
+                m = re.search('CF\.com=\s*(\S+)', Line)
+                if m:
+                    self.Opt.com = float(m.group(1))
+                    continue
+
+                m = re.search('(\S+) RMSD to ref\. structure', Line)
+                if m:
+                    self.RMSD = float(m.group(1))
+                    continue
+
+            elif re.match('ATOM  ', Line):
+                break
+
+'''
+@summary: SUBROUTINE Write_Results: writes NbResults result files of a target of NbAtoms atoms to Folder
+'''
+def Write_Results(Folder, NbResults, NbAtoms):
+
+    for i in range(NbResults):
+        out = open(os.path.join(Folder, 'RESULT_%d.pdb' % i), 'w')
+
+        out.write('REMARK optimizable residue LIG   9999\n')
+        out.write('REMARK CF=%10.5f\n' % (-100.0 + i))
+        out.write('REMARK CF.app=%10.5f\n' % (-98.0 + i))
+        out.write('REMARK CF.com=%10.5f\n' % 10.0)
+        out.write('REMARK CF.sas=%10.5f\n' % -20.0)
+        out.write('REMARK CF.wal=%10.5f\n' % 1.0)
+        out.write('REMARK CF.con=%10.5f\n' % 0.0)
+        out.write('REMARK optimizable residue LYS A   12\n')
+        out.write('REMARK CF.com=%10.5f\n' % 3.5)
+        out.write('REMARK CF.sas=%10.5f\n' % -2.0)
+        out.write('REMARK CF.wal=%10.5f\n' % 0.5)
+        out.write('REMARK CF.con=%10.5f\n' % 0.0)
+        out.write('REMARK %8.5f RMSD to ref. structure\n' % (i * 0.5))
+
+        for NoAtom in range(1, NbAtoms + 1):
+            out.write('ATOM  %5d  CA  ALA A%4d    %8.3f%8.3f%8.3f  1.00  0.00           C  \n' %
+                      (NoAtom % 100000, (NoAtom // 5) % 10000, 0.1 * (NoAtom % 97), 0.1 * (NoAtom % 89), 0.1 * (NoAtom % 83)))
+        for NoAtom in range(1, 41):
+            out.write('HETATM%5d  C%-2d LIG A9999    %8.3f%8.3f%8.3f  1.00  0.00           C  \n' %
+                      (NoAtom, NoAtom, 1.25 * NoAtom, 0.0, 0.0))
+        out.write('END\n')
+        out.close()
+
+'''
+@summary: SUBROUTINE Load: results of Folder as loaded by Manage.Load_ResultFiles
+'''
+def Load(Folder, Class, dictSummary):
+
+    Results = list()
+
+    for file in glob.glob(os.path.join(Folder, 'RESULT_*.pdb')):
+        m = re.search("RESULT_(\d+)\.pdb$", file)
+        if m:
+            Results.append(Class(file, int(m.group(1)) + 1, dictSummary.get(file)))
+
+    return Results
+
+'''
+@summary: SUBROUTINE Get_Values: CF information of the results (by result ID) to compare the loadings
+'''
+def Get_Values(Results):
+
+    dictValues = dict()
+    for Res in Results:
+        dictValues[Res.ResultID] = [ Res.CF, Res.CFapp, Res.RMSD,
+                                     [ (Opt.rnc, Opt.com, Opt.wal, Opt.sas, Opt.con) for Opt in Res.Optimizable ] ]
+
+    return dictValues
+
+
+if __name__ == '__main__':
+
+    NbResults = 10
+    NbAtoms = 50000
+
+    if len(sys.argv) > 1:
+        NbResults = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        NbAtoms = int(sys.argv[2])
+
+    TempDir = tempfile.mkdtemp()
+    IndexPath = os.path.join(TempDir, 'results.idx')
+
+    Write_Results(TempDir, NbResults, NbAtoms)
+
+    Start = time.time()
+    Whole = Load(TempDir, WholeFile, dict())
+    WholeElapsed = time.time() - Start
+
+    Start = time.time()
+    Headers = Load(TempDir, Result.Result, dict())
+    HeadersElapsed = time.time() - Start
+
+    Start = time.time()
+    Result.Write_Index(IndexPath, Headers)
+    WriteElapsed = time.time() - Start
+
+    Start = time.time()
+    Indexed = Load(TempDir, Result.Result, Result.Read_Index(IndexPath))
+    IndexElapsed = time.time() - Start
+
+    # A result file written again is read from its header
+    os.utime(os.path.join(TempDir, 'RESULT_0.pdb'), (0, 0))
+    Stale = Load(TempDir, Result.Result, Result.Read_Index(IndexPath))
+
+    for Results in (Headers, Indexed, Stale):
+        if Get_Values(Results) != Get_Values(Whole):
+            print('Mismatch in the CF information of the results')
+            sys.exit(1)
+
+    print('%d result(s) of %d atoms' % (NbResults, NbAtoms))
+    print('  whole files        %8.3f s' % WholeElapsed)
+    print('  headers only       %8.3f s' % HeadersElapsed)
+    print('  write index        %8.3f s' % WriteElapsed)
+    print('  result index       %8.3f s' % IndexElapsed)
+
+    shutil.rmtree(TempDir, True)
@@ -0,0 +1,252 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_rotamers.py
+
+@summary: Time spent applying the rotamers of the flexible side-chains of a TOP complex,
+          comparing cmd.set_dihedral on atom selections (UpdateScreen before the rotamer plan)
+          with RotamerPlan.Apply and a single coordinates write, without and with the cache
+          of the side-chains built (the few rotamers of each residue recur in every generation).
+          The side-chains must match those of cmd.set_dihedral, and their chis measured by
+          cmd.get_dihedral the rotamers chosen (both computed by PyMOL, not by Geometry).
+
+@usage: python bench_rotamers.py [NbResidues] [NbFlexible] [NbUpdates]
+        (with a python where pymol can be imported, or pymol -cq bench_rotamers.py -- ...,
+        otherwise on the stand-in of fake_pymol.py, whose dihedrals do not use Geometry either)
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+
+try:
+    from pymol import cmd
+except ImportError:
+    # Without PyMOL, the calls are made to the stand-in
+    import fake_pymol
+    cmd = fake_pymol.Install()
+
+import Constants
+import RotamerPlan
+import bench_top_update
+
+OLD = 'TOP_1__'
+NEW = 'TOP_2__'
+CACHED = 'TOP_3__'
+
+# Rotamers reported by FlexAID for each flexible side-chain
+NB_ROTAMERS = 4
+
+
+'''
+@summary: SUBROUTINE Get_Flexible: the NbFlexible first residues of the target that have chis
+'''
+def Get_Flexible(NbFlexible):
+
+    Residues = list()
+    cmd.iterate(bench_top_update.TARGET + ' & name CA', 'Residues.append(resn + resi + "-")',
+                space={ 'Residues': Residues })
+
+    return [ residue for residue in Residues if residue[0:3] in Constants.nFlexBonds ][:NbFlexible]
+
+def Select_Residues(Obj, Flexible):
+
+    return ' or '.join([ '(resn ' + residue[0:3] + ' & resi ' + residue[3:-1] + " & chain '' & " + Obj + ')'
+                         for residue in Flexible ])
+
+def Select_SideChains(Obj, Flexible):
+
+    return '((' + Select_Residues(Obj, Flexible) + ') & ! name C+O+N)'
+
+def Get_AtomString(Obj, residue, Atom):
+
+    return 'resn ' + residue[0:3] + ' & resi ' + residue[3:-1] + " & chain '' & name " + Atom + ' & ' + Obj
+
+'''
+@summary: SUBROUTINE Update_SetDihedral: restores the side-chains then one set_dihedral per chi
+'''
+def Update_SetDihedral(Flexible, dictInitial, dictRotamers):
+
+    cmd.alter_state(1, Select_SideChains(OLD, Flexible), '(x,y,z) = dictCoord[index]',
+                    space={ 'dictCoord': dictInitial })
+
+    for residue in sorted(dictRotamers.keys()):
+        Res = residue[0:3]
+        Angles = dictRotamers[residue][1]
+        for k in range(len(Angles)):
+            cmd.set_dihedral(Get_AtomString(OLD, residue, Constants.setDihedrals[Res][4*k+0]),
+                             Get_AtomString(OLD, residue, Constants.setDihedrals[Res][4*k+1]),
+                             Get_AtomString(OLD, residue, Constants.setDihedrals[Res][4*k+2]),
+                             Get_AtomString(OLD, residue, Constants.setDihedrals[Res][4*k+3]),
+                             Angles[k], 1)
+
+'''
+@summary: SUBROUTINE Update_Plan: side-chains computed from the plan and written at once
+'''
+def Update_Plan(Obj, Flexible, Plan, dictRotamers):
+
+    cmd.load_coords(Plan.Apply(dictRotamers), Select_SideChains(Obj, Flexible), state=1)
+
+'''
+@summary: SUBROUTINE Get_ChiError: largest difference between the chis chosen and the chis of Obj
+                                   measured by cmd.get_dihedral (a reference independent of Geometry)
+'''
+def Get_ChiError(Obj, dictRotamers):
+
+    Worst = 0.0
+
+    for residue in sorted(dictRotamers.keys()):
+        Res = residue[0:3]
+        Angles = dictRotamers[residue][1]
+        for k in range(len(Angles)):
+            Angle = cmd.get_dihedral(Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+0]),
+                                     Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+1]),
+                                     Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+2]),
+                                     Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+3]), 1)
+
+            Delta = abs(Angle - Angles[k]) % 360.0
+            Worst = max(Worst, min(Delta, 360.0 - Delta))
+
+    return Worst
+
+def Get_Coords(Obj, Flexible):
+
+    Coords = list()
+    cmd.iterate_state(1, Select_SideChains(Obj, Flexible), 'Coords.append((x,y,z))', space={ 'Coords': Coords })
+
+    return Coords
+
+
+if __name__ == '__main__':
+
+    Args = [ arg for arg in sys.argv[1:] if arg != '--' ]
+
+    NbResidues = 1000
+    NbFlexible = 20
+    NbUpdates = 20
+
+    if len(Args) > 0:
+        NbResidues = int(Args[0])
+    if len(Args) > 1:
+        NbFlexible = int(Args[1])
+    if len(Args) > 2:
+        NbUpdates = int(Args[2])
+
+    random.seed(0)
+    cmd.feedback('disable', 'all', 'everything')
+
+    bench_top_update.Build_Target(NbResidues)
+    Flexible = Get_Flexible(NbFlexible)
+
+    cmd.create(OLD, bench_top_update.TARGET, 1, 1)
+    cmd.create(NEW, bench_top_update.TARGET, 1, 1)
+    cmd.create(CACHED, bench_top_update.TARGET, 1, 1)
+
+    dictInitial = dict()
+    cmd.iterate_state(1, Select_SideChains(OLD, Flexible), 'dictCoord[index] = (x,y,z)',
+                      space={ 'dictCoord': dictInitial })
+
+    Start = time.time()
+    Plan = RotamerPlan.RotamerPlan(cmd.get_model('(' + Select_Residues(NEW, Flexible) + ') extend 1', state=1), Flexible)
+    Compile = time.time() - Start
+
+    Cache = RotamerPlan.RotamerCache()
+    CachedPlan = RotamerPlan.RotamerPlan(cmd.get_model('(' + Select_Residues(CACHED, Flexible) + ') extend 1', state=1),
+                                         Flexible, Cache)
+
+    dictReported = dict()
+    for residue in Flexible:
+        dictReported[residue] = [ random.uniform(-180.0, 180.0)
+                                  for k in range(NB_ROTAMERS * Constants.nFlexBonds[residue[0:3]]) ]
+
+    NbChis = sum([ Constants.nFlexBonds[residue[0:3]] for residue in Flexible ])
+    if [ residue for residue in Flexible if not Plan.dictChis[residue] ]:
+        print('Some residues could not be compiled')
+        sys.exit(1)
+
+    TimeOld = 0.0
+    TimeNew = 0.0
+    TimeCached = 0.0
+    ApplyNew = 0.0
+    ApplyCached = 0.0
+    Worst = 0.0
+    WorstChi = 0.0
+
+    for Update in range(NbUpdates):
+
+        # Rotamer chosen for each side-chain as in UpdateScreen (0 is the initial conformation)
+        dictRotamers = dict()
+        for residue in Flexible:
+            IntVal = random.randint(0, NB_ROTAMERS)
+            nFlex = Constants.nFlexBonds[residue[0:3]]
+            if IntVal > 0:
+                dictRotamers[residue] = (IntVal, dictReported[residue][(IntVal-1)*nFlex:IntVal*nFlex])
+
+        Start = time.time()
+        Update_SetDihedral(Flexible, dictInitial, dictRotamers)
+        TimeOld += time.time() - Start
+
+        Start = time.time()
+        Update_Plan(NEW, Flexible, Plan, dictRotamers)
+        TimeNew += time.time() - Start
+
+        Start = time.time()
+        Update_Plan(CACHED, Flexible, CachedPlan, dictRotamers)
+        TimeCached += time.time() - Start
+
+        # Coordinates computation alone
+        Start = time.time()
+        Plan.Apply(dictRotamers)
+        ApplyNew += time.time() - Start
+
+        Start = time.time()
+        CachedPlan.Apply(dictRotamers)
+        ApplyCached += time.time() - Start
+
+        # All must give the same side-chains, with the chis chosen
+        Reference = Get_Coords(OLD, Flexible)
+        for Obj in (NEW, CACHED):
+            for a, b in zip(Reference, Get_Coords(Obj, Flexible)):
+                Worst = max(Worst, max([ abs(a[k] - b[k]) for k in range(3) ]))
+
+            WorstChi = max(WorstChi, Get_ChiError(Obj, dictRotamers))
+
+    if Worst > 2e-3:
+        print('Mismatch of the side-chains coordinates: %.4f A' % Worst)
+        sys.exit(1)
+
+    if WorstChi > 0.01:
+        print('Mismatch of the chis measured by cmd.get_dihedral: %.4f degrees' % WorstChi)
+        sys.exit(1)
+
+    print('%d residues (%d atoms), %d flexible side-chain(s) (%d chis), %d update(s)' %
+          (NbResidues, cmd.count_atoms(bench_top_update.TARGET), len(Flexible), NbChis, NbUpdates))
+    print('  plan compiled once:     %10.1f ms' % (1000.0 * Compile))
+    print('  cmd.set_dihedral:       %10.1f ms per update' % (1000.0 * TimeOld / NbUpdates))
+    print('  RotamerPlan.Apply:      %10.1f ms per update (%.2fx)' % (1000.0 * TimeNew / NbUpdates, TimeOld / TimeNew))
+    print('  with the rotamer cache: %10.1f ms per update (%.2fx), %d hit(s), %d miss(es)' %
+          (1000.0 * TimeCached / NbUpdates, TimeOld / TimeCached, Cache.Hits, Cache.Misses))
+    print('  computation alone:      %10.2f ms per update without the cache, %.2f ms with it' %
+          (1000.0 * ApplyNew / NbUpdates, 1000.0 * ApplyCached / NbUpdates))
+    print('  largest difference:     %10.4f A from cmd.set_dihedral, %.4f degrees from the chis chosen' % (Worst, WorstChi))
@@ -0,0 +1,301 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_top_update.py
+
+@summary: Time spent updating the TOP_n__ objects in PyMOL for a large target, comparing
+          the copy of the whole target for every TOP (UpdateScreen before persistent complexes)
+          with complexes created once and updated in place (ligand and flexible side-chains)
+
+@usage: python bench_top_update.py [NbResidues] [NbTop] [NbGen] [NbFlexible]
+        (with a python where pymol can be imported, or pymol -cq bench_top_update.py -- ...,
+        otherwise on the stand-in of fake_pymol.py)
+'''
+
+import os
+import sys
+import time
+import math
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    from pymol import cmd
+    from pymol import util
+except ImportError:
+    # Without PyMOL, the calls are made to the stand-in
+    import fake_pymol
+    cmd = fake_pymol.Install()
+    from pymol import util
+
+import Constants
+
+TARGET = 'TARGET'
+SEGMENT = 'AEKLF' * 10
+
+# Flexible side-chains (residues of the first segment, set_dihedral dominates when there are many)
+FLEXIBLE = [ 'GLU2-', 'LYS3-', 'GLU7-' ]
+NB_ROTAMERS = 4
+
+DISPLAY = 'sticks'
+COLOR = 'magenta'
+
+
+'''
+@summary: SUBROUTINE Build_Target: a target of NbResidues made of copies of a 50 residues helix
+          (spaced so that no bond is made between the copies)
+'''
+def Build_Target(NbResidues):
+
+    cmd.fab(SEGMENT, 'helix_segment', ss=1)
+    Lines = [ Line for Line in cmd.get_pdbstr('helix_segment').splitlines() if Line.startswith('ATOM') ]
+    cmd.delete('helix_segment')
+
+    Target = list()
+    NoAtom = 1
+    for Copy in range((NbResidues + len(SEGMENT) - 1) // len(SEGMENT)):
+        Shift = 80.0 * Copy
+        for Line in Lines:
+            Target.append('%s%5d%s%4d%s%8.3f%s\n' % (Line[:6], NoAtom % 100000, Line[11:22],
+                                                     int(Line[22:26]) + Copy * len(SEGMENT), Line[26:30],
+                                                     float(Line[30:38]) + Shift, Line[38:]))
+            NoAtom += 1
+
+    cmd.read_pdbstr(''.join(Target), TARGET, 1)
+    cmd.remove(TARGET + ' & resi ' + str(NbResidues + 1) + '-')
+
+'''
+@summary: SUBROUTINE Build_Ligand: a ligand of NbAtoms (PDB lines) and random poses of it
+'''
+def Build_Ligand(NbAtoms):
+
+    Lines = list()
+    for NoAtom in range(1, NbAtoms + 1):
+        Lines.append('HETATM%5d C%-3d LIG A9999    %8.3f%8.3f%8.3f  1.00  0.00           C\n' %
+                     (NoAtom, NoAtom, 1.5 * math.cos(NoAtom), 1.5 * math.sin(NoAtom), 0.4 * NoAtom))
+
+    return Lines
+
+def Random_Pose(ReferenceLines):
+
+    Shift = [ random.uniform(-3.0, 3.0) for k in range(3) ]
+
+    dictCoord = dict()
+    for Line in ReferenceLines:
+        dictCoord[int(Line[6:11])] = [ float(Line[30:38]) + Shift[0] + random.uniform(-0.5, 0.5),
+                                       float(Line[38:46]) + Shift[1] + random.uniform(-0.5, 0.5),
+                                       float(Line[46:54]) + Shift[2] + random.uniform(-0.5, 0.5) ]
+
+    return dictCoord
+
+def Random_Rotamers():
+
+    return [ random.randint(0, NB_ROTAMERS) for residue in FLEXIBLE ]
+
+def Get_AtomString(Obj, residue, Atom):
+
+    return 'resn ' + residue[0:3] + ' & resi ' + residue[3:-1] + " & chain '' & name " + Atom + ' & ' + Obj
+
+def Select_SideChains(Obj):
+
+    return ' or '.join([ '(resn ' + residue[0:3] + ' & resi ' + residue[3:-1] + " & chain '' & ! name C+O+N & " +
+                         Obj + ')' for residue in FLEXIBLE ])
+
+def Set_Rotamers(Obj, Rotamers, dictRotamers):
+
+    for residue, IntVal in zip(FLEXIBLE, Rotamers):
+        if IntVal > 0:
+            Res = residue[0:3]
+            nFlex = Constants.nFlexBonds[Res]
+            for k in range(nFlex):
+                cmd.set_dihedral(Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+0]),
+                                 Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+1]),
+                                 Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+2]),
+                                 Get_AtomString(Obj, residue, Constants.setDihedrals[Res][4*k+3]),
+                                 dictRotamers[residue][(IntVal-1)*nFlex+k], 1)
+
+'''
+@summary: SUBROUTINE Update_Copy: copy of the target and temp PDB of the ligand for every TOP
+'''
+def Update_Copy(TOP, ReferenceLines, dictCoord, Rotamers, dictRotamers, TmpPDB):
+
+    TargetObj = TARGET + '_' + str(TOP+1)
+    LigandObj = 'LIG_' + str(TOP+1)
+    SolutionObj = 'TOP_' + str(TOP+1) + '__'
+
+    cmd.create(TargetObj, TARGET, 1, 1)
+    Set_Rotamers(TargetObj, Rotamers, dictRotamers)
+
+    out = open(TmpPDB, 'w')
+    for Line in ReferenceLines:
+        NoAtom = int(Line[6:11])
+        out.write(Line[0:30] + '%8.3f%8.3f%8.3f' % tuple(dictCoord[NoAtom]) + Line[54:])
+    out.close()
+
+    cmd.load(TmpPDB, LigandObj, 1)
+
+    selString = '(' + LigandObj + ' & present) or (' + TargetObj + ' & present)'
+    selSideChains = Select_SideChains(TargetObj)
+    if selSideChains:
+        selString = selSideChains + ' or ' + selString
+    cmd.create(SolutionObj, selString, 1, 1)
+
+    Selection = '(resn LIG & ' + SolutionObj + ' & present)'
+    cmd.color(COLOR, Selection)
+    util.cnc(Selection)
+    cmd.show(DISPLAY, Selection)
+
+    if selSideChains:
+        selSC = selSideChains.replace(TargetObj, SolutionObj)
+        cmd.color(COLOR, selSC)
+        util.cnc(selSC)
+        cmd.show('sticks', selSC)
+
+    cmd.delete(TargetObj)
+    cmd.delete(LigandObj)
+
+'''
+@summary: SUBROUTINE Update_InPlace: complex created once, then only the ligand and side-chains move
+'''
+def Update_InPlace(TOP, ReferenceLines, dictCoord, Rotamers, dictRotamers, dictComplex):
+
+    SolutionObj = 'TOP_' + str(TOP+1) + '__'
+    selLigand = '(resn LIG & ' + SolutionObj + ')'
+    selSideChains = Select_SideChains(SolutionObj)
+
+    Complex = dictComplex.get(TOP)
+    if Complex is None:
+        LigandObj = 'LIG_' + str(TOP+1)
+        cmd.read_pdbstr(''.join(ReferenceLines), LigandObj, 1)
+        cmd.create(SolutionObj, '(' + TARGET + ') or (' + LigandObj + ')', 1, 1)
+        cmd.delete(LigandObj)
+
+        Complex = { 'Order': list(), 'SideChains': dict() }
+        cmd.iterate(selLigand, 'Order.append(ID)', space={ 'Order': Complex['Order'] })
+        cmd.color(COLOR, selLigand)
+        util.cnc(selLigand)
+        cmd.show(DISPLAY, selLigand)
+
+        if selSideChains:
+            cmd.iterate_state(1, selSideChains, 'dictCoord[index] = (x,y,z)', space={ 'dictCoord': Complex['SideChains'] })
+            cmd.color(COLOR, selSideChains)
+            util.cnc(selSideChains)
+            cmd.show('sticks', selSideChains)
+
+        dictComplex[TOP] = Complex
+
+    if selSideChains:
+        cmd.alter_state(1, selSideChains, '(x,y,z) = dictCoord[index]', space={ 'dictCoord': Complex['SideChains'] })
+    Set_Rotamers(SolutionObj, Rotamers, dictRotamers)
+
+    cmd.load_coords([ dictCoord[ID] for ID in Complex['Order'] ], selLigand, state=1)
+
+'''
+@summary: SUBROUTINE Get_Complexes: coordinates of the ligand and side-chains of the TOP objects
+'''
+def Get_Complexes(NbTop):
+
+    Coords = list()
+    for TOP in range(NbTop):
+        SolutionObj = 'TOP_' + str(TOP+1) + '__'
+        Selection = 'resn LIG'
+        if FLEXIBLE:
+            Selection += ' or (' + Select_SideChains(SolutionObj) + ')'
+
+        dictCoord = dict()
+        cmd.iterate_state(1, '(' + Selection + ') & ' + SolutionObj,
+                          'dictCoord[(resi, name)] = (x,y,z)', space={ 'dictCoord': dictCoord })
+        Coords.append(dictCoord)
+
+    return Coords
+
+
+if __name__ == '__main__':
+
+    Args = [ Arg for Arg in sys.argv[1:] if Arg != '--' ]
+
+    NbResidues = 5000
+    NbTop = 20
+    NbGen = 2
+    NbFlexible = 1
+    if len(Args) > 0:
+        NbResidues = int(Args[0])
+    if len(Args) > 1:
+        NbTop = int(Args[1])
+    if len(Args) > 2:
+        NbGen = int(Args[2])
+    if len(Args) > 3:
+        NbFlexible = int(Args[3])
+
+    del FLEXIBLE[NbFlexible:]
+
+    random.seed(0)
+    cmd.set('auto_zoom', 0)
+
+    Build_Target(NbResidues)
+    ReferenceLines = Build_Ligand(30)
+
+    dictRotamers = dict()
+    for residue in FLEXIBLE:
+        dictRotamers[residue] = [ random.uniform(-180.0, 180.0) for k in range(NB_ROTAMERS * Constants.nFlexBonds[residue[0:3]]) ]
+
+    Generations = [ [ (Random_Pose(ReferenceLines), Random_Rotamers()) for TOP in range(NbTop) ] for Gen in range(NbGen) ]
+
+    TmpPDB = os.path.join(tempfile.gettempdir(), 'bench_top_update.pdb')
+
+    Before = list()
+    for Generation in Generations:
+        Start = time.time()
+        for TOP in range(NbTop):
+            Update_Copy(TOP, ReferenceLines, Generation[TOP][0], Generation[TOP][1], dictRotamers, TmpPDB)
+        Before.append(time.time() - Start)
+    Copy = Get_Complexes(NbTop)
+
+    cmd.delete('TOP_*__')
+    os.remove(TmpPDB)
+
+    dictComplex = dict()
+    After = list()
+    for Generation in Generations:
+        Start = time.time()
+        for TOP in range(NbTop):
+            Update_InPlace(TOP, ReferenceLines, Generation[TOP][0], Generation[TOP][1], dictRotamers, dictComplex)
+        After.append(time.time() - Start)
+    InPlace = Get_Complexes(NbTop)
+
+    # Both must give the same ligand and side-chain coordinates (the PDB keeps 3 decimals)
+    for dictBefore, dictAfter in zip(Copy, InPlace):
+        for Key in dictBefore.keys():
+            if max([ abs(a - b) for a, b in zip(dictBefore[Key], dictAfter[Key]) ]) > 2e-3:
+                print('Mismatch on atom ' + str(Key))
+                sys.exit(1)
+
+    print('%d residues (%d atoms), %d TOP, %d generations, %d flexible side-chain(s)' %
+          (NbResidues, cmd.count_atoms(TARGET), NbTop, NbGen, len(FLEXIBLE)))
+    # The first generation creates the complexes, the next ones only update them
+    Next = max(len(Generations) - 1, 1)
+    print('  copy of the target per TOP: %10.1f ms first generation, %10.1f ms next ones' %
+          (1000.0 * Before[0], 1000.0 * sum(Before[1:]) / Next))
+    print('  complexes updated in place: %10.1f ms first generation, %10.1f ms next ones' %
+          (1000.0 * After[0], 1000.0 * sum(After[1:]) / Next))
+    if len(Generations) > 1:
+        print('  speedup (next generations): %9.2fx' % (sum(Before[1:]) / sum(After[1:])))
@@ -0,0 +1,121 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: bench_trajectory.py
+
+@summary: Cost of recording the genes and scores of every generation (TrajectoryRecorder)
+          and of reading back random generations from the memory-mapped file (TrajectoryReader)
+
+@usage: python bench_trajectory.py [NbGenerations] [NbTop]
+'''
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+
+import GeneDecoder
+import Trajectory
+
+from bench_decode import SyntheticParse, Synthetic_Lines
+
+
+'''
+@summary: SUBROUTINE Get_Scores: scores of a chromosome line (as Parse.Get_Scores)
+'''
+def Get_Scores(Line):
+
+    Words = Line[Line.rfind(')')+1:].split()
+    return [ float(Words[1]), float(Words[3]), float(Words[5]) ]
+
+
+if __name__ == '__main__':
+
+    NbGenerations = 2000
+    NbTop = 20
+
+    if len(sys.argv) > 1:
+        NbGenerations = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        NbTop = int(sys.argv[2])
+
+    random.seed(0)
+    top = SyntheticParse(40, 8)
+    Decoder = GeneDecoder.GeneDecoder(top)
+
+    Path = os.path.join(tempfile.mkdtemp(), 'trajectory.nrgtrj')
+    Recorder = Trajectory.TrajectoryRecorder(Path, NbTop, Decoder.Names)
+
+    # The last generation reports fewer chromosomes
+    Generations = list()
+    for Gen in range(NbGenerations):
+        Lines = [ (TOP, 6, Line) for TOP, Line in enumerate(Synthetic_Lines(top, NbTop)) ]
+        if Gen == NbGenerations - 1:
+            Lines = Lines[:NbTop // 2]
+        Generations.append(Lines)
+
+    Start = time.time()
+    for Gen in range(NbGenerations):
+        Lines = Generations[Gen]
+        Recorder.Record(Gen, [ TOP for TOP, colNo, Line in Lines ], Decoder.Decode(Lines),
+                        [ Get_Scores(Line) for TOP, colNo, Line in Lines ])
+    Recording = time.time() - Start
+    Recorder.Close()
+
+    Reader = Trajectory.TrajectoryReader(Path)
+
+    # Every generation must be read back as recorded (float32)
+    Worst = 0.0
+    for Gen in range(NbGenerations):
+        Generation, TOPs, Genes, Scores = Reader.Read(Reader.Find(Gen))
+        Lines = Generations[Gen]
+
+        if Generation != Gen or TOPs != [ TOP for TOP, colNo, Line in Lines ]:
+            print('Mismatch of the chromosomes of generation %d' % Gen)
+            sys.exit(1)
+
+        for Chromosome, Row, Score in zip(Lines, Genes, Scores):
+            Expected = Decoder.Decode_Line(Chromosome[2], Chromosome[1]) + Get_Scores(Chromosome[2])
+            Worst = max(Worst, max([ abs(a - b) / max(1.0, abs(a)) for a, b in zip(Expected, list(Row) + list(Score)) ]))
+
+    if Worst > 1e-6:
+        print('Mismatch of the values read back: %g' % Worst)
+        sys.exit(1)
+
+    # Scrubbing: random generations
+    Order = [ random.randint(0, NbGenerations - 1) for i in range(10000) ]
+    Start = time.time()
+    for Gen in Order:
+        Reader.Read(Reader.Find(Gen))
+    Scrubbing = time.time() - Start
+
+    Size = os.path.getsize(Path)
+    Reader.Close()
+    os.remove(Path)
+
+    print('%d generations of %d chromosomes, %d genes' % (NbGenerations, NbTop, Decoder.NbGenes))
+    print('  file:       %10.1f KB (%d bytes per generation)' % (Size / 1024.0, Reader.RecordSize))
+    print('  recording:  %10.3f ms per generation (decoding included)' % (1000.0 * Recording / NbGenerations))
+    print('  scrubbing:  %10.3f ms per random generation read' % (1000.0 * Scrubbing / len(Order)))
+    print('  largest relative difference read back: %g' % Worst)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: fake_flexaid.py
+
+@summary: Stand-in for the FlexAID executable. Reads the CONFIG.inp and ga_inp.dat
+          written by the plugin and produces the same kind of output as FlexAID
+          (log lines, generations, RESULT_*.pdb) with random chromosomes.
+          As in a genetic algorithm, each generation replaces a few TOP chromosomes
+          and mutates a few genes of the others.
+
+          Generations are written to the .update file of STATEP (waiting for
+          the plugin to remove it) or printed on stdout when CONFIG has NRGSTR.
+
+@usage: python fake_flexaid.py CONFIG.inp ga_inp.dat RESULT
+        FAKE_FLEXAID_DELAY: seconds spent on each generation (default 0)
+        FAKE_FLEXAID_SEED:  seed of the random chromosomes (default 0)
+'''
+
+import os
+import sys
+import time
+import random
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Constants
+
+# Number of grid vertices printed on each side of the center
+GRID_SIDE = 10
+GRID_SPACER = 0.375
+
+# Rotamers reported for each flexible side-chain
+NB_ROTAMERS = 3
+
+# Chance that a TOP chromosome is replaced from one generation to the next,
+# and that a gene of a chromosome kept is mutated
+REPLACE_RATE = 0.1
+MUTATION_RATE = 0.05
+
+
+class FakeFlexAID(object):
+
+    def __init__(self, Config, GAInp, ResultPrefix):
+
+        self.ResultPrefix = ResultPrefix
+
+        self.Ligand = ''
+        self.StatePath = os.path.dirname(os.path.abspath(Config))
+        self.Stream = False
+        self.Center = [ 0.0, 0.0, 0.0 ]
+        self.Optimz = list()
+        self.FlexSC = list()
+
+        self.NbGen = 10
+        self.NbTopChrom = 10
+
+        # Genes of the TOP chromosomes of the last generation
+        self.Population = list()
+
+        self.Delay = float(os.environ.get('FAKE_FLEXAID_DELAY', '0'))
+        random.seed(int(os.environ.get('FAKE_FLEXAID_SEED', '0')))
+
+        self.Read_Config(Config)
+        self.Read_GAInp(GAInp)
+
+        self.UPDATE = os.path.join(self.StatePath, '.update')
+        self.PAUSE = os.path.join(self.StatePath, '.pause')
+        self.STOP = os.path.join(self.StatePath, '.stop')
+        self.ABORT = os.path.join(self.StatePath, '.abort')
+
+    def Read_Config(self, Config):
+
+        for Line in open(Config):
+            fields = Line.split()
+            if not fields:
+                continue
+
+            if fields[0] == 'INPLIG':
+                self.Ligand = Line[7:].strip()
+            elif fields[0] == 'STATEP':
+                self.StatePath = Line[7:].strip()
+            elif fields[0] == 'NRGSTR':
+                self.Stream = True
+            elif fields[0] == 'OPTIMZ':
+                self.Optimz.append(int(fields[3]))
+            elif fields[0] == 'FLEXSC':
+                Chain = fields[2]
+                if Chain == '':
+                    Chain = '-'
+                self.FlexSC.append(fields[3] + fields[1] + Chain)
+            elif fields[0] == 'RNGOPT' and fields[1] == 'LOCCEN':
+                self.Center = [ float(fields[2]), float(fields[3]), float(fields[4]) ]
+
+    def Read_GAInp(self, GAInp):
+
+        for Line in open(GAInp):
+            fields = Line.split()
+            if not fields:
+                continue
+
+            if fields[0] == 'NUMGENER':
+                self.NbGen = int(fields[1])
+            elif fields[0] == 'PRINTCHR':
+                self.NbTopChrom = int(fields[1])
+
+    '''
+    @summary: Build_Order: orders the ligand atoms so that parents are built first (lout)
+    '''
+    def Build_Order(self):
+
+        Parents = dict()
+        Order = list()
+
+        if not os.path.isfile(self.Ligand):
+            return Order
+
+        for Line in open(self.Ligand):
+            if Line.startswith('HETTYP'):
+                Parents[int(Line[6:11])] = [ int(Line[21:26]), int(Line[26:31]), int(Line[31:36]) ]
+
+        Built = set([0])
+        while len(Order) < len(Parents):
+            Added = False
+            for NoAtom in sorted(Parents.keys()):
+                if NoAtom not in Built and set(Parents[NoAtom]) <= Built:
+                    Order.append(NoAtom)
+                    Built.add(NoAtom)
+                    Added = True
+            if not Added:
+                break
+
+        return Order
+
+    def Header(self, out):
+
+        out.write('the protein center of coordinates is: %8.3f %8.3f %8.3f \n' % tuple(self.Center))
+        out.write('best by energy \n')
+
+        for i, NoAtom in enumerate(self.Build_Order()):
+            out.write('lout[%d]= %d \n' % (i, NoAtom))
+
+        for Residue in self.FlexSC:
+            nFlex = Constants.nFlexBonds.get(Residue[:3], 1)
+            for r in range(NB_ROTAMERS):
+                Dihedrals = ''.join([ ' %8.3f' % random.uniform(-180.0, 180.0) for k in range(nFlex) ])
+                out.write('Rotamer for %s with dihedrals %s\n' % (Residue, Dihedrals))
+
+        i = 0
+        for x in range(-GRID_SIDE, GRID_SIDE):
+            for y in range(-GRID_SIDE, GRID_SIDE):
+                for z in range(-GRID_SIDE, GRID_SIDE):
+                    out.write('Grid[%d]=%8.3f%8.3f%8.3f\n' % (i, self.Center[0] + x * GRID_SPACER,
+                                                                 self.Center[1] + y * GRID_SPACER,
+                                                                 self.Center[2] + z * GRID_SPACER))
+                    i += 1
+
+        self.NbGrid = i
+
+        out.write('SIGMA_SHARE 1.0\n')
+        out.flush()
+
+    def Genes(self):
+
+        Genes = list()
+
+        for Optimz in self.Optimz:
+            if Optimz == -1:
+                Genes.append(float(random.randint(0, self.NbGrid - 1)))
+            elif Optimz == 0:
+                Genes.append(random.uniform(0.0, 180.0))
+                Genes.append(random.uniform(-180.0, 180.0))
+                Genes.append(random.uniform(-180.0, 180.0))
+            else:
+                Genes.append(random.uniform(-180.0, 180.0))
+
+        for Residue in self.FlexSC:
+            Genes.append(float(random.randint(0, NB_ROTAMERS)))
+
+        return Genes
+
+    def Evolve(self, Genes):
+
+        if random.random() < REPLACE_RATE:
+            return self.Genes()
+
+        Mutated = self.Genes()
+
+        return [ Mutated[i] if random.random() < MUTATION_RATE else Genes[i] for i in range(len(Genes)) ]
+
+    def Generation(self, Gen):
+
+        Lines = [ 'Generation: %d \n' % Gen ]
+
+        if len(self.Population) != self.NbTopChrom:
+            self.Population = [ self.Genes() for TOP in range(self.NbTopChrom) ]
+        else:
+            self.Population = [ self.Evolve(Genes) for Genes in self.Population ]
+
+        for TOP in range(self.NbTopChrom):
+            CF = -100.0 * random.random() - Gen
+            Line = '%4d (' % TOP
+            Line += ' '.join([ '%10.2f' % Gene for Gene in self.Population[TOP] ])
+            Line += ' )  cf=%9.3f cf.app=%9.3f fitnes=%9.3f\n' % (CF, CF, -CF / 10.0)
+            Lines.append(Line)
+
+        return ''.join(Lines)
+
+    '''
+    @summary: Handshake: writes the .update file then waits for the plugin to remove it
+              returns False when the simulation was aborted
+    '''
+    def Handshake(self, Text):
+
+        out = open(self.UPDATE, 'w')
+        out.write(Text)
+        out.close()
+
+        while os.path.isfile(self.UPDATE):
+            if os.path.isfile(self.ABORT):
+                return False
+            time.sleep(0.001)
+
+        return True
+
+    def Write_Results(self):
+
+        Lines = list()
+        if os.path.isfile(self.Ligand):
+            Lines = [ Line for Line in open(self.Ligand) if Line.startswith('HETATM') ]
+
+        for i in range(min(self.NbTopChrom, 10)):
+            out = open('%s_%d.pdb' % (self.ResultPrefix, i), 'w')
+            out.write('REMARK optimizable residue LIG   9999\n')
+            out.write('REMARK CF=%10.5f\n' % (-100.0 + i))
+            out.write('REMARK CF.app=%10.5f\n' % (-100.0 + i))
+            out.write('REMARK CF.com=%10.5f\n' % 10.0)
+            out.write('REMARK CF.sas=%10.5f\n' % -20.0)
+            out.write('REMARK CF.wal=%10.5f\n' % 1.0)
+            out.write('REMARK CF.con=%10.5f\n' % 0.0)
+            out.write('REMARK %8.5f RMSD to ref. structure\n' % (i * 0.5))
+            out.writelines(Lines)
+            out.close()
+
+        out = open(self.ResultPrefix + '_par.res', 'w')
+        out.close()
+
+    def Run(self):
+
+        out = sys.stdout
+        self.Header(out)
+
+        for Gen in range(self.NbGen + 1):
+
+            while os.path.isfile(self.PAUSE):
+                time.sleep(0.01)
+
+            if os.path.isfile(self.ABORT):
+                return 0
+
+            if os.path.isfile(self.STOP):
+                break
+
+            if self.Delay:
+                time.sleep(self.Delay)
+
+            Text = self.Generation(Gen)
+            if self.Stream:
+                out.write(Text)
+                out.flush()
+            elif not self.Handshake(Text):
+                return 0
+
+        out.write('clustering all individuals\n')
+        self.Write_Results()
+        out.write('Done.\n')
+        out.flush()
+
+        return 0
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) < 4:
+        sys.stderr.write('usage: fake_flexaid.py CONFIG.inp ga_inp.dat RESULT\n')
+        sys.exit(1)
+
+    sys.exit(FakeFlexAID(sys.argv[1], sys.argv[2], sys.argv[3]).Run())
@@ -0,0 +1,2020 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: fake_pymol.py
+
+@summary: In-process stand-in for PyMOL (pymol, pymol.cmd, pymol.util, pymol.wizard, pymol.cgo
+          and pymol.vfont) to run the plugin modules without the GUI: a registry of objects
+          (molecules with their states and bonds, named selections, CGOs, measurements),
+          a selection engine for the grammar used by the plugin, and the number and cost
+          of the calls of each command.
+
+          Selections: object and selection names (* wildcards), all, none, hetatm,
+          hydrogens (h.), present (pr.), visible (v.), resn (r.), resi (i.), chain (c.),
+          name (n.), elem (e.), segi (s.), alt, ID (id), index (idx.), model (m.)
+          with + separated values, * wildcards and ranges (resi 10-20, resi 51-),
+          not (!), and (&), or (|), byres (br.), byobject (bo.) and the postfix
+          extend N (xt.), around R (a.), expand R (x.), within R of S (w.)
+          bound to the term before them.
+
+          fab builds peptides of ALA, GLU, LEU, LYS and PHE from internal coordinates
+          (helix or extended, without hydrogens).
+
+          Only PDB files are read and written. Bonds are found from the distances
+          (and the CONECT records). Atoms keep the order of the file (PyMOL sorts them,
+          so index values differ). The view is the identity: translate moves the atoms
+          by the vector given.
+
+@usage: import fake_pymol
+        cmd = fake_pymol.Install()     (before the plugin modules are imported)
+        ...
+        cmd.Reset_Stats()
+        (operation)
+        print(cmd.Report())
+
+@contain: CmdException, Install, Cmd, Util, Wizard
+'''
+
+import os
+import re
+import sys
+import math
+import time
+import types
+import fnmatch
+
+from collections import OrderedDict
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import Geometry
+
+try:
+    STRING = basestring
+except NameError:
+    STRING = str
+
+
+class CmdException(Exception):
+
+    pass
+
+
+# Selection keywords taking values, and their short forms
+PROPERTIES = { 'resn': 'resn', 'r.': 'resn',
+               'resi': 'resi', 'i.': 'resi',
+               'chain': 'chain', 'c.': 'chain',
+               'name': 'name', 'n.': 'name',
+               'elem': 'elem', 'e.': 'elem',
+               'segi': 'segi', 's.': 'segi',
+               'alt': 'alt',
+               'id': 'ID',
+               'index': 'index', 'idx.': 'index',
+               'model': 'model', 'm.': 'model' }
+
+# Selection keywords without values
+FLAGS = { 'all': 'all', '*': 'all',
+          'none': 'none',
+          'hetatm': 'hetatm',
+          'hydrogens': 'hydrogens', 'h.': 'hydrogens',
+          'present': 'present', 'pr.': 'present',
+          'visible': 'visible', 'v.': 'visible' }
+
+PREFIXES = { 'not': 'not', '!': 'not',
+             'byres': 'byres', 'br.': 'byres',
+             'byobject': 'byobject', 'bo.': 'byobject' }
+
+POSTFIXES = { 'extend': 'extend', 'xt.': 'extend',
+              'around': 'around', 'a.': 'around',
+              'expand': 'expand', 'x.': 'expand',
+              'within': 'within', 'w.': 'within' }
+
+# Compared without case (PyMOL ignore_case)
+NOCASE = ( 'resn', 'name', 'elem', 'segi' )
+
+TOKENS = re.compile(r'''\s*('[^']*'|"[^"]*"|\(|\)|&|\||!|[^\s()&|!]+)''')
+
+REPRESENTATIONS = ( 'lines', 'sticks', 'spheres', 'cartoon', 'ribbon', 'surface', 'mesh',
+                    'dots', 'labels', 'nonbonded', 'nb_spheres', 'cell', 'cgo', 'dashes' )
+
+SYNONYMS = { 'label': 'labels', 'line': 'lines', 'stick': 'sticks', 'sphere': 'spheres' }
+
+# Bonds are made between atoms closer than the sum of their radii (+ tolerance)
+RADII = { 'H': 0.32, 'C': 0.77, 'N': 0.75, 'O': 0.73, 'S': 1.02, 'P': 1.06 }
+TOLERANCE = 0.45
+
+COLORS = OrderedDict([ ('white', (1.0, 1.0, 1.0)), ('black', (0.0, 0.0, 0.0)),
+                       ('red', (1.0, 0.0, 0.0)), ('green', (0.0, 1.0, 0.0)),
+                       ('blue', (0.0, 0.0, 1.0)), ('yellow', (1.0, 1.0, 0.0)),
+                       ('orange', (1.0, 0.5, 0.0)), ('grey', (0.5, 0.5, 0.5)),
+                       ('carbon', (0.2, 1.0, 0.2)), ('nitrogen', (0.2, 0.2, 1.0)),
+                       ('oxygen', (1.0, 0.3, 0.3)), ('sulfur', (0.9, 0.775, 0.25)),
+                       ('hydrogen', (0.9, 0.9, 0.9)), ('purpleblue', (0.5, 0.2, 1.0)),
+                       ('grey60', (0.6, 0.6, 0.6)) ])
+
+# Commands that change neither the objects nor the properties of the atoms selected on
+# (the selections on coordinates and on what is visible are never kept)
+UNCHANGED = set([ 'iterate', 'iterate_state', 'load_coords', 'translate', 'set_dihedral', 'get_dihedral',
+                  'count_atoms', 'count_states', 'set_title', 'index', 'id_atom', 'get_model', 'get_extent',
+                  'get_pdbstr', 'save', 'get_names', 'get_type', 'get_object_list', 'color', 'show',
+                  'hide', 'label', 'mask', 'unmask', 'zoom', 'orient', 'center', 'rebuild', 'get',
+                  'set', 'get_setting_legacy', 'get_view', 'set_view', 'get_state', 'frame',
+                  'get_wizard', 'set_wizard', 'get_color_tuple', 'set_color', 'refresh', 'refresh_wizard',
+                  'window', 'config_mouse', 'unpick', 'feedback', 'util.cnc', 'util.cbag' ])
+
+# Colors of util.cnc
+ELEMENT_COLORS = { 'N': 'nitrogen', 'O': 'oxygen', 'S': 'sulfur', 'H': 'hydrogen' }
+
+# Residues built by fab: atom name, parents (- for the previous residue) and internal coordinates
+# (distance, angle, dihedral); PHI and PSI are the dihedrals of the secondary structure
+PHI = 'phi'
+PSI = 'psi'
+
+FAB_BACKBONE = [ ('N',  ('-C', '-CA', '-N'), (1.33, 116.0, PSI)),
+                 ('CA', ('N', '-C', '-CA'),  (1.46, 122.0, 180.0)),
+                 ('C',  ('CA', 'N', '-C'),   (1.52, 111.0, PHI)),
+                 ('O',  ('C', 'CA', 'N'),    (1.23, 121.0, PSI)),
+                 ('CB', ('CA', 'N', 'C'),    (1.53, 110.0, -122.0)) ]
+
+FAB_SIDECHAINS = { 'A': ('ALA', []),
+                   'E': ('GLU', [ ('CG', ('CB', 'CA', 'N'),   (1.52, 114.0, -60.0)),
+                                  ('CD', ('CG', 'CB', 'CA'),  (1.52, 113.0, 180.0)),
+                                  ('OE1', ('CD', 'CG', 'CB'), (1.25, 119.0, 0.0)),
+                                  ('OE2', ('CD', 'CG', 'CB'), (1.25, 119.0, 180.0)) ]),
+                   'K': ('LYS', [ ('CG', ('CB', 'CA', 'N'),  (1.52, 114.0, -60.0)),
+                                  ('CD', ('CG', 'CB', 'CA'), (1.52, 111.0, 180.0)),
+                                  ('CE', ('CD', 'CG', 'CB'), (1.52, 111.0, 180.0)),
+                                  ('NZ', ('CE', 'CD', 'CG'), (1.49, 111.0, 180.0)) ]),
+                   'L': ('LEU', [ ('CG', ('CB', 'CA', 'N'),   (1.53, 116.0, -60.0)),
+                                  ('CD1', ('CG', 'CB', 'CA'), (1.52, 110.0, 180.0)),
+                                  ('CD2', ('CG', 'CB', 'CA'), (1.52, 110.0, -60.0)) ]),
+                   'F': ('PHE', [ ('CG', ('CB', 'CA', 'N'),    (1.50, 114.0, -60.0)),
+                                  ('CD1', ('CG', 'CB', 'CA'),  (1.39, 121.0, 90.0)),
+                                  ('CD2', ('CG', 'CB', 'CA'),  (1.39, 121.0, -90.0)),
+                                  ('CE1', ('CD1', 'CG', 'CB'), (1.39, 120.0, 180.0)),
+                                  ('CE2', ('CD2', 'CG', 'CB'), (1.39, 120.0, 180.0)),
+                                  ('CZ', ('CE1', 'CD1', 'CG'), (1.39, 120.0, 0.0)) ]) }
+
+# Backbone dihedrals (phi, psi) of the secondary structures of fab (1: helix, others: extended)
+FAB_SS = { 1: (-57.0, -47.0) }
+FAB_EXTENDED = (-139.0, 135.0)
+
+
+class ObjectAtom(object):
+
+    def __init__(self):
+
+        self.Object = None
+        self.index = 0
+
+        self.ID = 0
+        self.name = ''
+        self.resn = ''
+        self.resi = ''
+        self.chain = ''
+        self.segi = ''
+        self.elem = ''
+        self.alt = ''
+        self.b = 0.0
+        self.q = 1.0
+        self.vdw = 1.5
+        self.hetatm = 0
+        self.color = 0
+        self.label = ''
+        self.ss = ''
+
+        self.Reps = set()
+        self.Masked = False
+        self.Bonded = list()
+
+    def Get_Residue(self):
+
+        return (self.Object, self.segi, self.chain, self.resi, self.resn)
+
+
+class Molecule(object):
+
+    '''
+    @summary: Object of atoms with their coordinates in each state
+              (None where an atom is not present in a state)
+    '''
+    def __init__(self, Name):
+
+        self.Name = Name
+        self.Type = 'object:molecule'
+        self.Enabled = True
+
+        self.Atoms = list()
+        self.States = list()
+
+        # Title of each state (see set_title)
+        self.Titles = dict()
+
+    def Renumber(self):
+
+        for i in range(len(self.Atoms)):
+            self.Atoms[i].index = i + 1
+
+    def Get_Coord(self, Atom, State):
+
+        if State < 1 or State > len(self.States):
+            return None
+
+        return self.States[State-1][Atom.index-1]
+
+    def Set_Coord(self, Atom, State, Coord):
+
+        while len(self.States) < State:
+            self.States.append([ None ] * len(self.Atoms))
+
+        self.States[State-1][Atom.index-1] = [ float(Coord[0]), float(Coord[1]), float(Coord[2]) ]
+
+    def Add_Atoms(self, Atoms, States):
+
+        '''
+        @summary: appends Atoms with their coordinates in the States (list of { State: coordinates list })
+        '''
+        Start = len(self.Atoms)
+
+        for Atom in Atoms:
+            Atom.Object = self
+            self.Atoms.append(Atom)
+
+        for Coords in self.States:
+            Coords.extend([ None ] * len(Atoms))
+
+        self.Renumber()
+
+        for State in sorted(States.keys()):
+            for i in range(len(Atoms)):
+                Coord = States[State][i]
+                if Coord is not None:
+                    self.Set_Coord(self.Atoms[Start + i], State, Coord)
+
+    def Remove_Atoms(self, Atoms):
+
+        Keep = [ i for i in range(len(self.Atoms)) if self.Atoms[i] not in Atoms ]
+
+        for Atom in Atoms:
+            for Other in Atom.Bonded:
+                if Other not in Atoms:
+                    Other.Bonded.remove(Atom)
+
+        self.Atoms = [ self.Atoms[i] for i in Keep ]
+        self.States = [ [ Coords[i] for i in Keep ] for Coords in self.States ]
+
+        self.Renumber()
+
+
+class Graphics(object):
+
+    '''
+    @summary: Object without atoms (CGO, measurement)
+    '''
+    def __init__(self, Name, Type, Data=None):
+
+        self.Name = Name
+        self.Type = Type
+        self.Enabled = True
+        self.Data = Data
+
+
+class Selection(object):
+
+    def __init__(self, Name, Atoms):
+
+        self.Name = Name
+        self.Type = 'selection'
+        self.Enabled = True
+        self.Atoms = Atoms
+
+
+class ModelAtom(object):
+
+    '''
+    @summary: Atom of the models returned by get_model (as chempy.Atom)
+    '''
+    def __init__(self, Atom, Coord):
+
+        self.name = Atom.name
+        self.resn = Atom.resn
+        self.resi = Atom.resi
+        self.resi_number = Get_Resv(Atom.resi)
+        self.chain = Atom.chain
+        self.segi = Atom.segi
+        self.symbol = Atom.elem
+        self.alt = Atom.alt
+        self.b = Atom.b
+        self.q = Atom.q
+        self.vdw = Atom.vdw
+        self.hetatm = Atom.hetatm
+        self.id = Atom.ID
+        self.index = Atom.index
+        self.coord = list(Coord)
+
+
+class ModelBond(object):
+
+    def __init__(self, i, j):
+
+        self.index = [ i, j ]
+        self.order = 1
+
+
+class Model(object):
+
+    def __init__(self):
+
+        self.atom = list()
+        self.bond = list()
+
+
+'''
+@summary: SUBROUTINE Get_Resv: residue number of a resi (without insertion code)
+'''
+def Get_Resv(resi):
+
+    m = re.match(r'-?\d+', resi)
+    if m:
+        return int(m.group(0))
+
+    return 0
+
+'''
+@summary: SUBROUTINE Parse_PDB: atoms of PDB text and their coordinates in each MODEL
+          (a list of Atom and a list of coordinates lists)
+'''
+def Parse_PDB(Text):
+
+    Atoms = list()
+    States = list()
+    Conect = list()
+
+    Coords = list()
+    dictKeys = dict()
+
+    for Line in Text.splitlines():
+
+        Record = Line[0:6].strip()
+
+        if Record in ('ATOM', 'HETATM'):
+
+            Key = (Line[6:11], Line[12:27])
+
+            # Atoms of the following models are those of the first one
+            if States:
+                if Key not in dictKeys:
+                    raise CmdException('Atoms differ between the models of the PDB')
+                Coords[dictKeys[Key]] = [ float(Line[30:38]), float(Line[38:46]), float(Line[46:54]) ]
+                continue
+
+            Atom = Atom_FromPDB(Line)
+            dictKeys[Key] = len(Atoms)
+            Atoms.append(Atom)
+            Coords.append([ float(Line[30:38]), float(Line[38:46]), float(Line[46:54]) ])
+
+        elif Record == 'ENDMDL':
+            States.append(Coords)
+            Coords = [ None ] * len(Atoms)
+
+        elif Record == 'CONECT':
+            Fields = [ Line[i:i+5].strip() for i in range(6, min(len(Line), 31), 5) ]
+            Fields = [ int(Field) for Field in Fields if Field ]
+            for Other in Fields[1:]:
+                Conect.append((Fields[0], Other))
+
+    if not States or [ Coord for Coord in Coords if Coord is not None ]:
+        States.append(Coords)
+
+    # Bonds from the distances then from CONECT
+    Connect_Atoms(Atoms, States[0])
+
+    dictID = dict()
+    for Atom in Atoms:
+        dictID[Atom.ID] = Atom
+
+    for ID1, ID2 in Conect:
+        Atom1 = dictID.get(ID1)
+        Atom2 = dictID.get(ID2)
+        if Atom1 is not None and Atom2 is not None and Atom1 is not Atom2 and Atom2 not in Atom1.Bonded:
+            Atom1.Bonded.append(Atom2)
+            Atom2.Bonded.append(Atom1)
+
+    return Atoms, States
+
+def Atom_FromPDB(Line):
+
+    Atom = ObjectAtom()
+
+    Atom.hetatm = int(Line[0:6].strip() == 'HETATM')
+    Atom.ID = int(Line[6:11])
+    Atom.name = Line[12:16].strip()
+    Atom.alt = Line[16:17].strip()
+    Atom.resn = Line[17:21].strip()
+    Atom.chain = Line[21:22].strip()
+    Atom.resi = Line[22:27].strip()
+
+    try:
+        Atom.q = float(Line[54:60])
+        Atom.b = float(Line[60:66])
+    except ValueError:
+        pass
+
+    Atom.segi = Line[72:76].strip()
+    Atom.elem = Line[76:78].strip()
+
+    # Columns 77-78 are often missing or hold something else than the element
+    if not Atom.elem.isalpha():
+        Atom.elem = ''
+
+    if not Atom.elem:
+        Letters = [ Char for Char in Atom.name if Char.isalpha() ]
+        if Letters:
+            Atom.elem = Letters[0]
+
+    Atom.elem = Atom.elem.capitalize()
+
+    return Atom
+
+
+'''
+@summary: SUBROUTINE Connect_Atoms: bonds between the atoms closer than the sum of their radii
+'''
+def Connect_Atoms(Atoms, Coords):
+
+    Cell = 2.0 * max(RADII.values()) + TOLERANCE
+
+    dictCells = dict()
+    for i in range(len(Atoms)):
+        if Coords[i] is None:
+            continue
+        Key = tuple([ int(math.floor(Coords[i][k] / Cell)) for k in range(3) ])
+        dictCells.setdefault(Key, list()).append(i)
+
+    for Key in dictCells.keys():
+        Neighbours = list()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for dz in (-1, 0, 1):
+                    Neighbours.extend(dictCells.get((Key[0] + dx, Key[1] + dy, Key[2] + dz), []))
+
+        for i in dictCells[Key]:
+            Radius = RADII.get(Atoms[i].elem, 0.77)
+            for j in Neighbours:
+                if j <= i:
+                    continue
+                Limit = Radius + RADII.get(Atoms[j].elem, 0.77) + TOLERANCE
+                if Geometry.sqrdistance(Coords[i], Coords[j]) <= Limit * Limit:
+                    Atoms[i].Bonded.append(Atoms[j])
+                    Atoms[j].Bonded.append(Atoms[i])
+
+'''
+@summary: SUBROUTINE Format_PDB: PDB line of an atom
+'''
+def Format_PDB(Atom, Coord):
+
+    Name = Atom.name
+    if len(Name) < 4 and len(Atom.elem) == 1:
+        Name = ' ' + Name
+
+    resi = Atom.resi
+    Code = ''
+    if resi and not resi[-1].isdigit():
+        resi, Code = resi[:-1], resi[-1]
+
+    Record = 'ATOM'
+    if Atom.hetatm:
+        Record = 'HETATM'
+
+    return '%-6s%5d %-4s%1s%-3s %1s%4s%1s   %8.3f%8.3f%8.3f%6.2f%6.2f      %-4s%2s\n' % \
+           (Record, Atom.ID, Name, Atom.alt, Atom.resn[:3], Atom.chain, resi, Code,
+            Coord[0], Coord[1], Coord[2], Atom.q, Atom.b, Atom.segi, Atom.elem.upper())
+
+'''
+@summary: SUBROUTINE Dihedral: dihedral angle (degrees, sign of PyMOL) of four points.
+          The plugin relies on Geometry (RotamerPlan): get_dihedral and set_dihedral are
+          written independently from it so that they can serve as a reference.
+'''
+def Dihedral(Point1, Point2, Point3, Point4):
+
+    b1 = [ Point2[k] - Point1[k] for k in range(3) ]
+    b2 = [ Point3[k] - Point2[k] for k in range(3) ]
+    b3 = [ Point4[k] - Point3[k] for k in range(3) ]
+
+    n1 = Cross(b1, b2)
+    n2 = Cross(b2, b3)
+
+    y = math.sqrt(sum([ b2[k] * b2[k] for k in range(3) ])) * sum([ b1[k] * n2[k] for k in range(3) ])
+    x = sum([ n1[k] * n2[k] for k in range(3) ])
+
+    return math.degrees(math.atan2(y, x))
+
+def Cross(u, v):
+
+    return [ u[1] * v[2] - u[2] * v[1],
+             u[2] * v[0] - u[0] * v[2],
+             u[0] * v[1] - u[1] * v[0] ]
+
+'''
+@summary: SUBROUTINE Rotate: Point rotated by Angle (degrees, right-handed) about the axis
+          through Origin along Axis (Rodrigues' rotation formula)
+'''
+def Rotate(Point, Origin, Axis, Angle):
+
+    Norm = math.sqrt(sum([ Axis[k] * Axis[k] for k in range(3) ]))
+    k_ = [ Axis[k] / Norm for k in range(3) ]
+    v = [ Point[k] - Origin[k] for k in range(3) ]
+
+    Cos = math.cos(math.radians(Angle))
+    Sin = math.sin(math.radians(Angle))
+
+    kv = Cross(k_, v)
+    kdotv = sum([ k_[k] * v[k] for k in range(3) ])
+
+    return [ Origin[k] + v[k] * Cos + kv[k] * Sin + k_[k] * kdotv * (1.0 - Cos) for k in range(3) ]
+
+
+'''
+@summary: SUBROUTINE Place: point at Distance of Point3 making Angle with Point2 and the dihedral
+          Torsion with Point1 (degrees, the sign of Dihedral)
+'''
+def Place(Point1, Point2, Point3, Distance, Angle, Torsion):
+
+    bc = [ Point3[k] - Point2[k] for k in range(3) ]
+    Norm = math.sqrt(sum([ bc[k] * bc[k] for k in range(3) ]))
+    bc = [ bc[k] / Norm for k in range(3) ]
+
+    n = Cross([ Point2[k] - Point1[k] for k in range(3) ], bc)
+    Norm = math.sqrt(sum([ n[k] * n[k] for k in range(3) ]))
+    n = [ n[k] / Norm for k in range(3) ]
+
+    m = Cross(n, bc)
+
+    Angle = math.radians(Angle)
+    Torsion = math.radians(Torsion)
+
+    d = [ -Distance * math.cos(Angle),
+          Distance * math.sin(Angle) * math.cos(Torsion),
+          Distance * math.sin(Angle) * math.sin(Torsion) ]
+
+    return [ Point3[k] + d[0] * bc[k] + d[1] * m[k] + d[2] * n[k] for k in range(3) ]
+
+'''
+@summary: SUBROUTINE Build_Peptide: PDB lines of the residues of Sequence (one-letter codes of
+          FAB_SIDECHAINS) built from internal coordinates, without hydrogens
+'''
+def Build_Peptide(Sequence, Resi, Chain, SS):
+
+    Phi, Psi = FAB_SS.get(SS, FAB_EXTENDED)
+
+    Lines = list()
+    dictPrevious = dict()
+
+    for Code in Sequence:
+
+        if Code not in FAB_SIDECHAINS:
+            raise CmdException('fab without PyMOL only builds the residues ' + ''.join(sorted(FAB_SIDECHAINS.keys())))
+
+        Resn, SideChain = FAB_SIDECHAINS[Code]
+
+        dictResidue = dict()
+        for Name, Parents, IC in FAB_BACKBONE + SideChain:
+
+            Distance, Angle, Torsion = IC
+            if Torsion == PHI:
+                Torsion = Phi
+            elif Torsion == PSI:
+                Torsion = Psi
+
+                # The carbonyl O is opposite the N of the next residue
+                if Name == 'O':
+                    Torsion = Psi + 180.0
+
+            Points = list()
+            for Parent in Parents:
+                if Parent[0] == '-':
+                    Points.append(dictPrevious.get(Parent[1:]))
+                else:
+                    Points.append(dictResidue[Parent])
+
+            if None in Points:
+                # First residue: N, CA and C start the chain in the xy plane
+                if Name == 'N':
+                    Coord = [ 0.0, 0.0, 0.0 ]
+                elif Name == 'CA':
+                    Coord = [ Distance, 0.0, 0.0 ]
+                else:
+                    Coord = Place([ 0.0, 1.0, 0.0 ], dictResidue['N'], dictResidue['CA'], Distance, Angle, 180.0)
+            else:
+                Coord = Place(Points[2], Points[1], Points[0], Distance, Angle, Torsion)
+
+            dictResidue[Name] = Coord
+
+            Lines.append('ATOM  %5d  %-3s %3s %1s%4d    %8.3f%8.3f%8.3f  1.00  0.00           %s  \n' %
+                         ((len(Lines) + 1, Name, Resn, Chain[:1], Resi) + tuple(Coord) + (Name[0],)))
+
+        dictPrevious = dictResidue
+        Resi += 1
+
+    return Lines
+
+
+class Cmd(object):
+
+    '''
+    @summary: The pymol.cmd module. Every command (lower case name) is counted and timed
+    '''
+    def __init__(self):
+
+        self.Objects = OrderedDict()
+
+        self.State = 1
+        self.View = tuple([ 1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0,
+                            0.0, 0.0, -50.0, 0.0, 0.0, 0.0, 40.0, 60.0, -20.0 ])
+        self.Wizard = None
+
+        self.Settings = { 'auto_zoom': '1', 'mouse_selection_mode': '1', 'auto_show_lines': '1',
+                          'auto_show_nonbonded': '1', 'ignore_case': '1', 'state': '1' }
+
+        self.Colors = OrderedDict()
+        for Name in COLORS.keys():
+            self.Colors[Name] = COLORS[Name]
+
+        # Namespace of the expressions of iterate/alter without space
+        self.Space = dict()
+
+        # Selections already evaluated and atoms by value of each property,
+        # until an object or an atom property changes (see Forget)
+        self.dictSelected = dict()
+        self.dictIndex = dict()
+
+        self.Calls = dict()
+        self.Time = dict()
+
+        for Name in dir(self):
+            if Name[0].islower() and callable(getattr(self, Name)):
+                setattr(self, Name, self.Timed(Name, getattr(self, Name)))
+
+    '''
+    @summary: SUBROUTINE Timed: command counted and timed (forgetting the selections evaluated
+              if it may change the objects or their atoms)
+    '''
+    def Timed(self, Name, Function):
+
+        Changes = Name not in UNCHANGED
+
+        def Command(*args, **kwargs):
+
+            Start = time.time()
+            try:
+                return Function(*args, **kwargs)
+            finally:
+                if Changes:
+                    self.Forget()
+                self.Time[Name] = self.Time.get(Name, 0.0) + time.time() - Start
+                self.Calls[Name] = self.Calls.get(Name, 0) + 1
+
+        Command.__name__ = Name
+
+        return Command
+
+    '''
+    @summary: SUBROUTINE Forget: forgets the selections evaluated and the atoms indexed by property
+    '''
+    def Forget(self):
+
+        self.dictSelected.clear()
+        self.dictIndex.clear()
+
+    '''
+    @summary: SUBROUTINE Reset_Stats: forgets the calls made so far
+    '''
+    def Reset_Stats(self):
+
+        self.Calls.clear()
+        self.Time.clear()
+
+    '''
+    @summary: SUBROUTINE Get_Stats: (command, calls, seconds) of the commands called, most called first
+    '''
+    def Get_Stats(self):
+
+        return [ (Name, self.Calls[Name], self.Time.get(Name, 0.0))
+                 for Name in sorted(self.Calls.keys(), key=lambda Name: (-self.Calls[Name], Name)) ]
+
+    '''
+    @summary: SUBROUTINE Report: table of the calls made since the last Reset_Stats
+    '''
+    def Report(self, Indent='    '):
+
+        Lines = list()
+        for Name, Calls, Seconds in self.Get_Stats():
+            Lines.append('%s%-20s %8d %10.3f ms' % (Indent, Name, Calls, 1000.0 * Seconds))
+
+        return '\n'.join(Lines)
+
+    #===================================================================================
+    # Registry
+    #===================================================================================
+
+    def Get_Molecules(self):
+
+        return [ Object for Object in self.Objects.values() if Object.Type == 'object:molecule' ]
+
+    def Get_Matching(self, Pattern):
+
+        if Pattern in self.Objects:
+            return [ Pattern ]
+
+        return [ Name for Name in self.Objects.keys() if fnmatch.fnmatchcase(Name, Pattern) ]
+
+    def Add_Object(self, Object):
+
+        self.Objects.pop(Object.Name, None)
+        self.Objects[Object.Name] = Object
+
+        return Object
+
+    def Get_Color(self, Color):
+
+        if isinstance(Color, int):
+            return Color
+
+        if Color not in self.Colors:
+            self.Colors[Color] = COLORS['grey']
+
+        return list(self.Colors.keys()).index(Color)
+
+    def Get_State(self, State):
+
+        if State is None or int(State) < 0:
+            return self.State
+
+        return int(State)
+
+    #===================================================================================
+    # Selection engine
+    #===================================================================================
+
+    '''
+    @summary: SUBROUTINE Select: set of the atoms of a selection
+    '''
+    def Select(self, Text, State=None):
+
+        if not isinstance(Text, STRING):
+            raise CmdException('Invalid selection')
+
+        State = self.Get_State(State)
+
+        Cached = self.dictSelected.get(Text)
+        if Cached is not None:
+            return Cached
+
+        Tokens = TOKENS.findall(Text)
+        if not Tokens:
+            return self.Get_All()
+
+        Parser = SelectionParser(self, Tokens, State)
+        Atoms = frozenset(Parser.Parse_Expression())
+
+        if Parser.Position != len(Tokens):
+            raise CmdException('Invalid selection: ' + Text)
+
+        if Parser.Cacheable:
+            self.dictSelected[Text] = Atoms
+
+        return Atoms
+
+    '''
+    @summary: SUBROUTINE Ordered: the atoms of a set in object then index order
+    '''
+    def Ordered(self, Atoms):
+
+        Order = self.dictIndex.get('order')
+        if Order is None:
+            Order = self.dictIndex['order'] = dict()
+            for Object in self.Get_Molecules():
+                Order[Object] = len(Order)
+
+        return sorted(Atoms, key=lambda Atom: (Order[Atom.Object], Atom.index))
+
+    def Get_All(self):
+
+        Atoms = self.dictIndex.get('all')
+        if Atoms is None:
+            Atoms = set()
+            for Object in self.Get_Molecules():
+                Atoms.update(Object.Atoms)
+            Atoms = self.dictIndex['all'] = frozenset(Atoms)
+
+        return Atoms
+
+    '''
+    @summary: SUBROUTINE Get_Index: atoms by value of a property (upper case for the properties compared without case)
+    '''
+    def Get_Index(self, Property):
+
+        Index = self.dictIndex.get(Property)
+        if Index is None:
+            Index = self.dictIndex[Property] = dict()
+            for Atom in self.Get_All():
+                if Property == 'model':
+                    Value = Atom.Object.Name
+                else:
+                    Value = getattr(Atom, Property)
+                    if Property in NOCASE:
+                        Value = Value.upper()
+                Index.setdefault(Value, list()).append(Atom)
+
+        return Index
+
+    def Get_Namespace(self, Atom, State=None):
+
+        Space = { 'model': Atom.Object.Name, 'index': Atom.index, 'ID': Atom.ID, 'name': Atom.name,
+                  'resn': Atom.resn, 'resi': Atom.resi, 'resv': Get_Resv(Atom.resi), 'chain': Atom.chain,
+                  'segi': Atom.segi, 'elem': Atom.elem, 'alt': Atom.alt, 'b': Atom.b, 'q': Atom.q,
+                  'vdw': Atom.vdw, 'color': Atom.color, 'label': Atom.label, 'ss': Atom.ss,
+                  'type': 'HETATM' if Atom.hetatm else 'ATOM' }
+
+        if State is not None:
+            Coord = Atom.Object.Get_Coord(Atom, State)
+            Space['x'], Space['y'], Space['z'] = Coord
+            Space['state'] = State
+
+        return Space
+
+    def Store_Namespace(self, Atom, Space, State=None):
+
+        Atom.ID = int(Space['ID'])
+        for Key in ('name', 'resn', 'resi', 'chain', 'segi', 'elem', 'alt', 'ss'):
+            setattr(Atom, Key, str(Space[Key]))
+        for Key in ('b', 'q', 'vdw'):
+            setattr(Atom, Key, float(Space[Key]))
+
+        Atom.hetatm = int(Space['type'] == 'HETATM')
+        Atom.label = str(Space['label'])
+        Atom.color = self.Get_Color(Space['color'])
+
+        if State is not None:
+            Atom.Object.Set_Coord(Atom, State, (Space['x'], Space['y'], Space['z']))
+
+    def Execute(self, Atoms, Expression, Space, State=None, Store=False):
+
+        if Space is None:
+            Space = self.Space
+
+        Code = compile(Expression, '<expression>', 'exec')
+
+        for Atom in Atoms:
+            if State is not None and Atom.Object.Get_Coord(Atom, State) is None:
+                continue
+
+            Namespace = self.Get_Namespace(Atom, State)
+            exec(Code, Space, Namespace)
+
+            if Store:
+                self.Store_Namespace(Atom, Namespace, State)
+
+        return 0
+
+    def Get_States(self, Atoms, State):
+
+        if State == 0:
+            States = set()
+            for Atom in Atoms:
+                States.update(range(1, len(Atom.Object.States) + 1))
+            return sorted(States)
+
+        return [ self.Get_State(State) ]
+
+    #===================================================================================
+    # Objects
+    #===================================================================================
+
+    def load(self, filename, object='', state=0, format='', *args, **kwargs):
+
+        if not format:
+            format = os.path.splitext(filename)[1][1:].lower()
+
+        if format not in ('pdb', 'ent', 'pdb1', 'inp', ''):
+            raise CmdException('Unsupported format: ' + format)
+
+        if not object:
+            object = os.path.splitext(os.path.basename(filename))[0]
+
+        File = open(filename)
+        Text = File.read()
+        File.close()
+
+        return self.Load_PDB(Text, object, state)
+
+    def read_pdbstr(self, pdb, oname, state=0, *args, **kwargs):
+
+        return self.Load_PDB(pdb, oname, state)
+
+    def Load_PDB(self, Text, Name, State):
+
+        Atoms, States = Parse_PDB(Text)
+
+        Object = self.Objects.get(Name)
+        if Object is not None and Object.Type == 'object:molecule' and \
+           len(Object.Atoms) == len(Atoms) and len(States) == 1:
+
+            # Another state of the object
+            if int(State) <= 0:
+                State = len(Object.States) + 1
+            for Atom, Coord in zip(Object.Atoms, States[0]):
+                Object.Set_Coord(Atom, int(State), Coord)
+
+            return 0
+
+        Object = self.Add_Object(Molecule(Name))
+
+        First = max(int(State), 1)
+        dictStates = dict()
+        for i in range(len(States)):
+            dictStates[First + i] = States[i]
+
+        Object.Add_Atoms(Atoms, dictStates)
+
+        if self.Settings['auto_show_lines'] not in ('0', 'off'):
+            for Atom in Atoms:
+                Atom.Reps.add('lines')
+
+        return 0
+
+    def get_pdbstr(self, selection='all', state=-1, *args, **kwargs):
+
+        return self.Get_PDBStr(selection, state)
+
+    def Get_PDBStr(self, Selection_, State_):
+
+        Atoms = self.Ordered(self.Select(Selection_))
+
+        Lines = list()
+        States = self.Get_States(Atoms, int(State_))
+        for State in States:
+            if len(States) > 1:
+                Lines.append('MODEL     %4d\n' % State)
+            for Atom in Atoms:
+                Coord = Atom.Object.Get_Coord(Atom, State)
+                if Coord is not None:
+                    Lines.append(Format_PDB(Atom, Coord))
+            if len(States) > 1:
+                Lines.append('ENDMDL\n')
+
+        Lines.append('END\n')
+
+        return ''.join(Lines)
+
+    def save(self, filename, selection='(all)', state=-1, format='', *args, **kwargs):
+
+        if not format:
+            format = os.path.splitext(filename)[1][1:].lower()
+
+        if format not in ('pdb', 'ent', 'inp', ''):
+            raise CmdException('Unsupported format: ' + format)
+
+        Text = self.Get_PDBStr(selection, state)
+
+        File = open(filename, 'w')
+        File.write(Text)
+        File.close()
+
+        return 0
+
+    def create(self, name, selection, source_state=0, target_state=0, *args, **kwargs):
+
+        return self.Create_Object(name, self.Select(selection), int(source_state), int(target_state))
+
+    def extract(self, name, selection, source_state=0, target_state=0, *args, **kwargs):
+
+        Atoms = self.Select(selection)
+
+        self.Create_Object(name, Atoms, int(source_state), int(target_state))
+        self.Remove(Atoms)
+
+        return 0
+
+    def Create_Object(self, Name, Atoms, Source, Target):
+
+        Atoms = self.Ordered(Atoms)
+
+        if Source == 0:
+            Sources = self.Get_States(Atoms, 0)
+        else:
+            Sources = [ self.Get_State(Source) ]
+
+        if Target <= 0:
+            Target = Sources[0] if Sources else 1
+            if Source < 0 or Target < 0:
+                Target = self.State
+
+        Object = self.Objects.get(Name)
+        if Object is not None and Object.Type == 'object:molecule' and len(Object.Atoms) == len(Atoms) and \
+           (Object not in [ Atom.Object for Atom in Atoms ] or Target not in Sources):
+
+            # Another state of the object (copied from other objects or from another of its states)
+            for i in range(len(Sources)):
+                for Copy, Atom in zip(Object.Atoms, Atoms):
+                    Coord = Atom.Object.Get_Coord(Atom, Sources[i])
+                    if Coord is not None:
+                        Object.Set_Coord(Copy, Target + i, Coord)
+
+            return 0
+
+        Copies = list()
+        dictCopy = dict()
+        for Atom in Atoms:
+            Copy = ObjectAtom()
+            Copy.__dict__.update(Atom.__dict__)
+            Copy.Reps = set(Atom.Reps)
+            Copy.Bonded = list()
+            Copies.append(Copy)
+            dictCopy[Atom] = Copy
+
+        for Atom in Atoms:
+            for Other in Atom.Bonded:
+                if Other in dictCopy:
+                    dictCopy[Atom].Bonded.append(dictCopy[Other])
+
+        dictStates = dict()
+        for i in range(len(Sources)):
+            dictStates[Target + i] = [ Atom.Object.Get_Coord(Atom, Sources[i]) for Atom in Atoms ]
+
+        Object = self.Add_Object(Molecule(Name))
+        Object.Add_Atoms(Copies, dictStates)
+
+        return 0
+
+    def remove(self, selection, *args, **kwargs):
+
+        return self.Remove(self.Select(selection))
+
+    def Remove(self, Atoms):
+
+        for Object in self.Get_Molecules():
+            Removed = set([ Atom for Atom in Object.Atoms if Atom in Atoms ])
+            if Removed:
+                Object.Remove_Atoms(Removed)
+
+        for Object in self.Objects.values():
+            if Object.Type == 'selection':
+                Object.Atoms = Object.Atoms - Atoms
+
+        return 0
+
+    def delete(self, name, *args, **kwargs):
+
+        for Pattern in name.split():
+            if Pattern in ('all', '*'):
+                self.Objects.clear()
+                continue
+
+            for Name in self.Get_Matching(Pattern):
+                Object = self.Objects.pop(Name)
+
+                # Atoms deleted with their object are no longer selected
+                if Object.Type == 'object:molecule':
+                    Atoms = set(Object.Atoms)
+                    for Other in self.Objects.values():
+                        if Other.Type == 'selection':
+                            Other.Atoms = Other.Atoms - Atoms
+
+        return 0
+
+    def set_name(self, old_name, new_name, *args, **kwargs):
+
+        if old_name not in self.Objects:
+            raise CmdException('No object ' + old_name)
+
+        Objects = OrderedDict()
+        for Name in self.Objects.keys():
+            Object = self.Objects[Name]
+            if Name == old_name:
+                Object.Name = new_name
+                Name = new_name
+            Objects[Name] = Object
+
+        self.Objects = Objects
+
+        return 0
+
+    def select(self, name, selection='', enable=1, *args, **kwargs):
+
+        if selection == '':
+            name, selection = 'sele', name
+
+        Atoms = self.Select(selection)
+        self.Add_Object(Selection(name, Atoms))
+
+        return len(Atoms)
+
+    def deselect(self, *args, **kwargs):
+
+        Object = self.Objects.get('sele')
+        if Object is not None:
+            Object.Enabled = False
+
+        return 0
+
+    def pseudoatom(self, object='', selection='', name='PS1', resn='PSD', resi='1', chain='P',
+                   segi='PSDO', elem='PS', vdw=0.5, hetatm=1, b=0.0, q=0.0, color='', label='',
+                   pos=None, state=0, *args, **kwargs):
+
+        if not object:
+            object = 'pseudo%02d' % len(self.Objects)
+
+        if pos is None:
+            pos = [ 0.0, 0.0, 0.0 ]
+            if selection:
+                Atoms = self.Select(selection)
+                Coords = [ Atom.Object.Get_Coord(Atom, self.State) for Atom in Atoms ]
+                Coords = [ Coord for Coord in Coords if Coord is not None ]
+                if Coords:
+                    pos = [ sum([ Coord[k] for Coord in Coords ]) / len(Coords) for k in range(3) ]
+
+        Atom = ObjectAtom()
+        Atom.name, Atom.resn, Atom.resi, Atom.chain, Atom.segi, Atom.elem = name, resn, str(resi), chain, segi, elem
+        Atom.vdw, Atom.hetatm, Atom.b, Atom.q, Atom.label = float(vdw), int(hetatm), float(b), float(q), label
+        Atom.Reps.add('nonbonded')
+        if color:
+            Atom.color = self.Get_Color(color)
+
+        Object = self.Objects.get(object)
+        if Object is None or Object.Type != 'object:molecule':
+            Object = self.Add_Object(Molecule(object))
+
+        Atom.ID = len(Object.Atoms) + 1
+
+        if int(state) <= 0:
+            state = max(len(Object.States), 1)
+
+        Object.Add_Atoms([ Atom ], { int(state): [ pos ] })
+
+        return 0
+
+    def load_cgo(self, object, name, state=0, *args, **kwargs):
+
+        self.Add_Object(Graphics(name, 'object:cgo', list(object)))
+
+        return 0
+
+    def distance(self, name=None, selection1='(sele)', selection2='(sele)', cutoff=None, mode=None, *args, **kwargs):
+
+        if not name:
+            name = 'dist%02d' % len(self.Objects)
+
+        Atoms1 = self.Ordered(self.Select(selection1))
+        Atoms2 = self.Ordered(self.Select(selection2))
+
+        # mode 2: polar contacts (N/O pairs closer than the cutoff)
+        if mode == 2:
+            Atoms1 = [ Atom for Atom in Atoms1 if Atom.elem in ('N', 'O') ]
+            Atoms2 = [ Atom for Atom in Atoms2 if Atom.elem in ('N', 'O') ]
+
+        Pairs = list()
+        for Atom1 in Atoms1:
+            Coord1 = Atom1.Object.Get_Coord(Atom1, self.State)
+            for Atom2 in Atoms2:
+                Coord2 = Atom2.Object.Get_Coord(Atom2, self.State)
+                if Coord1 is None or Coord2 is None or Atom1 is Atom2:
+                    continue
+                Distance = Geometry.distance(Coord1, Coord2)
+                if cutoff is None or float(cutoff) <= 0 or Distance <= float(cutoff):
+                    Pairs.append((Atom1, Atom2, Distance))
+
+        self.Add_Object(Graphics(name, 'object:measurement', Pairs))
+
+        if not Pairs:
+            return 0.0
+
+        return sum([ Pair[2] for Pair in Pairs ]) / len(Pairs)
+
+    def get_names(self, type='objects', enabled_only=0, selection='', *args, **kwargs):
+
+        Names = list()
+        for Name in self.Objects.keys():
+            Object = self.Objects[Name]
+            if enabled_only and not Object.Enabled:
+                continue
+
+            Selection_ = Object.Type == 'selection'
+            if type in ('objects', 'public_objects', 'nongroup_objects', 'public_nongroup_objects') and Selection_:
+                continue
+            if type in ('selections', 'public_selections') and not Selection_:
+                continue
+            if type.startswith('public') and Name.startswith('_'):
+                continue
+
+            Names.append(Name)
+
+        return Names
+
+    def get_type(self, name, *args, **kwargs):
+
+        if name not in self.Objects:
+            raise CmdException('No object ' + name)
+
+        return self.Objects[name].Type
+
+    def get_object_list(self, selection='(all)', *args, **kwargs):
+
+        Objects = set([ Atom.Object for Atom in self.Select(selection) ])
+
+        return [ Object.Name for Object in self.Get_Molecules() if Object in Objects ]
+
+    def set_title(self, object, state, text, *args, **kwargs):
+
+        Object = self.Objects.get(object)
+        if Object is None or Object.Type != 'object:molecule':
+            raise CmdException('set_title: object ' + str(object) + ' not found')
+
+        Object.Titles[int(state)] = text
+
+        return 0
+
+    def count_states(self, selection='(all)', *args, **kwargs):
+
+        Atoms = self.Select(selection)
+        States = [ len(Object.States) for Object in set([ Atom.Object for Atom in Atoms ]) ]
+
+        return max(States + [ 0 ])
+
+    def enable(self, name='all', *args, **kwargs):
+
+        return self.Set_Enabled(name, True)
+
+    def disable(self, name='all', *args, **kwargs):
+
+        return self.Set_Enabled(name, False)
+
+    def Set_Enabled(self, Name, Enabled):
+
+        for Pattern in Name.split():
+            Names = self.Objects.keys()
+            if Pattern not in ('all', '*'):
+                Names = self.Get_Matching(Pattern)
+            for Name in Names:
+                self.Objects[Name].Enabled = Enabled
+
+        return 0
+
+    #===================================================================================
+    # Atoms
+    #===================================================================================
+
+    def count_atoms(self, selection='(all)', quiet=1, state=0, *args, **kwargs):
+
+        Atoms = self.Select(selection)
+        if int(state) > 0:
+            Atoms = [ Atom for Atom in Atoms if Atom.Object.Get_Coord(Atom, int(state)) is not None ]
+
+        return len(Atoms)
+
+    def index(self, selection='(all)', quiet=1, *args, **kwargs):
+
+        return [ (Atom.Object.Name, Atom.index) for Atom in self.Ordered(self.Select(selection)) ]
+
+    def id_atom(self, selection, mode=0, *args, **kwargs):
+
+        Atoms = self.Ordered(self.Select(selection))
+        if len(Atoms) != 1:
+            raise CmdException('id_atom: ' + str(len(Atoms)) + ' atoms selected instead of 1')
+
+        if mode:
+            return (Atoms[0].Object.Name, Atoms[0].ID)
+
+        return Atoms[0].ID
+
+    def iterate(self, selection, expression, quiet=1, space=None, *args, **kwargs):
+
+        return self.Execute(self.Ordered(self.Select(selection)), expression, space)
+
+    def iterate_state(self, state, selection, expression, quiet=1, space=None, *args, **kwargs):
+
+        Atoms = self.Ordered(self.Select(selection))
+        for State in self.Get_States(Atoms, int(state)):
+            self.Execute(Atoms, expression, space, State)
+
+        return 0
+
+    def alter(self, selection, expression, quiet=1, space=None, *args, **kwargs):
+
+        return self.Execute(self.Ordered(self.Select(selection)), expression, space, Store=True)
+
+    def alter_state(self, state, selection, expression, quiet=1, space=None, *args, **kwargs):
+
+        Atoms = self.Ordered(self.Select(selection))
+        for State in self.Get_States(Atoms, int(state)):
+            self.Execute(Atoms, expression, space, State, Store=True)
+
+        return 0
+
+    def get_model(self, selection='(all)', state=1, *args, **kwargs):
+
+        State = self.Get_State(state)
+        if int(state) == 0:
+            State = self.State
+
+        Result = Model()
+        dictSlot = dict()
+
+        for Atom in self.Ordered(self.Select(selection)):
+            Coord = Atom.Object.Get_Coord(Atom, State)
+            if Coord is None:
+                continue
+            dictSlot[Atom] = len(Result.atom)
+            Result.atom.append(ModelAtom(Atom, Coord))
+
+        for Atom in dictSlot.keys():
+            for Other in Atom.Bonded:
+                if Other in dictSlot and dictSlot[Atom] < dictSlot[Other]:
+                    Result.bond.append(ModelBond(dictSlot[Atom], dictSlot[Other]))
+
+        Result.bond.sort(key=lambda Bond: Bond.index)
+
+        return Result
+
+    def load_coords(self, coords, selection, state=1, *args, **kwargs):
+
+        Atoms = self.Ordered(self.Select(selection))
+        if len(Atoms) != len(coords):
+            raise CmdException('load_coords: ' + str(len(coords)) + ' coordinates for ' + str(len(Atoms)) + ' atoms')
+
+        State = self.Get_State(state)
+        for Atom, Coord in zip(Atoms, coords):
+            Atom.Object.Set_Coord(Atom, State, Coord)
+
+        return 0
+
+    def get_extent(self, selection='(all)', state=0, *args, **kwargs):
+
+        Atoms = self.Select(selection)
+
+        Coords = list()
+        for State in self.Get_States(Atoms, int(state)):
+            Coords.extend([ Atom.Object.Get_Coord(Atom, State) for Atom in Atoms ])
+        Coords = [ Coord for Coord in Coords if Coord is not None ]
+
+        if not Coords:
+            raise CmdException('get_extent: no coordinates')
+
+        return [ [ min([ Coord[k] for Coord in Coords ]) for k in range(3) ],
+                 [ max([ Coord[k] for Coord in Coords ]) for k in range(3) ] ]
+
+    def translate(self, vector=[0.0, 0.0, 0.0], selection='all', state=0, camera=1, object=None, *args, **kwargs):
+
+        Atoms = self.Select(selection)
+        for State in self.Get_States(Atoms, int(state)):
+            for Atom in Atoms:
+                Coord = Atom.Object.Get_Coord(Atom, State)
+                if Coord is not None:
+                    Atom.Object.Set_Coord(Atom, State, [ Coord[k] + float(vector[k]) for k in range(3) ])
+
+        return 0
+
+    def Get_Atom(self, Text):
+
+        Atoms = list(self.Select(Text))
+        if len(Atoms) != 1:
+            raise CmdException('Selection "' + Text + '" has ' + str(len(Atoms)) + ' atoms instead of 1')
+
+        return Atoms[0]
+
+    def get_dihedral(self, atom1, atom2, atom3, atom4, state=-1, *args, **kwargs):
+
+        State = self.Get_State(state)
+        Atoms = [ self.Get_Atom(Text) for Text in (atom1, atom2, atom3, atom4) ]
+
+        return Dihedral(*[ Atom.Object.Get_Coord(Atom, State) for Atom in Atoms ])
+
+    def set_dihedral(self, atom1, atom2, atom3, atom4, angle, state=1, *args, **kwargs):
+
+        State = self.Get_State(state)
+        A, B, C, D = [ self.Get_Atom(Text) for Text in (atom1, atom2, atom3, atom4) ]
+
+        Object = B.Object
+        if C not in B.Bonded or len(set([ A.Object, B.Object, C.Object, D.Object ])) != 1:
+            raise CmdException('set_dihedral: the atoms must be bonded in the same object')
+
+        # The atoms on the side of atom3, away from atom2
+        Moving = set([ C ])
+        Stack = [ C ]
+        while Stack:
+            Atom = Stack.pop()
+            for Other in Atom.Bonded:
+                if Other is B and Atom is C:
+                    continue
+                if Other is B:
+                    raise CmdException('set_dihedral: the bond is in a ring')
+                if Other not in Moving:
+                    Moving.add(Other)
+                    Stack.append(Other)
+        Moving.discard(C)
+
+        # The atoms beyond atom3 turn about the bond atom2-atom3 by the change of the dihedral
+        Coords = Object.States[State-1]
+        PointA, PointB, PointC, PointD = [ Coords[Atom.index-1] for Atom in (A, B, C, D) ]
+
+        Angle = float(angle) - Dihedral(PointA, PointB, PointC, PointD)
+        Origin = [ float(PointC[k]) for k in range(3) ]
+        Axis = [ float(PointC[k]) - float(PointB[k]) for k in range(3) ]
+
+        for Atom in Moving:
+            Coords[Atom.index-1] = Rotate([ float(x) for x in Coords[Atom.index-1] ], Origin, Axis, Angle)
+
+        return 0
+
+    def show(self, representation='', selection='', *args, **kwargs):
+
+        return self.Set_Representation(representation, selection, True)
+
+    def hide(self, representation='everything', selection='', *args, **kwargs):
+
+        return self.Set_Representation(representation, selection, False)
+
+    def Set_Representation(self, Representation, Selection_, Shown):
+
+        if Selection_ == '' and Representation not in REPRESENTATIONS + ('everything', '') and \
+           Representation not in SYNONYMS:
+            Representation, Selection_ = '', Representation
+
+        Representation = SYNONYMS.get(Representation, Representation)
+        if Representation == '':
+            Representation = 'lines'
+
+        if Representation not in REPRESENTATIONS + ('everything',):
+            raise CmdException('Unknown representation: ' + Representation)
+
+        for Atom in self.Select(Selection_ or 'all'):
+            if Representation == 'everything':
+                if not Shown:
+                    Atom.Reps.clear()
+            elif Shown:
+                Atom.Reps.add(Representation)
+            else:
+                Atom.Reps.discard(Representation)
+
+        return 0
+
+    def color(self, color, selection='(all)', *args, **kwargs):
+
+        Color = self.Get_Color(color)
+        for Atom in self.Select(selection):
+            Atom.color = Color
+
+        return 0
+
+    def label(self, selection='(all)', expression='', *args, **kwargs):
+
+        Atoms = self.Select(selection)
+        for Atom in Atoms:
+            if expression:
+                Atom.label = str(eval(expression, dict(self.Space), self.Get_Namespace(Atom)))
+            else:
+                Atom.label = ''
+
+        return 0
+
+    def mask(self, selection='(all)', *args, **kwargs):
+
+        for Atom in self.Select(selection):
+            Atom.Masked = True
+
+        return 0
+
+    def unmask(self, selection='(all)', *args, **kwargs):
+
+        for Atom in self.Select(selection):
+            Atom.Masked = False
+
+        return 0
+
+    def zoom(self, selection='all', *args, **kwargs):
+
+        self.Select(selection)
+        return 0
+
+    def orient(self, selection='(all)', *args, **kwargs):
+
+        self.Select(selection)
+        return 0
+
+    def center(self, selection='(all)', *args, **kwargs):
+
+        self.Select(selection)
+        return 0
+
+    def rebuild(self, selection='all', *args, **kwargs):
+
+        self.Select(selection)
+        return 0
+
+    #===================================================================================
+    # Settings, view and interface
+    #===================================================================================
+
+    def get(self, name, selection='', state=0, *args, **kwargs):
+
+        if name not in self.Settings:
+            raise CmdException('Unknown setting ' + name)
+
+        return self.Settings[name]
+
+    def set(self, name, value=1, selection='', state=0, *args, **kwargs):
+
+        self.Settings[name] = str(value)
+
+        return 0
+
+    def get_setting_legacy(self, name, *args, **kwargs):
+
+        return float(self.Settings.get(name, 0))
+
+    def get_view(self, *args, **kwargs):
+
+        return self.View
+
+    def set_view(self, view, *args, **kwargs):
+
+        if len(view) != 18:
+            raise CmdException('A view has 18 values')
+
+        self.View = tuple([ float(Value) for Value in view ])
+
+        return 0
+
+    def get_state(self, *args, **kwargs):
+
+        return self.State
+
+    def frame(self, frame, *args, **kwargs):
+
+        self.State = max(int(frame), 1)
+
+        return 0
+
+    def get_wizard(self, *args, **kwargs):
+
+        return self.Wizard
+
+    def set_wizard(self, wizard=None, *args, **kwargs):
+
+        self.Wizard = wizard
+
+        return 0
+
+    def get_color_tuple(self, name, *args, **kwargs):
+
+        if isinstance(name, int):
+            Names = list(self.Colors.keys())
+            if name < 0 or name >= len(Names):
+                raise CmdException('Unknown color index ' + str(name))
+            return self.Colors[Names[name]]
+
+        if name not in self.Colors:
+            raise CmdException('Unknown color ' + name)
+
+        return self.Colors[name]
+
+    def set_color(self, name, rgb, *args, **kwargs):
+
+        self.Colors[name] = tuple([ float(Value) for Value in rgb ])
+
+        return 0
+
+    def refresh(self, *args, **kwargs):
+
+        return 0
+
+    def refresh_wizard(self, *args, **kwargs):
+
+        return 0
+
+    def window(self, action='show', *args, **kwargs):
+
+        return 0
+
+    def config_mouse(self, ring='three_button', *args, **kwargs):
+
+        return 0
+
+    def unpick(self, *args, **kwargs):
+
+        return 0
+
+    def feedback(self, action='?', module='all', mask='everything', *args, **kwargs):
+
+        return 0
+
+    def fetch(self, *args, **kwargs):
+
+        raise CmdException('fetch is not available without PyMOL')
+
+    def fab(self, input, name=None, mode='peptide', resi=1, chain='', segi='', state=-1, dir=1, hydro=-1,
+            ss=0, *args, **kwargs):
+
+        if mode != 'peptide':
+            raise CmdException('fab without PyMOL only builds peptides')
+
+        if name is None:
+            name = 'obj%02d' % (len(self.Objects) + 1)
+
+        Lines = Build_Peptide(input, int(resi), chain, ss)
+
+        return self.Load_PDB(''.join(Lines) + 'END\n', name, max(state, 1))
+
+
+class SelectionParser(object):
+
+    '''
+    @summary: Recursive descent over the tokens of a selection, with the precedence of PyMOL
+              (from the tightest): not, and, or, the distance operators then byres/byobject:
+              expression := (byres|byobject) expression | distance
+              distance   := or ( (extend N | around R | expand R | within R of or) or-continued )*
+              or         := and ( or|'|' and )*
+              and        := not ( and|& not )*
+              not        := (not|!) not | term
+    '''
+    def __init__(self, Cmd, Tokens, State):
+
+        self.Cmd = Cmd
+        self.Tokens = Tokens
+        self.Position = 0
+        self.State = State
+
+        self.All = Cmd.Get_All()
+
+        # False when the atoms selected depend on the coordinates or on what is visible
+        self.Cacheable = True
+
+    def Peek(self):
+
+        if self.Position < len(self.Tokens):
+            return self.Tokens[self.Position]
+
+        return None
+
+    def Next(self):
+
+        Token = self.Peek()
+        if Token is None:
+            raise CmdException('Incomplete selection')
+
+        self.Position += 1
+
+        return Token
+
+    def Peek_Keyword(self):
+
+        Token = self.Peek()
+        if Token is None:
+            return None
+
+        return Token.lower()
+
+    def Parse_Expression(self):
+
+        Prefix = PREFIXES.get(self.Peek_Keyword())
+
+        if Prefix == 'byres':
+            self.Next()
+            Residues = set([ Atom.Get_Residue() for Atom in self.Parse_Expression() ])
+            return set([ Atom for Atom in self.All if Atom.Get_Residue() in Residues ])
+
+        if Prefix == 'byobject':
+            self.Next()
+            Objects = set([ Atom.Object for Atom in self.Parse_Expression() ])
+            return set([ Atom for Object in Objects for Atom in Object.Atoms ])
+
+        return self.Parse_Distance()
+
+    '''
+    @summary: SUBROUTINE Parse_Distance: the distance operators apply to all the selection on their left
+    '''
+    def Parse_Distance(self):
+
+        Atoms = self.Parse_Or()
+
+        while self.Peek_Keyword() in POSTFIXES:
+            self.Cacheable = False
+            Postfix = POSTFIXES[self.Next().lower()]
+            Value = float(self.Next())
+
+            if Postfix == 'extend':
+                for i in range(int(Value)):
+                    Atoms = Atoms | set([ Other for Atom in Atoms for Other in Atom.Bonded ])
+
+            elif Postfix == 'around':
+                Atoms = self.Get_Within(self.All, Atoms, Value) - Atoms
+
+            elif Postfix == 'expand':
+                Atoms = Atoms | self.Get_Within(self.All, Atoms, Value)
+
+            else:
+                if self.Peek_Keyword() != 'of':
+                    raise CmdException('within R of: "of" expected')
+                self.Next()
+                Atoms = self.Get_Within(Atoms, self.Parse_Or(), Value)
+
+            # The result is the left operand of the operators that follow
+            Atoms = self.Parse_Or(Atoms)
+
+        return Atoms
+
+    def Parse_Or(self, First=None):
+
+        Atoms = self.Parse_And(First)
+        while self.Peek_Keyword() in ('or', '|'):
+            self.Next()
+            Atoms = Atoms | self.Parse_And()
+
+        return Atoms
+
+    def Parse_And(self, First=None):
+
+        Atoms = First
+        if Atoms is None:
+            Atoms = self.Parse_Not()
+
+        while self.Peek_Keyword() in ('and', '&'):
+            self.Next()
+            Atoms = Atoms & self.Parse_Not()
+
+        return Atoms
+
+    def Parse_Not(self):
+
+        if PREFIXES.get(self.Peek_Keyword()) == 'not':
+            self.Next()
+            return self.All - self.Parse_Not()
+
+        # byres and byobject take the rest of the selection
+        if PREFIXES.get(self.Peek_Keyword()) is not None:
+            return self.Parse_Expression()
+
+        return self.Parse_Term()
+
+    '''
+    @summary: SUBROUTINE Get_Within: atoms of Atoms closer than Cutoff to one of Reference
+    '''
+    def Get_Within(self, Atoms, Reference, Cutoff):
+
+        Cell = max(Cutoff, 1.0)
+        Cutoff2 = Cutoff * Cutoff
+
+        dictCells = dict()
+        for Atom in Reference:
+            Coord = Atom.Object.Get_Coord(Atom, self.State)
+            if Coord is not None:
+                Key = tuple([ int(math.floor(Coord[k] / Cell)) for k in range(3) ])
+                dictCells.setdefault(Key, list()).append(Coord)
+
+        Within = set()
+        for Atom in Atoms:
+            Coord = Atom.Object.Get_Coord(Atom, self.State)
+            if Coord is None:
+                continue
+
+            Key = tuple([ int(math.floor(Coord[k] / Cell)) for k in range(3) ])
+            Found = False
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for dz in (-1, 0, 1):
+                        for Other in dictCells.get((Key[0] + dx, Key[1] + dy, Key[2] + dz), []):
+                            if Geometry.sqrdistance(Coord, Other) <= Cutoff2:
+                                Found = True
+                                break
+                        if Found: break
+                    if Found: break
+
+            if Found:
+                Within.add(Atom)
+
+        return Within
+
+    def Parse_Term(self):
+
+        Token = self.Next()
+        Keyword = Token.lower()
+
+        if Token == '(':
+            Atoms = self.Parse_Expression()
+            if self.Next() != ')':
+                raise CmdException('Unbalanced parentheses in selection')
+            return Atoms
+
+        if Keyword in PROPERTIES:
+            return self.Select_Property(PROPERTIES[Keyword], self.Next())
+
+        if Keyword in FLAGS:
+            return self.Select_Flag(FLAGS[Keyword])
+
+        return self.Select_Name(Token)
+
+    def Select_Flag(self, Flag):
+
+        All = self.All
+
+        if Flag in ('present', 'visible'):
+            self.Cacheable = False
+
+        if Flag == 'all':
+            return All
+        if Flag == 'none':
+            return set()
+        if Flag == 'hetatm':
+            return set([ Atom for Atom in All if Atom.hetatm ])
+        if Flag == 'hydrogens':
+            return set([ Atom for Atom in All if Atom.elem == 'H' ])
+        if Flag == 'present':
+            return set([ Atom for Atom in All if Atom.Object.Get_Coord(Atom, self.State) is not None ])
+
+        return set([ Atom for Atom in All if Atom.Reps and Atom.Object.Enabled ])
+
+    def Select_Name(self, Token):
+
+        Names = self.Cmd.Get_Matching(Token)
+        if not Names:
+            raise CmdException('Invalid selection name "' + Token + '"')
+
+        Atoms = set()
+        for Name in Names:
+            Object = self.Cmd.Objects[Name]
+            if Object.Type == 'object:molecule':
+                Atoms.update(Object.Atoms)
+            elif Object.Type == 'selection':
+                Atoms.update(Object.Atoms)
+
+        return Atoms
+
+    def Select_Property(self, Property, Token):
+
+        if Token[:1] in ('"', "'"):
+            Values = [ Token[1:-1] ]
+        else:
+            Values = Token.split('+')
+
+        if Property in NOCASE:
+            Values = [ Value.upper() for Value in Values ]
+
+        # Values compared as they are, patterns (wildcards and ranges) matched one by one
+        Literals = set()
+        Patterns = list()
+        for Value in Values:
+            if Property in ('ID', 'index'):
+                if re.match(r'^-?\d+$', Value):
+                    Literals.add(int(Value))
+                else:
+                    Patterns.append(Value)
+            elif re.search(r'[*?\[]', Value) or (Property == 'resi' and '-' in Value[1:]):
+                Patterns.append(Value)
+            else:
+                Literals.add(Value)
+
+        Index = self.Cmd.Get_Index(Property)
+
+        Atoms = set()
+        for Value in Literals:
+            Atoms.update(Index.get(Value, ()))
+
+        for Value in Index.keys():
+            for Pattern in Patterns:
+                if self.Match(Property, Value, Pattern):
+                    Atoms.update(Index[Value])
+                    break
+
+        return Atoms
+
+    def Match(self, Property, Value, Pattern):
+
+        if Property in ('ID', 'index', 'resi'):
+            m = re.match(r'^(-?\d+)-(-?\d*)$', Pattern)
+            if m:
+                Number = Value
+                if Property == 'resi':
+                    Number = Get_Resv(Value)
+                if Number < int(m.group(1)):
+                    return False
+                return m.group(2) == '' or Number <= int(m.group(2))
+
+        return fnmatch.fnmatchcase(str(Value), Pattern)
+
+
+class Util(object):
+
+    '''
+    @summary: The pymol.util module (coloring by element), counted with the commands of Cmd
+    '''
+    def __init__(self, Cmd):
+
+        self.Cmd = Cmd
+
+        self.cnc = self.Cmd.Timed('util.cnc', self.cnc)
+        self.cbag = self.Cmd.Timed('util.cbag', self.cbag)
+
+    def cnc(self, selection='(all)', *args, **kwargs):
+
+        for Atom in self.Cmd.Select(selection):
+            if Atom.elem in ELEMENT_COLORS:
+                Atom.color = self.Cmd.Get_Color(ELEMENT_COLORS[Atom.elem])
+
+    def cbag(self, selection='(all)', *args, **kwargs):
+
+        Carbon = self.Cmd.Get_Color('grey')
+        for Atom in self.Cmd.Select(selection):
+            if Atom.elem == 'C':
+                Atom.color = Carbon
+            elif Atom.elem in ELEMENT_COLORS:
+                Atom.color = self.Cmd.Get_Color(ELEMENT_COLORS[Atom.elem])
+
+
+class Wizard(object):
+
+    '''
+    @summary: Base class of the wizards (pymol.wizard.Wizard)
+    '''
+    def __init__(self, _self=None):
+
+        self.cmd = _self
+
+    def get_prompt(self):
+
+        return None
+
+    def get_panel(self):
+
+        return None
+
+    def cleanup(self):
+
+        pass
+
+
+# Primitives of the compiled graphics objects (pymol.cgo)
+CGO = { 'POINTS': 0.0, 'LINES': 1.0, 'LINE_LOOP': 2.0, 'LINE_STRIP': 3.0, 'TRIANGLES': 4.0,
+        'TRIANGLE_STRIP': 5.0, 'TRIANGLE_FAN': 6.0, 'STOP': 0.0, 'NULL': 1.0, 'BEGIN': 2.0,
+        'END': 3.0, 'VERTEX': 4.0, 'NORMAL': 5.0, 'COLOR': 6.0, 'SPHERE': 7.0, 'TRIANGLE': 8.0,
+        'CYLINDER': 9.0, 'LINEWIDTH': 10.0, 'WIDTHSCALE': 11.0, 'ENABLE': 12.0, 'DISABLE': 13.0,
+        'SAUSAGE': 14.0, 'CUSTOM_CYLINDER': 15.0, 'DOTWIDTH': 16.0, 'ALPHA_TRIANGLE': 17.0,
+        'ELLIPSOID': 18.0, 'ALPHA': 25.0, 'CONE': 27.0, 'LIGHTING': float(0x0B50) }
+
+'''
+@summary: SUBROUTINE Install: registers the stand-in modules as pymol (before the plugin modules are imported)
+
+@return: the cmd stand-in (its calls are counted and timed), the one installed before if any
+'''
+def Install():
+
+    pymol = sys.modules.get('pymol')
+    if getattr(pymol, 'CmdException', None) is CmdException:
+        return pymol.cmd
+
+    Commands = Cmd()
+
+    pymol = types.ModuleType('pymol')
+    pymol.cmd = Commands
+    pymol.util = Util(Commands)
+    pymol.CmdException = CmdException
+
+    wizard = types.ModuleType('pymol.wizard')
+    wizard.Wizard = Wizard
+    pymol.wizard = wizard
+
+    cgo = types.ModuleType('pymol.cgo')
+    for Name in CGO.keys():
+        setattr(cgo, Name, CGO[Name])
+    pymol.cgo = cgo
+
+    vfont = types.ModuleType('pymol.vfont')
+    vfont.plain = dict()
+    pymol.vfont = vfont
+
+    Commands.Space = pymol.__dict__
+
+    sys.modules['pymol'] = pymol
+    sys.modules['pymol.cmd'] = Commands
+    sys.modules['pymol.util'] = pymol.util
+    sys.modules['pymol.wizard'] = wizard
+    sys.modules['pymol.cgo'] = cgo
+    sys.modules['pymol.vfont'] = vfont
+
+    return Commands
@@ -0,0 +1,836 @@
+'''
+    NRGsuite: PyMOL molecular tools interface
+    Copyright (C) 2011 Gaudreault, F., Morency, LP. & Najmanovich, R.
+
+    This program is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+
+'''
+@title: replay_log.py
+
+@summary: Replays a recorded run of FlexAID through Simulation.Parse, the renderer and
+          UpdateScreen as fast as possible, without PyMOL (see fake_pymol.py, which counts
+          and times the calls), and reports the throughput of each stage: parsing (lines/s),
+          decoding of the genes, reconstruction of the poses, drawing (poses/s, cmd calls)
+          and recording of the trajectory. The PDB files of the TOP ligands written once the
+          run ends (see Parse.Write_TopLigands) are checked against the TOP objects, then the
+          first generation is shown again from the trajectory (see Parse.Replay_Generation) and
+          the scores of the table are checked against its chromosome lines.
+
+          A run folder holds the CONFIG.inp, ga_inp.dat and log.txt of a simulation, and
+          the .update file of each generation copied as update.00000, update.00001, ...
+          Without them, the generations are read from log.txt (stdout streaming mode).
+          The target (PDBNAM) is loaded as the object TARGET.
+
+@usage: python replay_log.py record FOLDER [NbGenerations] [NbTop] [NbAtoms] [NbResidues]
+            writes a synthetic run to FOLDER (see fake_flexaid.py)
+        python replay_log.py FOLDER [NbGenFreq|auto] [NbStates] [site] [symmetric]
+            replays the run of FOLDER, drawing every NbGenFreq generation (1 by default)
+            or adapting the interval to the drawing time (auto, see Simulation.Governor),
+            on NbStates states of the TOP objects (1 by default, see StateBudget),
+            with the binding-site residues only in the TOP objects (site, see Parse.Get_SiteSelection)
+            and the symmetric atoms of the ligand considered by the RMSD (symmetric, see RMSDPlan)
+'''
+
+import os
+import re
+import sys
+import glob
+import time
+import shutil
+import tempfile
+import Queue
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FlexAID'))
+
+
+# The plugin modules import pymol: the stand-in must be in place first
+import fake_pymol
+cmd = fake_pymol.Install()
+
+import Color
+import General_cmd
+import GeneDecoder
+import Geometry
+import LogReader
+import ReconstructionPlan
+import RMSDPlan
+import Simulation
+import StateBudget
+import UpdateScreen
+
+import fake_flexaid
+
+# Scores of a chromosome line (cf=, cf.app= and fitnes=)
+SCORES = re.compile(r'.*cf=\s*(\S+)\s+cf\.app=\s*(\S+)\s+fitnes=\s*(\S+)')
+
+# Budgets of states (1 to NB_BUDGETS) checked over NB_GENERATIONS generations drawn
+NB_BUDGETS = 50
+NB_GENERATIONS = 2000
+
+# Residues of each strand of the synthetic target and distance between the starts of the strands
+SEGMENT = 20
+LATTICE_SPACING = 80.0
+
+# Atoms of the residues of the synthetic target: name, parents (- for the previous residue)
+# and internal coordinates (distance, angle, dihedral) of an extended strand
+TEMPLATE_BACKBONE = [ ('N',  ('-C', '-CA', '-N'), (1.33, 116.0, 120.0)),
+                      ('CA', ('N', '-C', '-CA'),  (1.46, 122.0, 180.0)),
+                      ('C',  ('CA', 'N', '-C'),   (1.52, 111.0, -120.0)),
+                      ('O',  ('C', 'CA', 'N'),    (1.23, 121.0, -60.0)),
+                      ('CB', ('CA', 'N', 'C'),    (1.53, 110.0, -122.0)) ]
+
+TEMPLATE_SIDECHAIN = { 'ALA': [],
+                       'LYS': [ ('CG', ('CB', 'CA', 'N'),  (1.52, 114.0, 180.0)),
+                                ('CD', ('CG', 'CB', 'CA'), (1.52, 111.0, 180.0)),
+                                ('CE', ('CD', 'CG', 'CB'), (1.52, 111.0, 180.0)),
+                                ('NZ', ('CE', 'CD', 'CG'), (1.49, 111.0, 180.0)) ],
+                       'GLU': [ ('CG', ('CB', 'CA', 'N'),   (1.52, 114.0, 180.0)),
+                                ('CD', ('CG', 'CB', 'CA'),  (1.52, 113.0, 180.0)),
+                                ('OE1', ('CD', 'CG', 'CB'), (1.25, 119.0, 0.0)),
+                                ('OE2', ('CD', 'CG', 'CB'), (1.25, 119.0, 180.0)) ] }
+
+
+class Value(object):
+
+    '''
+    @summary: Stand-in for the Tkinter variables of the interface
+    '''
+    def __init__(self, Val):
+
+        self.Val = Val
+
+    def get(self):
+
+        return self.Val
+
+
+class Namespace(object):
+
+    def __init__(self, **kwargs):
+
+        self.__dict__.update(kwargs)
+
+
+class Stage(object):
+
+    '''
+    @summary: Time spent in the function Name of Owner (replaced by a timed wrapper)
+    '''
+    def __init__(self, Owner, Name):
+
+        self.Owner = Owner
+        self.Name = Name
+        self.Function = Owner.__dict__[Name]
+
+        self.Time = 0.0
+        self.Calls = 0
+
+        Function = getattr(Owner, Name)
+
+        def Timed(*args, **kwargs):
+
+            Start = time.time()
+            try:
+                return Function(*args, **kwargs)
+            finally:
+                self.Time += time.time() - Start
+                self.Calls += 1
+
+        setattr(Owner, Name, Timed)
+
+    def Restore(self):
+
+        setattr(self.Owner, self.Name, self.Function)
+
+
+class ReplayRender(Simulation.Render):
+
+    '''
+    @summary: Draws every generation pushed on the replaying thread
+              (as the renderer thread does, without dropping any)
+    '''
+    def start(self):
+
+        pass
+
+    def Push(self, Snapshot):
+
+        Start = time.time()
+
+        General_cmd.Begin_Batch()
+        try:
+            self.Draw(Snapshot)
+        finally:
+            General_cmd.End_Batch()
+
+        Elapsed = time.time() - Start
+        self.top.Governor.Frame_Drawn(Elapsed)
+
+        self.DrawTime += Elapsed
+        self.Drawn += 1
+
+
+class ReplayParse(Simulation.Parse):
+
+    '''
+    @summary: Parse thread of the run of Folder, never started: the lines are replayed
+              on the calling thread (see Replay)
+    '''
+    def __init__(self, Folder, NbGenFreq, AdaptiveGenFreq, NbStates, BindingSiteOnly, SymmetricRMSD, TrajectoryPath):
+
+        Settings = Read_Run(Folder)
+
+        Manage = Namespace(READ=os.path.join(Folder, '.read'),
+                           UPDATE=os.path.join(Folder, '.update'),
+                           LOGFILE=os.path.join(Folder, 'log.txt'),
+                           LOGFILETMP=os.path.join(Folder, 'log.txt.tmp'),
+                           ABORT=os.path.join(Folder, '.abort'),
+                           BINDINGSITE=Settings['BindingSitePath'],
+                           TRAJECTORY=TrajectoryPath,
+                           GRIDCACHE=os.path.join(os.path.dirname(TrajectoryPath), 'grid_replay.npy'),
+                           ReferenceLines=Settings['ReferenceLines'],
+                           VarAtoms=Settings['VarAtoms'],
+                           RecAtom=Settings['RecAtom'],
+                           AtomTypes=Settings['AtomTypes'],
+                           DisAngDih=Settings['DisAngDih'],
+                           dictCoordRef=Settings['dictCoordRef'],
+                           listTmpPDB=[ os.path.join(os.path.dirname(TrajectoryPath), 'LIGAND' + str(i) + '.pdb')
+                                        for i in range(Settings['NbTopChrom'] + 1) ])
+
+        FlexStatus = ''
+        if [ k for k in Settings['dictFlexBonds'].keys() if Settings['dictFlexBonds'][k][0] ]:
+            FlexStatus = 'Flexible bonds'
+
+        FlexAID = Namespace(IOFile=Namespace(LigandName=Value('LIGAND'),
+                                             TargetName=Value('TARGET'),
+                                             ProcessedLigandPath=Value(Settings['ReferencePath']),
+                                             Vars=Namespace(dictFlexBonds=Settings['dictFlexBonds'])),
+                            Config1=Namespace(Vars=Namespace(TargetFlex=Namespace(listSideChain=Settings['listSideChain']),
+                                                             BindingSite=Namespace(Sphere=Settings['Sphere'])),
+                                              BindingSiteDisplay='',
+                                              RngOpt=Value(Settings['RngOpt'])),
+                            Config2=Namespace(FlexStatus=Value(FlexStatus),
+                                              IntTranslation=Value(Settings['Translation']),
+                                              IntRotation=Value(Settings['Rotation']),
+                                              UseReference=Value(Settings['Reference']),
+                                              SymmetricRMSD=Value(SymmetricRMSD)),
+                            GAParam=Namespace(NbGen=Value(str(Settings['NbGen'])),
+                                              NbGenFreq=Value(str(NbGenFreq)),
+                                              AdaptiveGenFreq=Value(AdaptiveGenFreq),
+                                              NbStates=Value(str(NbStates)),
+                                              BindingSiteOnly=Value(BindingSiteOnly),
+                                              NbTopChrom=Value(str(Settings['NbTopChrom']))),
+                            OSid='LINUX', Run=None, ParseState=0, SimulateState=0)
+
+        dictSimData = dict()
+        for TOP in range(Settings['NbTopChrom']):
+            dictSimData[TOP+1] = [ 'N/A', 'N/A', 'N/A', 'N/A' ]
+
+        Simulate = Namespace(top=FlexAID, Manage=Manage, SimLigDisplay=Value('sticks'),
+                             SimCartoonDisplay=Value(1), SimLinesDisplay=Value(0),
+                             StreamStdout=0, Paused=False, Results=False,
+                             TIMEOUT=0.0, INTERVAL=0.0, dictSimData=dictSimData,
+                             PymolColorList=Color.GetHeatColorList(Settings['NbTopChrom'], False))
+
+        # Interface updates made on the Tk thread (see Check_Replay): the tables shown and the messages
+        Simulate.Tables = list()
+        Simulate.Messages = list()
+        Simulate.update_DataList = lambda: Simulate.Tables.append(dict([ (Key, list(Row)) for Key, Row in
+                                                                        Simulate.dictSimData.items() ]))
+        Simulate.Modify_LigDisplay = lambda: None
+        Simulate.Modify_Display = lambda var, display: None
+        Simulate.DisplayMessage = lambda Message, Priority: Simulate.Messages.append(Message)
+
+        cmd.delete('TARGET')
+        cmd.load(Settings['TargetPath'], 'TARGET')
+
+        Simulation.Parse.__init__(self, Simulate, Queue.Queue(), '')
+
+        # Every generation is drawn, in order
+        self.Renderer.Stop()
+        self.Renderer = ReplayRender(self)
+
+        self.NbLines = 0
+
+    def start(self):
+
+        pass
+
+    '''
+    @summary: SUBROUTINE Remove_UPDATE: the .update files are kept for the next replays
+    '''
+    def Remove_UPDATE(self):
+
+        return 0
+
+    '''
+    @summary: SUBROUTINE Replay: parses log.txt then the .update file of each generation
+    '''
+    def Replay(self, Updates):
+
+        if self.ParseLines():
+            return 1
+        self.NbLines += len(self.Lines)
+
+        for Path in Updates:
+
+            self.UPDATE = Path
+            self.ParseFile = Path
+
+            if self.ParseLines():
+                return 1
+            self.NbLines += len(self.Lines)
+
+        self.Watcher.Close()
+
+        if self.Recorder is not None:
+            self.Recorder.Close()
+
+        # As done by run once the renderer is stopped
+        if self.Write_TopLigands():
+            return 1
+
+        return 0
+
+
+'''
+@summary: SUBROUTINE Check_States: every state of the TOP objects holds a generation once taken,
+                                   for the run replayed and for budgets of 1 to NB_BUDGETS states
+                                   over NB_GENERATIONS generations drawn
+
+@return: the number of states of the run holding a generation, -1 when a state is left unused
+'''
+def Check_States(Parse):
+
+    Budgets = [ (Parse.States, Parse.Renderer.Drawn) ]
+    for Budget in range(1, NB_BUDGETS + 1):
+        States = StateBudget.StateBudget(Budget)
+        for Generation in range(NB_GENERATIONS):
+            States.Assign(Generation)
+        Budgets.append((States, NB_GENERATIONS))
+
+    for States, NbDrawn in Budgets:
+        if len(States.Recent) + len(States.History) != min(States.Budget, NbDrawn):
+            return -1
+
+    return len(Parse.States.Recent) + len(Parse.States.History)
+
+'''
+@summary: SUBROUTINE Check_TopLigands: the PDB ligand files written once the run is replayed
+                                       (see Parse.Write_TopLigands) hold the last pose of each TOP object
+
+@return: the number of TOP ligand files checked, -1 when one differs from its TOP object
+'''
+def Check_TopLigands(Parse):
+
+    # State of the last generation drawn
+    State = 1
+    if Parse.States.Recent:
+        State = Parse.States.Recent[-1]
+
+    for TOP in sorted(Parse.dictComplex.keys()):
+
+        dictCoord = dict()
+        cmd.iterate_state(State, Parse.dictComplex[TOP].selLigand, 'dictCoord[ID] = (x, y, z)',
+                          space={ 'dictCoord': dictCoord })
+
+        NbAtoms = 0
+        for Line in open(Parse.listTmpPDB[TOP+1]):
+            if Line.startswith('HETATM') or Line.startswith('ATOM  '):
+                Coord = dictCoord.get(int(Line[6:11]))
+                if Coord is None:
+                    return -1
+
+                for k in range(3):
+                    if abs(float(Line[30+8*k:38+8*k]) - Coord[k]) > 0.0011:
+                        return -1
+
+                NbAtoms += 1
+
+        if NbAtoms != len(dictCoord):
+            return -1
+
+    return len(Parse.dictComplex)
+
+'''
+@summary: SUBROUTINE Read_Scores: CF, CF.app and fitness of each TOP chromosome of each generation,
+                                  read from the lines of log.txt and the .update files
+
+@return: { Generation: { TOP: [ CF, CF.app, fitness ] } }
+'''
+def Read_Scores(Folder, Updates):
+
+    dictScores = dict()
+
+    Generation = -1
+    Best = ''
+
+    for Path in [ os.path.join(Folder, 'log.txt') ] + Updates:
+        for Line in open(Path):
+            Record, m = LogReader.Classify(Line)
+
+            if Record == 'GENERATION':
+                Generation = int(m.group(1))
+            elif Record == 'BESTBY':
+                Best = m.group(1)
+            elif Record == 'CHROMOSOME' and Best == 'energy' and Generation != -1:
+                Scores = SCORES.match(Line)
+                if Scores:
+                    dictScores.setdefault(Generation, dict())[int(m.group(2))] = \
+                        [ float(Scores.group(k)) for k in range(1, 4) ]
+
+    return dictScores
+
+'''
+@summary: SUBROUTINE Check_Replay: shows the first generation again once the run is replayed, as the
+                                   Show button of the Simulate tab does, and compares the table shown
+                                   with the scores of its chromosome lines
+
+@return: the number of TOP rows checked, -1 when the table or the messages are wrong
+'''
+def Check_Replay(Parse, Folder, Updates):
+
+    dictScores = Read_Scores(Folder, Updates)
+    if not dictScores:
+        return -1
+
+    Generation = min(dictScores.keys())
+    Simulate = Parse.top
+
+    if Parse.Replay_Generation(Generation) or not Simulate.Tables:
+        return -1
+
+    Table = Simulate.Tables[-1]
+    if sorted(Table.keys()) != [ TOP + 1 for TOP in sorted(dictScores[Generation].keys()) ]:
+        return -1
+
+    for TOP, Scores in dictScores[Generation].items():
+        Row = Table[TOP+1]
+        for k in range(3):
+            if abs(float(Row[k]) - Scores[k]) > 0.0011:
+                return -1
+
+        # The RMSD of the pose replayed is shown
+        if Parse.RMSD is not None and Row[3] == 'N/A':
+            return -1
+
+    # A generation not recorded is reported without touching the table
+    NbTables = len(Simulate.Tables)
+    if not Parse.Replay_Generation(max(dictScores.keys()) + 1000) or len(Simulate.Tables) != NbTables or \
+       not [ Message for Message in Simulate.Messages if 'was not recorded' in Message ]:
+        return -1
+
+    return len(Table)
+
+'''
+@summary: SUBROUTINE Read_Run: settings of the run of Folder (CONFIG.inp, ga_inp.dat and the ligand input files)
+'''
+def Read_Run(Folder):
+
+    Settings = { 'Translation': 0, 'Rotation': 0, 'Reference': 0,
+                 'NbGen': 0, 'NbTopChrom': 0, 'listSideChain': list(), 'TargetPath': '',
+                 'RngOpt': '', 'Sphere': None, 'BindingSitePath': '' }
+
+    Selected = list()
+    for Line in open(os.path.join(Folder, 'CONFIG.inp')):
+        fields = Line.split()
+        if not fields:
+            continue
+
+        if fields[0] == 'INPLIG':
+            INPPath = Line[7:].strip()
+        elif fields[0] == 'PDBNAM':
+            Settings['TargetPath'] = Line[7:].strip()
+        elif fields[0] == 'RMSDST':
+            Settings['Reference'] = 1
+        elif fields[0] == 'RNGOPT':
+            Settings['RngOpt'] = fields[1]
+            if fields[1] == 'LOCCEN':
+                Settings['Sphere'] = Namespace(Center=[ float(x) for x in fields[2:5] ], Radius=float(fields[5]))
+            else:
+                Settings['BindingSitePath'] = fields[2]
+        elif fields[0] == 'OPTIMZ':
+            if fields[3] == '-1':
+                Settings['Translation'] = 1
+            elif fields[3] == '0':
+                Settings['Rotation'] = 1
+            else:
+                Selected.append(fields[3])
+        elif fields[0] == 'FLEXSC':
+            Settings['listSideChain'].append(fields[3] + fields[1] + fields[2])
+
+    for Line in open(os.path.join(Folder, 'ga_inp.dat')):
+        fields = Line.split()
+        if fields and fields[0] == 'NUMGENER':
+            Settings['NbGen'] = int(fields[1])
+        elif fields and fields[0] == 'PRINTCHR':
+            Settings['NbTopChrom'] = int(fields[1])
+
+    # Ligand input files named as by IOFile (.inp, .ic, _ref.pdb)
+    Base = os.path.splitext(INPPath)[0]
+    Settings['ReferencePath'] = Base + '_ref.pdb'
+
+    RecAtom = dict()
+    AtomTypes = dict()
+    dictFlexBonds = dict()
+    VarAtoms = [ 0, 0, 0 ]
+    for Line in open(INPPath):
+        if Line.startswith('HETTYP'):
+            NoAtom = int(Line[6:11])
+            RecAtom[NoAtom] = [ int(Line[21:26]), int(Line[26:31]), int(Line[31:36]) ]
+            AtomTypes[NoAtom] = Line[11:13].strip()
+
+            if RecAtom[NoAtom][2] == 0:
+                if RecAtom[NoAtom][1] == 0:
+                    if RecAtom[NoAtom][0] == 0:
+                        VarAtoms[0] = NoAtom
+                    else:
+                        VarAtoms[1] = NoAtom
+                else:
+                    VarAtoms[2] = NoAtom
+
+        elif Line.startswith('FLEDIH'):
+            Atoms = Line[10:].split()
+            dictFlexBonds[Line[7:9].strip()] = [ int(Line[7:9].strip() in Selected), 0, len(Atoms) ] + Atoms
+
+    DisAngDih = dict()
+    for Line in open(Base + '.ic'):
+        if Line[0:6] != 'REFPCG':
+            DisAngDih[int(Line[0:5])] = [ float(Line[7:15]), float(Line[16:24]), float(Line[25:33]) ]
+
+    ReferenceLines = open(Settings['ReferencePath']).readlines()
+    dictCoordRef = dict()
+    for Line in ReferenceLines:
+        if Line.startswith('HETATM'):
+            dictCoordRef[int(Line[6:11])] = [ float(Line[30:38]), float(Line[38:46]), float(Line[46:54]) ]
+
+    Settings.update({ 'RecAtom': RecAtom, 'AtomTypes': AtomTypes, 'VarAtoms': VarAtoms, 'DisAngDih': DisAngDih,
+                      'dictFlexBonds': dictFlexBonds, 'ReferenceLines': ReferenceLines,
+                      'dictCoordRef': dictCoordRef })
+
+    return Settings
+
+'''
+@summary: SUBROUTINE Record_Target: writes strands of SEGMENT residues (alanines, with lysines and
+          glutamates), NbResidues in all, built from internal coordinates around Ori
+          (the side-chains of the first strand are flexible)
+
+@return: the flexible residues (number, chain, name)
+'''
+def Record_Target(Path, Ori, NbResidues):
+
+    ListAtom = list()
+    RecAtom = dict()
+    DisAngDih = dict()
+    Names = list()
+
+    Flexible = list()
+    dictPrevious = dict()
+
+    # Segments of SEGMENT residues start from the points of a lattice around Ori (closest first)
+    Lattice = [ (i, j, k) for i in range(-4, 5) for j in range(-4, 5) for k in range(-4, 5) ]
+    Lattice.sort(key=lambda Point: (Point[0]**2 + Point[1]**2 + Point[2]**2, Point))
+    dictOri = dict()
+
+    for Resi in range(1, NbResidues + 1):
+
+        if Resi % SEGMENT == 1:
+            Point = Lattice[Resi // SEGMENT]
+            dictPrevious = dict()
+            dictOri[len(ListAtom) + 1] = [ Ori[k] + LATTICE_SPACING * Point[k] for k in range(3) ]
+
+        # Side-chains of the first 20 residues are flexible
+        Resn = 'ALA'
+        if Resi % 8 == 4:
+            Resn = 'LYS'
+        elif Resi % 8 == 0:
+            Resn = 'GLU'
+
+        if Resn != 'ALA' and Resi <= 20:
+            Flexible.append((Resi, 'A', Resn))
+
+        dictResidue = dict()
+        for Name, Parents, IC in TEMPLATE_BACKBONE + TEMPLATE_SIDECHAIN[Resn]:
+
+            NoAtom = len(ListAtom) + 1
+            dictResidue[Name] = NoAtom
+
+            # Parents of the previous residue start with -, the first residue starts from Ori
+            Numbers = list()
+            for Parent in Parents:
+                if Parent[0] == '-':
+                    Numbers.append(dictPrevious.get(Parent[1:], 0))
+                else:
+                    Numbers.append(dictResidue[Parent])
+
+            ListAtom.append(NoAtom)
+            RecAtom[NoAtom] = Numbers
+            DisAngDih[NoAtom] = IC
+            Names.append((Name, Resn, Resi))
+
+        dictPrevious = dictResidue
+
+    PDBCoord = dict()
+    Starts = sorted(dictOri.keys()) + [ len(ListAtom) + 1 ]
+    for Start, End in zip(Starts[:-1], Starts[1:]):
+        PDBCoord.update(Geometry.buildcc(ListAtom[Start-1:End-1], RecAtom, DisAngDih, dictOri[Start]))
+
+    out = open(Path, 'w')
+    for NoAtom in ListAtom:
+        Name, Resn, Resi = Names[NoAtom-1]
+        out.write('ATOM  %5d  %-3s %3s A%4d    %8.3f%8.3f%8.3f  1.00  0.00           %s  \n' %
+                  ((NoAtom, Name, Resn, Resi) + tuple(PDBCoord[NoAtom]) + (Name[0],)))
+    out.write('END\n')
+    out.close()
+
+    return Flexible
+
+'''
+@summary: SUBROUTINE Record_Synthetic: writes the run of a chain-like ligand of NbAtoms atoms
+          (a flexible bond every 4 atoms) and of a target with flexible side-chains to Folder
+'''
+def Record_Synthetic(Folder, NbGenerations, NbTop, NbAtoms, NbResidues=20):
+
+    if not os.path.isdir(Folder):
+        os.makedirs(Folder)
+
+    for Path in glob.glob(os.path.join(Folder, 'update.*')):
+        os.remove(Path)
+
+    Base = os.path.join(Folder, 'LIGAND')
+    Flexible = [ NoAtom for NoAtom in range(4, NbAtoms + 1, 4) ]
+
+    out = open(Base + '.inp', 'w')
+    for NoAtom in range(1, NbAtoms + 1):
+        Parents = [ max(NoAtom - k, 0) for k in (1, 2, 3) ]
+        out.write(('HETTYP%5d 1  C%-3d m' % (NoAtom, NoAtom)).ljust(21) + '%5d%5d%5d    0\n' % tuple(Parents))
+    for k, NoAtom in enumerate(Flexible):
+        out.write('FLEDIH %2d %5d\n' % (k + 1, NoAtom))
+    out.close()
+
+    out = open(Base + '.ic', 'w')
+    for NoAtom in range(1, NbAtoms + 1):
+        out.write('%5d  %8.3f %8.3f %8.3f\n' % (NoAtom, 1.5, 110.0, 180.0 - 60.0 * (NoAtom % 3)))
+    out.close()
+
+    out = open(Base + '_ref.pdb', 'w')
+    for NoAtom in range(1, NbAtoms + 1):
+        out.write('HETATM%5d  C%-2d LIG A9999    %8.3f%8.3f%8.3f  1.00  0.00           C  \n' %
+                  (NoAtom, NoAtom % 100, 1.25 * NoAtom, 0.75 * (NoAtom % 2), 0.0))
+    out.close()
+
+    Center = [ 12.0, -3.5, 27.25 ]
+    Flexible = Record_Target(os.path.join(Folder, 'TARGET.pdb'), [ Center[0], Center[1], Center[2] + 12.0 ], NbResidues)
+
+    out = open(os.path.join(Folder, 'CONFIG.inp'), 'w')
+    out.write('PDBNAM ' + os.path.join(Folder, 'TARGET.pdb') + '\n')
+    out.write('INPLIG ' + Base + '.inp\n')
+    out.write('RNGOPT LOCCEN %.3f %.3f %.3f 8.000\n' % tuple(Center))
+    out.write('OPTIMZ 9999 - -1\n')
+    out.write('OPTIMZ 9999 - 0\n')
+    for k in sorted([ str(k + 1) for k in range(len(Flexible)) ]):
+        out.write('OPTIMZ 9999 - ' + k + '\n')
+    for Residue in Flexible:
+        out.write('FLEXSC %d %s %s\n' % Residue)
+    out.write('RMSDST ' + Base + '_ref.pdb\n')
+    out.write('STATEP ' + Folder + '\n')
+    out.close()
+
+    out = open(os.path.join(Folder, 'ga_inp.dat'), 'w')
+    out.write('NUMGENER ' + str(NbGenerations) + '\n')
+    out.write('PRINTCHR ' + str(NbTop) + '\n')
+    out.close()
+
+    FlexAID = fake_flexaid.FakeFlexAID(os.path.join(Folder, 'CONFIG.inp'), os.path.join(Folder, 'ga_inp.dat'),
+                                       os.path.join(Folder, 'RESULT'))
+
+    # The header goes to the log, each generation to its own .update file
+    log = open(os.path.join(Folder, 'log.txt'), 'w')
+    FlexAID.Header(log)
+
+    for Gen in range(NbGenerations + 1):
+        out = open(os.path.join(Folder, 'update.%05d' % Gen), 'w')
+        out.write(FlexAID.Generation(Gen))
+        out.close()
+
+    log.write('clustering all individuals\n')
+    log.write('Done.\n')
+    log.close()
+
+
+if __name__ == '__main__':
+
+    if len(sys.argv) < 2:
+        sys.stderr.write('usage: replay_log.py record FOLDER [NbGenerations] [NbTop] [NbAtoms] [NbResidues]\n' +
+                         '       replay_log.py FOLDER [NbGenFreq|auto] [NbStates] [site]\n')
+        sys.exit(1)
+
+    if sys.argv[1] == 'record':
+
+        Folder = os.path.abspath(sys.argv[2])
+
+        NbGenerations = 500
+        NbTop = 20
+        NbAtoms = 40
+        NbResidues = 20
+
+        if len(sys.argv) > 3:
+            NbGenerations = int(sys.argv[3])
+        if len(sys.argv) > 4:
+            NbTop = int(sys.argv[4])
+        if len(sys.argv) > 5:
+            NbAtoms = int(sys.argv[5])
+        if len(sys.argv) > 6:
+            NbResidues = int(sys.argv[6])
+
+        Record_Synthetic(Folder, NbGenerations, NbTop, NbAtoms, NbResidues)
+        print('%d generations of %d chromosomes recorded in %s' % (NbGenerations + 1, NbTop, Folder))
+        sys.exit(0)
+
+    Folder = os.path.abspath(sys.argv[1])
+
+    NbGenFreq = 1
+    AdaptiveGenFreq = 0
+    if len(sys.argv) > 2:
+        if sys.argv[2] == 'auto':
+            AdaptiveGenFreq = 1
+        else:
+            NbGenFreq = int(sys.argv[2])
+
+    NbStates = 1
+    if len(sys.argv) > 3:
+        NbStates = int(sys.argv[3])
+
+    BindingSiteOnly = int('site' in sys.argv[4:])
+    SymmetricRMSD = int('symmetric' in sys.argv[4:])
+
+    Updates = sorted(glob.glob(os.path.join(Folder, 'update.*')))
+    TempDir = tempfile.mkdtemp()
+
+    Parse = ReplayParse(Folder, NbGenFreq, AdaptiveGenFreq, NbStates, BindingSiteOnly, SymmetricRMSD,
+                        os.path.join(TempDir, 'trajectory.nrgtrj'))
+
+    # Grid saved by an earlier run on another binding site, removed once the grid is saved
+    StaleGrid = os.path.join(TempDir, 'grid_stale.npy')
+    open(StaleGrid, 'wb').close()
+
+    Stages = { 'parse':   Stage(Simulation.Parse, 'ParseLines'),
+               'decode':  Stage(GeneDecoder.GeneDecoder, 'Decode'),
+               'plan':    Stage(ReconstructionPlan.ReconstructionPlan, 'Decode_Population'),
+               'buildcc': Stage(ReconstructionPlan.PoseCache, 'Build'),
+               'rmsd':    Stage(RMSDPlan.RMSDPlan, 'Compute'),
+               'draw':    Stage(ReplayRender, 'Push'),
+               'update':  Stage(UpdateScreen.UpdateScreen, 'Update'),
+               'record':  Stage(Simulation.Parse, 'Record_Generation') }
+
+    cmd.Reset_Stats()
+    General_cmd.Reset_RefreshSaved()
+
+    Start = time.time()
+    Failed = Parse.Replay(Updates)
+    Elapsed = time.time() - Start
+
+    for Name in Stages.keys():
+        Stages[Name].Restore()
+
+    if Failed or Parse.FlexAID.ParseState > 0:
+        shutil.rmtree(TempDir, True)
+        print('The replay failed: ' + Parse.ErrorMsg)
+        sys.exit(1)
+
+    if os.path.isfile(Parse.top.Manage.ABORT):
+        os.remove(Parse.top.Manage.ABORT)
+        shutil.rmtree(TempDir, True)
+        print('The replay failed: an error was reported while drawing')
+        sys.exit(1)
+
+    NbGenerations = Stages['record'].Calls
+    NbPoses = Stages['update'].Calls
+    NbChromosomes = NbGenerations * Parse.NbTopChrom
+    NbCalls = sum(cmd.Calls.values())
+    CmdTime = sum(cmd.Time.values())
+
+    # The drawing and recording happen while the lines are parsed
+    Parsing = Stages['parse'].Time - Stages['draw'].Time - Stages['record'].Time
+    Reconstruction = Stages['plan'].Time + Stages['buildcc'].Time
+
+    # The genes are decoded once, for the trajectory
+    Recording = Stages['record'].Time - Stages['decode'].Time
+
+    print('%s: %d lines, %d generation(s) (%d drawn), %d chromosomes, %d atoms, %d genes' %
+          (Folder, Parse.NbLines, NbGenerations, Parse.Renderer.Drawn, Parse.NbTopChrom,
+           len(Parse.ListAtom), Parse.Decoder.NbGenes))
+    print('  parsing:        %10.0f lines/s       (%.3f s)' % (Parse.NbLines / max(Parsing, 1e-9), Parsing))
+    print('  decoding:       %10.0f chromosomes/s (%.3f s)' % (NbChromosomes / max(Stages['decode'].Time, 1e-9), Stages['decode'].Time))
+    print('  reconstruction: %10.0f poses/s       (%.3f s), %s' % (NbPoses / max(Reconstruction, 1e-9), Reconstruction,
+                                                                      Parse.Poses.Get_Stats()))
+    if Parse.RMSD is not None:
+        print('  rmsd:           %10.0f poses/s       (%.3f s), %d automorphism(s) of the ligand' %
+              (NbPoses / max(Stages['rmsd'].Time, 1e-9), Stages['rmsd'].Time, len(Parse.RMSD.Permutations or [ None ])))
+    print('  drawing:        %10.0f poses/s       (%.3f s), %.1f cmd call(s) per pose' %
+          (NbPoses / max(Stages['update'].Time, 1e-9), Stages['update'].Time, NbCalls / float(max(NbPoses, 1))))
+    print('  refresh:        ' + Parse.Governor.Get_Stats())
+    print('  states:         ' + Parse.States.Get_Stats() + ', %d atom(s) per TOP object state' %
+          cmd.count_atoms('TOP_1__', state=1))
+    print('  recording:      %10.0f generations/s (%.3f s)' % (NbGenerations / max(Recording, 1e-9), Recording))
+    print('  total:          %10.1f generations/s (%.3f s)' % (NbGenerations / Elapsed, Elapsed))
+    print('  %d cmd call(s) (%.3f s), %d scene refresh(es) saved by batching, %d interface update(s) queued' %
+          (NbCalls, CmdTime, General_cmd.Get_RefreshSaved(), Parse.queue.qsize()))
+    print(cmd.Report())
+
+    # Checked once the calls are reported (the check calls iterate_state)
+    NbLigandFiles = Check_TopLigands(Parse)
+
+    # Before a generation is drawn again on a state evicted
+    NbStatesUsed = Check_States(Parse)
+
+    # Draws a generation again, once the ligand files are checked
+    NbRows = -1
+    if NbLigandFiles >= 0:
+        NbRows = Check_Replay(Parse, Folder, Updates)
+
+    # Only the grid of the run is kept (nothing is saved without numpy)
+    GridKept = os.path.isfile(Parse.GridCache) and not os.path.isfile(StaleGrid)
+    if Geometry.numpy is None:
+        GridKept = not os.path.isfile(Parse.GridCache) and os.path.isfile(StaleGrid)
+
+    shutil.rmtree(TempDir, True)
+
+    if NbLigandFiles < 0:
+        print('The replay failed: a PDB file of the TOP ligands differs from its TOP object')
+        sys.exit(1)
+
+    print('  %d PDB file(s) of the TOP ligands written and checked' % NbLigandFiles)
+
+    if NbRows < 0:
+        print('The replay failed: the table shown for a recorded generation does not hold its scores')
+        sys.exit(1)
+
+    print('  %d row(s) of the table checked for a generation shown again' % NbRows)
+
+    if NbStatesUsed < 0:
+        print('The replay failed: a state of the TOP objects is left unused')
+        sys.exit(1)
+
+    print('  %d of %d state(s) of the TOP objects in use, budgets of 1 to %d checked over %d generations' %
+          (NbStatesUsed, Parse.States.Budget, NB_BUDGETS, NB_GENERATIONS))
+
+    if not GridKept:
+        print('The replay failed: the grid saved is not the only one kept in the complex')
+        sys.exit(1)
+
+    print('  only the grid of the run kept in the complex')